@@ -0,0 +1,36 @@
+"""Benchmark the CLM intent classifier.
+
+Run from agent/: python -m scripts.bench_intents [iterations]
+"""
+
+import sys
+import time
+
+from src.intents import classify_intent
+
+QUERIES = [
+    "hello", "speak your greeting", "what's my name", "who are you", "yes please",
+    "tell me about portugal", "compare portugal and spain", "visa options for cyprus",
+    "cost of living in new zealand", "how much is rent in lisbon",
+    "tell me about the portugal d7 visa", "compare tax in spain and portugal",
+    "what are the schools like in dubai for expat families with young children",
+]
+
+
+def main(iterations: int = 20_000) -> None:
+    for query in QUERIES:
+        classify_intent(query)  # Warm up
+    print(f"{'query':<75} {'intent':<14} {'us/call':>8}")
+    total = 0.0
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            match = classify_intent(query)
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        print(f"{query:<75} {match.intent.value:<14} {elapsed / iterations * 1e6:>8.2f}")
+    print(f"\nmean {total / (iterations * len(QUERIES)) * 1e6:.2f} us/call over {iterations} iterations per query")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
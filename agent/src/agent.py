@@ -8,17 +8,21 @@ Single Pydantic AI agent serving both:
 
 import os
 import sys
+import hmac
 import json
 import uuid
-from typing import Optional, AsyncGenerator, List
-from dataclasses import dataclass, field
+from collections import Counter
+from typing import Optional, AsyncGenerator, AsyncIterator, Callable, List
+from dataclasses import asdict, dataclass, field
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.responses import Response, StreamingResponse
 
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.messages import ModelMessage
+from pydantic_ai.models import Model
 
 # Zep memory integration
 try:
@@ -28,7 +32,7 @@ except ImportError:
     ZEP_AVAILABLE = False
     print("[ATLAS] Warning: zep-cloud not installed, memory features disabled", file=sys.stderr)
 
-from .models import AppState, ATLASResponse, ArticleCardData, MapLocation, TimelineEvent, DestinationExpertDelegation
+from .models import AppState, ATLASResponse, ArticleCardData, TimelineEvent, DestinationExpertDelegation
 from .tools import (
     search_articles,
     normalize_query,
@@ -37,6 +41,15 @@ from .tools import (
     extract_era_from_content,
     PHONETIC_CORRECTIONS,
 )
+from .passages import passage_sections
+from .prompt_builder import (
+    PromptBuilder,
+    PRIORITY_REQUIRED,
+    PRIORITY_HIGH,
+    PRIORITY_MEDIUM,
+    PRIORITY_LOW,
+    get_input_budget,
+)
 from .database import (
     get_user_preferred_name,
     get_all_destinations,
@@ -48,29 +61,52 @@ from .database import (
     get_full_destination_for_confirmation,
 )
 from .destination_expert import destination_expert_agent, DestinationExpertDeps
+from .expert_fast_path import plan_expert_request, run_expert_plan, expert_brief, expert_stats
+from .destination_pipeline import research_destination, pipeline_metrics
+from .reference_data import match_key, payloads, reference_pack, reference_packs
+from .intents import Intent, classify_intent, destination_display_name, find_destinations, tokenize
+from .fast_answers import answer_intent
+from .agent_pool import AgentPool, close_provider_clients, get_model
+from .memory_queue import MemoryWrite, MemoryWriteQueue
+from .answer_cache import AnswerCache, source_key
+from .hedging import hedged_stream, latency_metrics
+from .model_router import route_turn, routing_metrics
+from .tracing import start_trace, finish_with_response, recent_traces, TRACE_SAMPLE_RATE
+from .session_store import SessionStore, create_session_store
+from .ttl_cache import TTLCache
+from .agui_middleware import AGUIContextMiddleware
+from .sse import SSEEncoder, PhraseChunker, CannedReply, SSE_STOP, SSE_DONE, benchmark_encoders
 
 # =============================================================================
 # SESSION CONTEXT FOR NAME SPACING & GREETING MANAGEMENT
 # =============================================================================
 
-from collections import OrderedDict
+import asyncio
 import time
 import random
 
-# LRU cache for session contexts (max 100 sessions)
-_session_contexts: OrderedDict = OrderedDict()
-MAX_SESSIONS = 100
 NAME_COOLDOWN_TURNS = 3  # Don't use name for 3 turns after using it
 
-# Global user context cache - populated by middleware from CopilotKit instructions
-_current_user_context: dict = {}
+# Per-session bounds (keep each session to a few KB)
+MAX_SESSION_SUGGESTIONS = 5  # Most recent suggestions kept
+MAX_SESSION_FACTS = 10
+MAX_SESSION_FACT_CHARS = 300
+MAX_SESSION_INTERESTS = 5
+MAX_PREFETCHED_CHARS = 4000
+MAX_PREFETCHED_TITLES = 3
+SESSION_OBJECT_OVERHEAD = 200  # Slotted object + small fields, approx bytes
+STR_OBJECT_OVERHEAD = 50  # Per string held in a collection
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionContext:
     """Track conversation state per session for name spacing and greeting.
 
     IMPORTANT: User context is fetched ONCE on first message and cached here.
     Follow-up messages skip Zep/DB lookups entirely for instant response.
+
+    Slotted, with every collection bounded (see MAX_SESSION_* above) so tens
+    of thousands of live sessions fit in one process.
     """
     turns_since_name_used: int = 0
     name_used_in_greeting: bool = False
@@ -80,7 +116,7 @@ class SessionContext:
 
     # CACHED USER CONTEXT (fetched once, used for all follow-ups)
     user_name: Optional[str] = None  # User's name (from session/DB/Zep)
-    user_context: Optional[dict] = None  # Full Zep context (facts, interests)
+    user_context: Optional[dict] = None  # Compacted Zep context (see compact_user_context)
     context_fetched: bool = False  # True after first lookup completes
 
     # PRE-FETCHED CONTENT (for instant "yes" responses)
@@ -89,37 +125,95 @@ class SessionContext:
     prefetched_titles: list = field(default_factory=list)
 
     # SUGGESTIONS (for "you might also like...")
-    suggestions: list = field(default_factory=list)  # Related topics
+    suggestions: list = field(default_factory=list)  # Recent suggested topics (bounded)
     last_suggested_topic: str = ""  # What ATLAS suggested (for "yes" handling)
 
+    def approx_bytes(self) -> int:
+        """Approximate memory held by this session (strings dominate)."""
+        size = SESSION_OBJECT_OVERHEAD + len(self.last_topic) + len(self.user_name or "")
+        size += len(self.prefetched_topic) + len(self.prefetched_content) + len(self.last_suggested_topic)
+        size += sum(len(t) for t in self.prefetched_titles) + sum(len(t) for t in self.suggestions)
+        strings = len(self.prefetched_titles) + len(self.suggestions)
+        if self.user_context:
+            facts, interests = self.user_context.get("facts", []), self.user_context.get("interests", [])
+            size += SESSION_OBJECT_OVERHEAD + sum(len(f) for f in facts) + sum(len(i) for i in interests)
+            strings += len(facts) + len(interests)
+        return size + strings * STR_OBJECT_OVERHEAD
+
+
+def compact_user_context(user_context: Optional[dict]) -> Optional[dict]:
+    """Keep only the bounded fields sessions use from a Zep context."""
+    if not user_context:
+        return user_context
+    compact = {
+        "found": user_context.get("found", False),
+        "is_returning": user_context.get("is_returning", False),
+        "facts": [f[:MAX_SESSION_FACT_CHARS] for f in user_context.get("facts", [])[:MAX_SESSION_FACTS]],
+        "user_name": user_context.get("user_name"),
+    }
+    if user_context.get("interests"):
+        compact["interests"] = list(user_context["interests"][:MAX_SESSION_INTERESTS])
+    return compact
+
 
-def get_session_context(session_id: str) -> SessionContext:
-    """Get or create session context with LRU eviction."""
-    global _session_contexts
+# Session contexts, evicted after SESSION_IDLE_TTL_SECONDS without interaction.
+# SESSION_STORE=sqlite shares them between workers (see session_store.py).
+session_store: SessionStore[SessionContext] = create_session_store(
+    asdict, lambda data: SessionContext(**data), size_of=SessionContext.approx_bytes
+)
+
+
+@dataclass(slots=True)
+class SessionTurn:
+    """
+    One CLM turn's view of its session: loaded once at the start of the
+    turn, and only the fields the turn changed are saved once at the end -
+    merged into the stored row, so a background prefetch or another worker
+    writing other fields in between isn't overwritten.
+    """
+    session_id: str
+    ctx: SessionContext
+    loaded: dict  # Field values as loaded
 
-    if session_id in _session_contexts:
-        # Move to end (most recently used)
-        _session_contexts.move_to_end(session_id)
-        return _session_contexts[session_id]
 
-    # Evict oldest if at capacity
-    while len(_session_contexts) >= MAX_SESSIONS:
-        _session_contexts.popitem(last=False)
+async def update_session(session_id: str, mutate: Callable[[SessionContext], None]) -> SessionContext:
+    """Atomically read-modify-write one session and mark it as just used."""
+    now = time.time()
 
-    ctx = SessionContext()
-    _session_contexts[session_id] = ctx
-    return ctx
+    def apply(ctx: SessionContext):
+        mutate(ctx)
+        ctx.last_interaction_time = now
 
+    return await session_store.modify(session_id, apply, SessionContext, now)
 
-def should_use_name(session_id: str, is_greeting: bool = False) -> bool:
+
+async def load_session_turn(session_id: str) -> SessionTurn:
+    """Load (or start) a session for one turn."""
+    ctx = await session_store.load(session_id) or SessionContext()
+    return SessionTurn(session_id, ctx, asdict(ctx))
+
+
+async def save_session_turn(turn: SessionTurn):
+    """Save the fields this turn changed (always refreshing the interaction time)."""
+    changes = {
+        name: value for name, value in asdict(turn.ctx).items()
+        if name != "last_interaction_time" and value != turn.loaded.get(name)
+    }
+
+    def merge(ctx: SessionContext):
+        for name, value in changes.items():
+            setattr(ctx, name, value)
+
+    await update_session(turn.session_id, merge)
+
+
+def should_use_name(ctx: SessionContext, is_greeting: bool = False) -> bool:
     """
     Rules for name usage to avoid over-repetition:
     - Always use name in greeting (first message)
     - After that, wait NAME_COOLDOWN_TURNS before using again
     - Never use name in consecutive turns
     """
-    ctx = get_session_context(session_id)
-
     if is_greeting and not ctx.name_used_in_greeting:
         return True
 
@@ -129,27 +223,29 @@ def should_use_name(session_id: str, is_greeting: bool = False) -> bool:
     return False
 
 
-def mark_name_used(session_id: str, in_greeting: bool = False):
+def mark_name_used(ctx: SessionContext, in_greeting: bool = False):
     """Mark that we used the name, reset cooldown counter."""
-    ctx = get_session_context(session_id)
     ctx.turns_since_name_used = 0
     if in_greeting:
         ctx.name_used_in_greeting = True
         ctx.greeted_this_session = True
 
 
-def increment_turn(session_id: str):
+def mark_greeted(ctx: SessionContext):
+    """Mark that this session has had its greeting."""
+    ctx.greeted_this_session = True
+
+
+def increment_turn(ctx: SessionContext):
     """Increment turn counter for name spacing."""
-    ctx = get_session_context(session_id)
     ctx.turns_since_name_used += 1
-    ctx.last_interaction_time = time.time()
 
 
 # =============================================================================
 # SESSION CONTEXT CACHING (CRITICAL FOR FAST FOLLOW-UPS)
 # =============================================================================
 
-def get_cached_user_context(session_id: str) -> tuple[Optional[str], Optional[dict], bool]:
+def get_cached_user_context(ctx: SessionContext) -> tuple[Optional[str], Optional[dict], bool]:
     """
     Get cached user context from session.
 
@@ -158,57 +254,133 @@ def get_cached_user_context(session_id: str) -> tuple[Optional[str], Optional[di
         - If was_cached=True, skip Zep/DB lookups entirely
         - If was_cached=False, caller should fetch and cache
     """
-    ctx = get_session_context(session_id)
     if ctx.context_fetched:
         return ctx.user_name, ctx.user_context, True
     return None, None, False
 
 
-def cache_user_context(session_id: str, user_name: Optional[str], user_context: Optional[dict]):
+def cache_user_context(ctx: SessionContext, user_name: Optional[str], user_context: Optional[dict]):
     """
     Cache user context after first lookup.
     All subsequent messages in this session will skip Zep/DB calls.
     """
-    ctx = get_session_context(session_id)
     ctx.user_name = user_name
-    ctx.user_context = user_context
+    ctx.user_context = compact_user_context(user_context)
     ctx.context_fetched = True
     print(f"[SessionCache] Cached context for session: name={user_name}, facts={len(user_context.get('facts', [])) if user_context else 0}", file=sys.stderr)
 
 
-def prefetch_topic_content(session_id: str, topic: str, content: str, titles: list):
+async def store_user_context(session_id: str, user_name: Optional[str], user_context: Optional[dict]):
+    """cache_user_context for a session outside its turn (warm-up, late Zep results)."""
+    await update_session(session_id, lambda ctx: cache_user_context(ctx, user_name, user_context))
+
+
+# Pending late context writes (referenced so they aren't garbage collected)
+_late_context_stores: set[asyncio.Task] = set()
+
+
+def start_late_context_store(session_id: str, context_task: asyncio.Task):
+    """Cache a user context fetch that missed the turn's deadline once it lands."""
+    async def store_when_done():
+        try:
+            user_name, user_context = await context_task
+        except Exception:
+            return
+        await store_user_context(session_id, user_name, user_context)
+
+    task = asyncio.create_task(store_when_done())
+    _late_context_stores.add(task)
+    task.add_done_callback(_late_context_stores.discard)
+
+
+async def prefetch_topic_content(session_id: str, topic: str, content: str, titles: list):
     """
     Pre-fetch content for a suggested topic.
     When user says "yes", we can respond instantly without searching.
     """
-    ctx = get_session_context(session_id)
-    ctx.prefetched_topic = topic
-    ctx.prefetched_content = content
-    ctx.prefetched_titles = titles
+    def store(ctx: SessionContext):
+        ctx.prefetched_topic = topic
+        ctx.prefetched_content = content[:MAX_PREFETCHED_CHARS]
+        ctx.prefetched_titles = list(titles[:MAX_PREFETCHED_TITLES])
+
+    await update_session(session_id, store)
     print(f"[SessionCache] Pre-fetched content for '{topic}' ({len(content)} chars)", file=sys.stderr)
 
 
-def get_prefetched_content(session_id: str, query: str) -> tuple[Optional[str], Optional[list]]:
+# In-flight prefetch tasks per session (process-local, never part of SessionContext)
+_prefetch_tasks: dict[str, asyncio.Task] = {}
+PREFETCH_WAIT_SECONDS = 1.5  # How long "yes" waits for an unfinished prefetch
+prefetch_stats = {"started": 0, "hits": 0, "misses": 0, "cancelled": 0, "failed": 0}
+
+
+async def _prefetch_topic(session_id: str, topic: str):
+    """Search and assemble voice source material for a topic ahead of time."""
+    try:
+        results = await search_articles(topic, limit=3)
+        if results.articles:
+            sections = passage_sections(topic, results.articles, max_tokens=VOICE_CONTEXT_TOKENS)
+            await prefetch_topic_content(session_id, topic, "\n\n".join(sections), [a.title for a in results.articles])
+    except Exception as e:
+        prefetch_stats["failed"] += 1
+        print(f"[SessionCache] Prefetch for '{topic}' failed: {e}", file=sys.stderr)
+    finally:
+        if _prefetch_tasks.get(session_id) is asyncio.current_task():
+            del _prefetch_tasks[session_id]
+
+
+def start_topic_prefetch(session_id: str, topic: str):
+    """Launch a background prefetch for a topic ATLAS just suggested."""
+    cancel_topic_prefetch(session_id)
+    _prefetch_tasks[session_id] = asyncio.create_task(_prefetch_topic(session_id, topic))
+    prefetch_stats["started"] += 1
+
+
+def cancel_topic_prefetch(session_id: str):
+    """Cancel any in-flight prefetch (the user went somewhere else)."""
+    task = _prefetch_tasks.pop(session_id, None)
+    if task and not task.done():
+        task.cancel()
+        prefetch_stats["cancelled"] += 1
+
+
+async def take_prefetched_content(session_id: str, topic: str) -> tuple[Optional[str], Optional[list]]:
     """
-    Check if we have pre-fetched content matching the query.
-    Returns (content, titles) or (None, None) if no match.
+    Consume prefetched content for a topic, waiting briefly if still in flight.
+    Returns (content, titles) or (None, None) on a miss.
     """
-    ctx = get_session_context(session_id)
-    if ctx.prefetched_topic and query.lower() in ctx.prefetched_topic.lower():
-        return ctx.prefetched_content, ctx.prefetched_titles
+    task = _prefetch_tasks.get(session_id)
+    if task and not task.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(task), PREFETCH_WAIT_SECONDS)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+
+    # Take it from the store in one step: the prefetch wrote it there, and
+    # the next "yes" should not replay the same material
+    taken: dict = {}
+
+    def take(ctx: SessionContext):
+        if ctx.prefetched_topic and topic.lower() in ctx.prefetched_topic.lower() and ctx.prefetched_content:
+            taken["content"], taken["titles"] = ctx.prefetched_content, ctx.prefetched_titles
+            ctx.prefetched_topic, ctx.prefetched_content, ctx.prefetched_titles = "", "", []
+
+    await update_session(session_id, take)
+    if taken:
+        prefetch_stats["hits"] += 1
+        return taken["content"], taken["titles"]
+
+    prefetch_stats["misses"] += 1
     return None, None
 
 
-def set_last_suggestion(session_id: str, topic: str):
+def set_last_suggestion(ctx: SessionContext, topic: str):
     """Store the topic ATLAS just suggested (for handling 'yes' responses)."""
-    ctx = get_session_context(session_id)
     ctx.last_suggested_topic = topic
-    ctx.suggestions.append(topic)
+    ctx.suggestions = [*ctx.suggestions[-(MAX_SESSION_SUGGESTIONS - 1):], topic]
 
 
-def get_last_suggestion(session_id: str) -> Optional[str]:
+def get_last_suggestion(ctx: SessionContext) -> Optional[str]:
     """Get the last topic ATLAS suggested."""
-    ctx = get_session_context(session_id)
     return ctx.last_suggested_topic if ctx.last_suggested_topic else None
 
 
@@ -290,12 +462,57 @@ def get_zep_user_id(user_id: str) -> str:
     return f"relocation_{user_id}"
 
 
+# User-level context shared by every session and surface (CLM voice, CopilotKit chat),
+# so reconnects and page reloads skip the Zep search and the DB name lookup
+USER_CONTEXT_TTL_SECONDS = int(os.environ.get("USER_CONTEXT_TTL_SECONDS", "300"))
+USER_CONTEXT_CACHE_SIZE = 2000
+
+user_memory_cache: TTLCache[str, dict] = TTLCache(USER_CONTEXT_CACHE_SIZE, USER_CONTEXT_TTL_SECONDS)
+preferred_name_cache: TTLCache[str, str] = TTLCache(USER_CONTEXT_CACHE_SIZE, USER_CONTEXT_TTL_SECONDS)
+
+
+async def get_cached_preferred_name(user_id: str) -> Optional[str]:
+    """
+    Preferred name from the DB, cached per user. Only found names are cached:
+    None also means the lookup failed, and a user may set a name at any time.
+    """
+    name = preferred_name_cache.get(user_id)
+    if name is None:
+        name = await get_user_preferred_name(user_id)
+        if name:
+            preferred_name_cache.set(user_id, name)
+    return name
+
+
+# In-flight Zep searches by user ID - concurrent lookups share one search
+_memory_searches: dict[str, asyncio.Task] = {}
+_raced_searches: set[str] = set()  # Users whose in-flight search raced a memory write
+memory_lookup_stats = {"searches": 0, "coalesced": 0}
+
+
 async def get_user_memory(user_id: str) -> dict:
-    """Retrieve user's conversation history and interests from Zep."""
+    """Retrieve user's conversation history and interests from Zep (cached per user)."""
     client = get_zep_client()
     if not client:
         return {"found": False, "is_returning": False, "facts": []}
 
+    cached = user_memory_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    search = _memory_searches.get(user_id)
+    if search is None:
+        memory_lookup_stats["searches"] += 1
+        search = _memory_searches[user_id] = asyncio.create_task(_search_user_memory(client, user_id))
+        search.add_done_callback(lambda _: _memory_searches.pop(user_id, None))
+    else:
+        memory_lookup_stats["coalesced"] += 1
+    # Shielded - a caller giving up (deadline, cancelled run) doesn't cancel it for the others
+    return await asyncio.shield(search)
+
+
+async def _search_user_memory(client: "AsyncZep", user_id: str) -> dict:
+    """One Zep graph search for a user's facts; successful results are cached."""
     zep_user_id = get_zep_user_id(user_id)
     try:
         results = await client.graph.search(
@@ -305,47 +522,105 @@ async def get_user_memory(user_id: str) -> dict:
             scope="edges",
         )
 
+        # A successful search means the Zep user exists
+        _known_zep_users.add(zep_user_id)
+
         facts = []
         if results and hasattr(results, 'edges') and results.edges:
             facts = [edge.fact for edge in results.edges if hasattr(edge, 'fact') and edge.fact]
 
-        return {
+        memory = {
             "found": True,
             "is_returning": len(facts) > 0,
             "facts": facts[:10],  # Limit to 10 most relevant
             "user_name": extract_user_name_from_facts(facts),
         }
+        # Only successful searches are cached - errors are retried next turn, and a
+        # result that raced a memory write may already be stale
+        if user_id not in _raced_searches:
+            user_memory_cache.set(user_id, memory)
+        return memory
     except Exception as e:
         print(f"[ATLAS] Zep search error: {e}", file=sys.stderr)
         return {"found": False, "is_returning": False, "facts": []}
+    finally:
+        # Only held while a search is in flight
+        _raced_searches.discard(user_id)
 
 
-async def store_to_memory(user_id: str, message: str, role: str = "user") -> bool:
-    """Store conversation message to Zep for future context."""
-    client = get_zep_client()
-    if not client:
-        return False
+# Zep users known to exist in this process - skips existence checks
+_known_zep_users: set[str] = set()
+
+
+def _is_not_found(error: Exception) -> bool:
+    """True if a Zep API error is a 404 (unknown user)."""
+    return getattr(error, "status_code", None) == 404
+
+
+async def _add_to_graph(client: "AsyncZep", user_id: str, data: str) -> None:
+    """
+    Add message data to a user's Zep graph (raises on failure).
 
+    Steady state is a single graph.add. The user is only created when Zep
+    reports it doesn't exist, then the add is retried once.
+    """
     zep_user_id = get_zep_user_id(user_id)
+
     try:
-        # Ensure user exists
+        await client.graph.add(user_id=zep_user_id, type="message", data=data)
+    except Exception as e:
+        if zep_user_id in _known_zep_users or not _is_not_found(e):
+            raise
+        # First write for a new user - create it lazily, then retry
         try:
-            await client.user.get(zep_user_id)
-        except Exception:
             await client.user.add(user_id=zep_user_id)
+            print(f"[ATLAS] Created Zep user {zep_user_id}", file=sys.stderr)
+        except Exception as add_error:
+            # 409 means another request created it first
+            if getattr(add_error, "status_code", None) != 409:
+                raise
+        await client.graph.add(user_id=zep_user_id, type="message", data=data)
 
-        # Add message to graph
-        await client.graph.add(
-            user_id=zep_user_id,
-            type="message",
-            data=f"{role}: {message}",
-        )
+    _known_zep_users.add(zep_user_id)
+    # New facts - the next lookup should see them
+    if user_id in _memory_searches:
+        _raced_searches.add(user_id)
+    user_memory_cache.invalidate(user_id)
+
+
+async def store_to_memory(user_id: str, message: str, role: str = "user") -> bool:
+    """Store conversation message to Zep for future context (awaits the write)."""
+    client = get_zep_client()
+    if not client:
+        return False
+
+    try:
+        await _add_to_graph(client, user_id, f"{role}: {message}")
         return True
     except Exception as e:
         print(f"[ATLAS] Zep store error: {e}", file=sys.stderr)
         return False
 
 
+async def write_memory_batch(user_id: str, writes: List[MemoryWrite]) -> None:
+    """Persist a user's queued messages to Zep as one graph write."""
+    client = get_zep_client()
+    if not client:
+        return
+    await _add_to_graph(client, user_id, "\n".join(f"{w.role}: {w.message}" for w in writes))
+
+
+# Background Zep persistence - keeps memory writes off the response path
+memory_queue = MemoryWriteQueue(write_memory_batch)
+
+
+def queue_memory(user_id: str, message: str, role: str = "user") -> bool:
+    """Queue a conversation message for background persistence to Zep."""
+    if not get_zep_client():
+        return False
+    return memory_queue.enqueue(user_id, message, role)
+
+
 def extract_user_name_from_facts(facts: List[str]) -> Optional[str]:
     """Extract user's name from Zep facts."""
     import re
@@ -448,7 +723,7 @@ After exploring the destination in depth, end with a natural follow-up question:
 # AGENT STATE FOR COPILOTKIT (StateDeps pattern)
 # =============================================================================
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 class UserInfo(BaseModel):
     """User info synced from frontend via useCoAgent."""
@@ -464,7 +739,8 @@ class ATLASAgentState(BaseModel):
 
 # Import StateDeps for AG-UI integration
 try:
-    from pydantic_ai.ag_ui import StateDeps
+    from pydantic_ai.ag_ui import AGUIAdapter, StateDeps, handle_ag_ui_request
+    from ag_ui.core import RunAgentInput
     STATEDEPS_AVAILABLE = True
 except ImportError:
     STATEDEPS_AVAILABLE = False
@@ -482,11 +758,30 @@ class ATLASDeps:
     user_name: Optional[str] = None
     is_returning_user: bool = False
     user_facts: List[str] = field(default_factory=list)
+    system_prompt: str = ""  # Per-request prompt for pooled voice agents
+
+
+# Source material budgets (tokens) for query-aware passage retrieval
+VOICE_CONTEXT_TOKENS = 450  # Voice answers are 2-3 sentences - keep the prompt lean
+TOOL_CONTEXT_TOKENS = 1000  # Chat tools can afford a little more depth
 
 
-def build_system_prompt(user_context: Optional[dict] = None) -> str:
-    """Build system prompt with optional returning user context."""
-    base_prompt = ATLAS_SYSTEM_PROMPT
+def build_tool_source(query: str, articles: list, model: Optional[str] = None):
+    """Budget tool source content per guide; later guides are dropped first."""
+    builder = PromptBuilder(model, budget=min(TOOL_CONTEXT_TOKENS, get_input_budget(model) // 4))
+    for rank, section in enumerate(passage_sections(query, articles, max_tokens=TOOL_CONTEXT_TOKENS)):
+        builder.add(f"guide_{rank + 1}", ("\n\n" if rank else "") + section, PRIORITY_HIGH if rank == 0 else PRIORITY_MEDIUM + rank)
+    return builder.build()
+
+
+def add_system_prompt_sections(builder: PromptBuilder, user_context: Optional[dict] = None) -> PromptBuilder:
+    """
+    Add the ATLAS persona and returning-user context to a prompt builder.
+
+    The top 3 remembered facts are kept with the greeting rules; older facts
+    go in their own low-priority section so they are dropped first.
+    """
+    builder.add("persona", ATLAS_SYSTEM_PROMPT, PRIORITY_REQUIRED, role="system")
 
     if user_context and user_context.get("is_returning"):
         facts = user_context.get("facts", [])
@@ -497,22 +792,54 @@ def build_system_prompt(user_context: Optional[dict] = None) -> str:
 ## RETURNING USER CONTEXT
 This user has spoken to you before. What you remember about them:
 """
-        for fact in facts[:10]:
+        for fact in facts[:3]:
             returning_context += f"- {fact}\n"
+        builder.add("returning_facts", returning_context, PRIORITY_HIGH, role="system")
+        builder.add("older_facts", "".join(f"- {fact}\n" for fact in facts[3:10]), PRIORITY_LOW, role="system")
 
-        returning_context += """
+        greeting_rules = """
 GREETING RULES FOR RETURNING USER:
 - DO NOT say "Hello" or give a full introduction
 - Instead: "Ah, welcome back! """
         if user_name:
-            returning_context += f"Good to see you again, {user_name}. "
-        returning_context += """Last time we discussed [topic from facts]. Shall we continue, or explore something new?"
+            greeting_rules += f"Good to see you again, {user_name}. "
+        greeting_rules += """Last time we discussed [topic from facts]. Shall we continue, or explore something new?"
 - Reference their past interests naturally
 - Make them feel recognized and valued
 """
-        base_prompt += returning_context
+        builder.add("greeting_rules", greeting_rules, PRIORITY_HIGH, role="system")
 
-    return base_prompt
+    return builder
+
+
+def build_system_prompt(user_context: Optional[dict] = None, model: Optional[str] = None) -> str:
+    """Build system prompt with optional returning user context, within the model's budget."""
+    return add_system_prompt_sections(PromptBuilder(model), user_context).build().system
+
+
+def build_voice_prompt(
+    model: str,
+    user_context: Optional[dict],
+    source_sections: List[str],
+    user_msg: str,
+):
+    """
+    Assemble the CLM system and user prompts for a model.
+
+    The best-ranked guide is kept over the rest; later guides and older
+    facts are dropped first when the model's input budget is tight.
+    """
+    builder = add_system_prompt_sections(PromptBuilder(model), user_context)
+
+    builder.add("source_header", "SOURCE MATERIAL:\n", PRIORITY_REQUIRED)
+    for rank, section in enumerate(source_sections):
+        priority = PRIORITY_HIGH if rank == 0 else PRIORITY_MEDIUM + rank
+        builder.add(f"guide_{rank + 1}", section + "\n\n", priority)
+    builder.add("question", f"""USER QUESTION: {user_msg}
+
+Respond in 2-3 sentences. Use ONLY the source material. Be engaging.""", PRIORITY_REQUIRED)
+
+    return builder.build()
 
 
 # =============================================================================
@@ -527,6 +854,25 @@ agent = Agent(
 )
 
 
+# =============================================================================
+# VOICE AGENT POOL (CLM endpoint)
+# =============================================================================
+
+def build_voice_agent(model: Model) -> Agent:
+    """Build a voice agent whose system prompt comes from deps, not construction."""
+    voice_agent = Agent(model, deps_type=ATLASDeps, retries=2)
+
+    @voice_agent.instructions
+    def voice_instructions(ctx: RunContext[ATLASDeps]) -> str:
+        return ctx.deps.system_prompt or ATLAS_SYSTEM_PROMPT
+
+    return voice_agent
+
+
+# One long-lived agent per model - per-user prompts are injected via ATLASDeps
+voice_agents: AgentPool[Agent] = AgentPool(build_voice_agent)
+
+
 # =============================================================================
 # AGENT TOOLS - Return UI components via Generative UI
 # =============================================================================
@@ -550,13 +896,11 @@ async def search_destinations(ctx: RunContext[ATLASDeps], query: str) -> dict:
             "message": "I don't have any articles about that topic in my collection."
         }
 
-    # Build context for the LLM
-    context_parts = []
+    # Build context for the LLM from the passages that answer the query
+    source = build_tool_source(query, results.articles[:3], ctx.model.model_name)
     article_cards = []
 
     for article in results.articles[:3]:
-        context_parts.append(f"## {article.title}\n{article.content[:2000]}")
-
         # Extract location and era for rich UI
         location = extract_location_from_content(article.content, article.title)
         era = extract_era_from_content(article.content)
@@ -586,7 +930,8 @@ async def search_destinations(ctx: RunContext[ATLASDeps], query: str) -> dict:
     return {
         "found": True,
         "query": results.query,
-        "source_content": "\n\n".join(context_parts),
+        "source_content": source.user,
+        "source_tokens": source.token_count,
         "articles": article_cards,
         "ui_component": "ArticleGrid",  # Tells frontend to render ArticleGrid
     }
@@ -624,32 +969,13 @@ async def show_map(ctx: RunContext[ATLASDeps], location_name: str) -> dict:
     Args:
         location_name: The name of the destination to show
     """
-    # Key relocation destinations
-    LOCATIONS = {
-        "cyprus": MapLocation(name="Cyprus", lat=35.1264, lng=33.4299,
-                               description="Cyprus - Mediterranean island with favorable tax regime and digital nomad visa."),
-        "lisbon": MapLocation(name="Lisbon", lat=38.7223, lng=-9.1393,
-                               description="Lisbon, Portugal - Popular for D7 visa and digital nomads."),
-        "portugal": MapLocation(name="Portugal", lat=39.3999, lng=-8.2245,
-                                 description="Portugal - D7 visa, NHR tax regime, popular expat destination."),
-        "dubai": MapLocation(name="Dubai", lat=25.2048, lng=55.2708,
-                              description="Dubai, UAE - Tax-free income, digital nomad visa."),
-        "malta": MapLocation(name="Malta", lat=35.9375, lng=14.3754,
-                              description="Malta - EU member, English-speaking, digital nomad visa."),
-        "spain": MapLocation(name="Spain", lat=40.4168, lng=-3.7038,
-                              description="Spain - Popular for Beckham Law tax benefits."),
-        "netherlands": MapLocation(name="Netherlands", lat=52.3676, lng=4.9041,
-                                    description="Netherlands - 30% ruling tax benefit for expats."),
-    }
-
-    location_key = location_name.lower()
-    for key, loc in LOCATIONS.items():
-        if key in location_key or location_key in key:
-            return {
-                "found": True,
-                "location": loc.model_dump(),
-                "ui_component": "DestinationMap",
-            }
+    match = match_key(reference_pack().map_locations, location_name)
+    if match:
+        return {
+            "found": True,
+            "location": match[1].model_dump(),
+            "ui_component": "DestinationMap",
+        }
 
     return {
         "found": False,
@@ -898,18 +1224,7 @@ async def get_current_user_name(ctx: RunContext[ATLASDeps]) -> dict:
 
     Returns the user's name if known, or indicates they haven't shared it.
     """
-    # First check global cache from middleware (CopilotKit instructions)
-    global _current_user_context
-    if _current_user_context.get("user_name"):
-        name = _current_user_context["user_name"]
-        print(f"[ATLAS Tool] Found user name in cache: {name}", file=sys.stderr)
-        return {
-            "found": True,
-            "name": name,
-            "response_hint": f"The user's name is {name}. Respond warmly."
-        }
-
-    # Second, check if name is in deps
+    # First check deps (filled per request from the CopilotKit instructions)
     if ctx.deps.user_name:
         return {
             "found": True,
@@ -918,9 +1233,9 @@ async def get_current_user_name(ctx: RunContext[ATLASDeps]) -> dict:
         }
 
     # Try to look up from database if we have user_id
-    user_id = _current_user_context.get("user_id") or ctx.deps.user_id
+    user_id = ctx.deps.user_id
     if user_id:
-        name = await get_user_preferred_name(user_id)
+        name = await get_cached_preferred_name(user_id)
         if name:
             print(f"[ATLAS Tool] Found user name in DB: {name}", file=sys.stderr)
             return {
@@ -969,8 +1284,30 @@ async def delegate_to_destination_expert(ctx: RunContext[ATLASDeps], request: st
     )
 
     try:
+        # Clear lookups skip the expert LLM - run the surface function directly
+        plan = plan_expert_request(request)
+        if plan:
+            start = time.perf_counter()
+            ui_data = await run_expert_plan(plan, expert_deps)
+            # A timed-out search is reported as such - the sub-agent would only hit it again
+            if ui_data.get("found") or ui_data.get("timed_out"):
+                expert_stats.record("fast_path", time.perf_counter() - start)
+                print(f"[ATLAS] Destination Expert fast path: {plan.tool}({plan.topic!r})", file=sys.stderr)
+                return {
+                    "speaker": "destination_expert",
+                    "content": expert_brief(ui_data),
+                    "ui_component": ui_data.get("ui_component"),
+                    "ui_data": ui_data,
+                    "found": bool(ui_data.get("found")),
+                }
+            # Nothing found that way - let the expert try other tools
+            expert_stats.fallbacks += 1
+
         # Run the Destination Expert agent
-        result = await destination_expert_agent.run(request, deps=expert_deps)
+        start = time.perf_counter()
+        route = route_turn(request, "expert")
+        result = await destination_expert_agent.run(request, deps=expert_deps, model=get_model(route.model))
+        expert_stats.record("sub_agent", time.perf_counter() - start)
 
         # Extract the response
         response_text = result.output if hasattr(result, 'output') else str(result.data)
@@ -1018,11 +1355,20 @@ async def delegate_to_destination_expert(ctx: RunContext[ATLASDeps], request: st
 # =============================================================================
 
 import logging
+from contextlib import asynccontextmanager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("atlas")
 logger.setLevel(logging.INFO)
 
-app = FastAPI(title="ATLAS - Relocation Quest Agent")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks for long-lived clients."""
+    yield
+    await memory_queue.drain()
+    await close_provider_clients()
+
+
+app = FastAPI(title="ATLAS - Relocation Quest Agent", lifespan=lifespan)
 logger.info("DEPLOY VERSION: 2026-01-07-relocation-quest")
 
 app.add_middleware(
@@ -1038,46 +1384,114 @@ app.add_middleware(
 # CLM ENDPOINT FOR HUME EVI (OpenAI-compatible SSE) - ATLAS
 # =============================================================================
 
-async def stream_sse_response(content: str, msg_id: str) -> AsyncGenerator[str, None]:
-    """Stream OpenAI-compatible SSE chunks for Hume EVI."""
-    words = content.split(' ')
-    for i, word in enumerate(words):
-        chunk = {
-            "id": msg_id,
-            "object": "chat.completion.chunk",
-            "choices": [{
-                "index": 0,
-                "delta": {"content": word + (' ' if i < len(words) - 1 else '')},
-                "finish_reason": None
-            }]
-        }
-        yield f"data: {json.dumps(chunk)}\n\n"
+async def stream_sse_response(content: str, msg_id: str) -> AsyncGenerator[bytes, None]:
+    """Stream OpenAI-compatible SSE chunks for Hume EVI, one phrase per frame."""
+    encoder = SSEEncoder(msg_id)
+    for frame in encoder.frames(content):
+        yield frame
 
     # Final chunk with finish_reason
-    yield f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
-    yield "data: [DONE]\n\n"
+    yield SSE_STOP
+    yield SSE_DONE
+
+
+async def stream_agent_sse_response(
+    deltas: AsyncIterator[str],
+    msg_id: str,
+    collected: List[str],
+    on_complete: Optional[Callable[[str], None]] = None,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream LLM text to Hume as it arrives, coalesced into phrases.
+
+    Deltas are appended to `collected` so the full reply can be persisted
+    once the stream has closed (see StreamingResponse background task).
+    `on_complete` gets the full reply only if the run finished cleanly.
+    """
+    encoder = SSEEncoder(msg_id)
+    chunker = PhraseChunker()
+    try:
+        async for delta in deltas:
+            collected.append(delta)
+            for phrase in chunker.feed(delta):
+                yield encoder.frame(phrase)
+        if on_complete and collected:
+            on_complete("".join(collected))
+    except Exception as e:
+        print(f"[ATLAS CLM] Stream error after {len(collected)} chunks: {e}", file=sys.stderr)
+        if not collected:
+            yield encoder.frame("I'm having a bit of trouble searching my records at the moment. Could you try asking again?")
+
+    for phrase in chunker.flush():
+        yield encoder.frame(phrase)
+    yield SSE_STOP
+    yield SSE_DONE
+
+
+# Fixed CLM replies, pre-rendered to SSE bytes at startup ({name} = user name)
+CANNED_REPLIES: dict[str, CannedReply] = {key: CannedReply(text) for key, text in {
+    "greeting_returning": "Welcome back to Relocation Quest, {name}! Lovely to hear from you again. Which destination shall we explore today?",
+    "greeting_named": "Welcome to Relocation Quest, {name}! I'm ATLAS, your guide to moving abroad. Shall I tell you about Portugal, one of the most popular destinations for digital nomads?",
+    "greeting_anonymous": "Welcome to Relocation Quest! I'm ATLAS, your AI relocation advisor. I can help with visas, cost of living, and finding your perfect destination. Shall I tell you about Cyprus, a Mediterranean gem with great tax benefits?",
+    "explore": "What would you like to explore? I've got guides on Portugal, Cyprus, Dubai, and 50+ other destinations.",
+    "name_known": "You're {name}, of course! Now, which destination would you like to explore?",
+    "name_unknown": "I don't believe you've told me your name yet. What should I call you?",
+    "identity": (
+        "I'm ATLAS, your AI relocation advisor at Relocation Quest. I help people navigate "
+        "international relocation - from digital nomad visas to cost of living comparisons. I've got guides on "
+        "50+ destinations including Portugal, Cyprus, Dubai, Spain, and more. I can help with visa requirements, "
+        "tax implications, cost of living, and quality of life factors. Where are you thinking of relocating?"
+    ),
+    "no_suggestion": "What would you like to hear about? I've got guides on Portugal, Cyprus, Dubai, Spain, and 50+ other destinations.",
+    "no_guides": "I don't seem to have any guides about that destination yet. Would you like to explore something else? I've got detailed info on Portugal, Cyprus, Dubai, Spain, and many other popular destinations.",
+    "error": "I'm having a bit of trouble searching my records at the moment. Could you try asking again?",
+}.items()}
+
+
+def canned_response(key: str, user_name: Optional[str] = None) -> Response:
+    """Serve a pre-rendered reply in a single write."""
+    return Response(
+        CANNED_REPLIES[key].render(str(uuid.uuid4()), user_name),
+        media_type="text/event-stream",
+    )
+
+
+# Answers to popular questions, reused across users (see answer_cache.py)
+answer_cache = AnswerCache()
+
+
+async def store_conversation(user_id: Optional[str], user_msg: str, collected: List[str]):
+    """Queue a streamed exchange for Zep after the response has been sent."""
+    response_text = "".join(collected)
+    if user_id and len(user_msg) > 5 and response_text:
+        # Store user message
+        queue_memory(user_id, user_msg, "user")
+        # Store ATLAS's response (summarized)
+        queue_memory(user_id, response_text[:500], "assistant")
 
 
 # Debug endpoint
-@app.get("/debug/greeting-check")
-async def debug_greeting():
-    """Debug endpoint to check greeting detection."""
-    from .tools import normalize_query
-    test_queries = ["hello", "hi", "hey", "speak your greeting", "howdy", "Hello"]
+@app.get("/debug/intent-check")
+async def debug_intent_check(q: Optional[str] = None):
+    """Debug endpoint to check intent routing (and time the classifier)."""
+    test_queries = [q] if q else [
+        "hello", "hi", "speak your greeting", "what's my name", "who are you",
+        "yes", "tell me more", "tell me about portugal", "compare portugal and spain",
+        "what visa do i need for lisbon", "cost of living in new zealand",
+    ]
     results = {}
-    for q in test_queries:
-        normalized = normalize_query(q)
-        normalized_lower = normalized.lower().strip()
-        is_greeting = (
-            "speak your greeting" in q.lower() or
-            normalized_lower in ["hello", "hi", "hey", "hiya", "howdy", "greetings", "start"] or
-            normalized_lower.startswith("hello ") or
-            normalized_lower.startswith("hi ")
-        )
-        results[q] = {
+    for query in test_queries:
+        normalized = normalize_query(query)
+        start = time.perf_counter()
+        match = classify_intent(normalized)
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+        results[query] = {
             "normalized": normalized,
-            "normalized_lower": normalized_lower,
-            "is_greeting": is_greeting
+            "intent": match.intent.value,
+            "destinations": list(match.destinations),
+            "city": match.city,
+            "phrase": match.phrase,
+            "classify_us": round(elapsed_us, 1),
         }
     return results
 
@@ -1178,6 +1592,64 @@ def extract_user_name_from_messages(messages: list) -> Optional[str]:
     return None
 
 
+# Per-branch deadlines for the first-turn pipeline (seconds)
+USER_CONTEXT_DEADLINE_SECONDS = 1.5  # Zep facts + preferred name
+SEARCH_DEADLINE_SECONDS = 4.0  # Embedding + guide search
+
+
+def likely_destinations(facts: List[str], limit: int = MAX_SESSION_INTERESTS) -> List[str]:
+    """Destinations the user's Zep facts mention, most mentioned first."""
+    counts: Counter = Counter()
+    for fact in facts:
+        counts.update(find_destinations(tokenize(fact)))
+    return [destination_display_name(slug) for slug, _ in counts.most_common(limit)]
+
+
+async def fetch_user_context(user_id: str, user_name: Optional[str]) -> tuple[Optional[str], Optional[dict]]:
+    """
+    Fetch Zep memory and the preferred name in parallel.
+
+    Returns:
+        (user_name, user_context) - user_name keeps the caller's value if set
+    """
+    async def safe_get_memory():
+        try:
+            return await get_user_memory(user_id)
+        except Exception as e:
+            print(f"[ATLAS CLM] Zep lookup failed: {e}", file=sys.stderr)
+            return None
+
+    async def safe_get_name():
+        try:
+            return await get_cached_preferred_name(user_id)
+        except Exception as e:
+            print(f"[ATLAS CLM] DB name lookup failed: {e}", file=sys.stderr)
+            return None
+
+    # Run BOTH in parallel - cuts ~500ms latency
+    async def noop():
+        return None
+
+    user_context, db_name = await asyncio.gather(
+        safe_get_memory(),
+        safe_get_name() if not user_name else noop()
+    )
+
+    if user_context:
+        if user_context.get("user_name") and not user_name:
+            user_name = user_context["user_name"]
+        if not user_context.get("interests"):
+            # Copy - the memory dict is shared through the user cache
+            user_context = {**user_context, "interests": likely_destinations(user_context.get("facts", []))}
+        print(f"[ATLAS CLM] User context: returning={user_context.get('is_returning')}, facts={len(user_context.get('facts', []))}", file=sys.stderr)
+
+    if db_name and not user_name:
+        user_name = db_name
+        print(f"[ATLAS CLM] Got name from Neon DB: {user_name}", file=sys.stderr)
+
+    return user_name, user_context
+
+
 @app.post("/chat/completions")
 async def clm_endpoint(request: Request):
     """
@@ -1187,33 +1659,47 @@ async def clm_endpoint(request: Request):
     Now with Zep memory integration for returning user recognition.
     """
     logger.info("CLM endpoint called!")
-    global _last_request_debug
-
+    trace = start_trace("clm")
+    try:
+        response = await run_clm_turn(request, trace)
+    except Exception:
+        trace.finish("exception")
+        raise
+    finally:
+        turn = getattr(request.state, "session_turn", None)
+        if turn is not None:
+            await save_session_turn(turn)
+    if trace and not isinstance(response, StreamingResponse):
+        trace.size("response_bytes", len(response.body))
+    return finish_with_response(trace, response)
+
+
+async def run_clm_turn(request: Request, trace) -> Response:
+    """Handle one CLM turn, recording stages on the (possibly null) trace."""
     body = await request.json()
     messages = body.get("messages", [])
 
-    # Store for debugging
-    import time
-    _last_request_debug = {
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-        "messages_count": len(messages),
-        "body_keys": list(body.keys()),
-        "query_params": dict(request.query_params),
-        "headers": {k: v for k, v in request.headers.items() if k.lower() in [
-            "x-custom-session-id", "x-session-id", "custom-session-id",
-            "authorization", "content-type", "x-hume-session-id", "x-hume-custom-session-id"
-        ]},
-        "session_settings": body.get("session_settings", {}),
-        "metadata": body.get("metadata", {}),
-        "custom_session_id": body.get("custom_session_id") or body.get("customSessionId"),
-        "messages": [
-            {
-                "role": m.get("role"),
-                "content_preview": str(m.get("content", ""))[:500]
-            }
-            for m in messages
-        ],
-    }
+    # Request summary for debugging (sampled requests only)
+    if trace:
+        trace.set(**{
+            "messages_count": len(messages),
+            "body_keys": list(body.keys()),
+            "query_params": dict(request.query_params),
+            "headers": {k: v for k, v in request.headers.items() if k.lower() in [
+                "x-custom-session-id", "x-session-id", "custom-session-id",
+                "authorization", "content-type", "x-hume-session-id", "x-hume-custom-session-id"
+            ]},
+            "session_settings": body.get("session_settings", {}),
+            "metadata": body.get("metadata", {}),
+            "custom_session_id": body.get("custom_session_id") or body.get("customSessionId"),
+            "messages": [
+                {
+                    "role": m.get("role"),
+                    "content_preview": str(m.get("content", ""))[:500]
+                }
+                for m in messages
+            ],
+        })
 
     # Extract user message
     user_msg = next(
@@ -1241,256 +1727,268 @@ async def clm_endpoint(request: Request):
         if len(parts) > 1:
             user_id = parts[1].split('_')[0] if parts[1] else None
 
-    # ==========================================================================
-    # CRITICAL: CHECK SESSION CACHE FIRST (makes follow-ups instant!)
-    # User context is fetched ONCE on first message, then cached.
-    # ==========================================================================
-    cached_name, cached_context, was_cached = get_cached_user_context(session_id or "default")
-
-    if was_cached:
-        # FAST PATH: Use cached context, skip Zep/DB entirely
-        print(f"[ATLAS CLM] ⚡ CACHE HIT - skipping Zep/DB lookups (instant!)", file=sys.stderr)
-        if cached_name and not user_name:
-            user_name = cached_name
-        user_context = cached_context
-    else:
-        # SLOW PATH (first message only): Fetch and cache
-        print(f"[ATLAS CLM] 🔍 First message - fetching user context...", file=sys.stderr)
-        user_context = None
-        db_name = None
-
-        if user_id:
-            import asyncio
-
-            async def safe_get_memory():
-                try:
-                    return await get_user_memory(user_id)
-                except Exception as e:
-                    print(f"[ATLAS CLM] Zep lookup failed: {e}", file=sys.stderr)
-                    return None
-
-            async def safe_get_name():
-                try:
-                    return await get_user_preferred_name(user_id)
-                except Exception as e:
-                    print(f"[ATLAS CLM] DB name lookup failed: {e}", file=sys.stderr)
-                    return None
-
-            # Run BOTH in parallel - cuts ~500ms latency
-            async def noop():
-                return None
-
-            user_context, db_name = await asyncio.gather(
-                safe_get_memory(),
-                safe_get_name() if not user_name else noop()
-            )
-
-            if user_context:
-                if user_context.get("user_name") and not user_name:
-                    user_name = user_context["user_name"]
-                print(f"[ATLAS CLM] User context: returning={user_context.get('is_returning')}, facts={len(user_context.get('facts', []))}", file=sys.stderr)
-
-            if db_name and not user_name:
-                user_name = db_name
-                print(f"[ATLAS CLM] Got name from Neon DB: {user_name}", file=sys.stderr)
-
-        # CACHE the results for all future messages in this session
-        cache_user_context(session_id or "default", user_name, user_context)
-
-    # Log final name resolution
-    _last_request_debug["user_name_resolved"] = user_name
-    _last_request_debug["user_id"] = user_id
-    print(f"[ATLAS CLM] Final user_name: {user_name}, user_id: {user_id}, cached: {was_cached}", file=sys.stderr)
-
     # Normalize query with phonetic corrections
     normalized_query = normalize_query(user_msg)
     print(f"[ATLAS CLM] Query: '{user_msg}' -> '{normalized_query}'", file=sys.stderr)
 
-    # No easter egg for this persona
-
-    # Greeting detection
+    # Intent routing (greeting, name, identity, affirmation, deterministic lookups)
     # Hume sends "speak your greeting" or user says "hello"
-    normalized_lower = normalized_query.lower().strip()
-    user_msg_lower = user_msg.lower()
-    is_greeting_request = (
-        "speak your greeting" in user_msg_lower or
-        normalized_lower in ["hello", "hi", "hey", "hiya", "howdy", "greetings", "start"] or
-        normalized_lower.startswith("hello ") or
-        normalized_lower.startswith("hi ")
-    )
-    logger.info(f"Greeting check: user_msg='{user_msg}', normalized='{normalized_lower}', is_greeting={is_greeting_request}")
-
-    if is_greeting_request:
-        ctx = get_session_context(session_id or "default")
-        if not ctx.greeted_this_session:
-            # First greeting this session - personalize based on user context
-            is_returning = user_context.get("is_returning", False) if user_context else False
-            user_interests = user_context.get("interests", []) if user_context else []
-
-            if is_returning and user_name and user_interests:
-                # Returning user with known interests - suggest their topic!
-                suggested_topic = user_interests[0]  # Most recent interest
-                response_text = f"Welcome back, {user_name}! I remember you were interested in {suggested_topic}. Shall we explore that further, or would you like to discover something new?"
-                # STORE the suggestion so "yes" works
-                set_last_suggestion(session_id or "default", suggested_topic)
-                mark_name_used(session_id or "default", in_greeting=True)
-                print(f"[ATLAS CLM] Suggesting topic from Zep: {suggested_topic}", file=sys.stderr)
-            elif is_returning and user_name:
-                # Returning user with name (no interests yet)
-                response_text = f"Welcome back to Relocation Quest, {user_name}! Lovely to hear from you again. Which destination shall we explore today?"
-                mark_name_used(session_id or "default", in_greeting=True)
-            elif user_name:
-                # New user with name - suggest Portugal
-                response_text = f"Welcome to Relocation Quest, {user_name}! I'm ATLAS, your guide to moving abroad. Shall I tell you about Portugal, one of the most popular destinations for digital nomads?"
-                set_last_suggestion(session_id or "default", "Portugal")
-                mark_name_used(session_id or "default", in_greeting=True)
-            else:
-                # Anonymous user - suggest Cyprus
-                response_text = "Welcome to Relocation Quest! I'm ATLAS, your AI relocation advisor. I can help with visas, cost of living, and finding your perfect destination. Shall I tell you about Cyprus, a Mediterranean gem with great tax benefits?"
-                set_last_suggestion(session_id or "default", "Cyprus")
-
-            ctx.greeted_this_session = True
-            print(f"[ATLAS CLM] Greeting: user_name={user_name}, is_returning={is_returning}, interests={user_interests}", file=sys.stderr)
-        else:
-            # Already greeted - don't re-greet
-            response_text = "What would you like to explore? I've got guides on Portugal, Cyprus, Dubai, and 50+ other destinations."
-
-        return StreamingResponse(
-            stream_sse_response(response_text, str(uuid.uuid4())),
-            media_type="text/event-stream"
-        )
+    intent = classify_intent(normalized_query)
+    logger.info(f"Intent: user_msg='{user_msg}', normalized='{normalized_query}', intent={intent.intent.value}, destinations={intent.destinations}")
 
-    # User asking their own name - use session context
-    name_questions = ["what is my name", "what's my name", "do you know my name", "who am i"]
-    is_name_question = any(nq in normalized_query.lower() for nq in name_questions)
+    # Open questions need a guide search that doesn't depend on who the user
+    # is - start it now so it overlaps with the user context fetch below
+    search_task = None
+    if intent.intent == Intent.QUESTION:
+        search_task = asyncio.create_task(search_articles(normalized_query, limit=3))
 
-    if is_name_question:
-        if user_name:
-            response_text = f"You're {user_name}, of course! Now, which destination would you like to explore?"
+    # An early exit (or exception) must not leave the search running unobserved
+    try:
+        # ==========================================================================
+        # CRITICAL: CHECK SESSION CACHE FIRST (makes follow-ups instant!)
+        # User context is fetched ONCE on first message, then cached.
+        # ==========================================================================
+        # One session load per turn; clm_endpoint saves what the turn changed
+        turn = await load_session_turn(session_id or "default")
+        request.state.session_turn = turn
+        session = turn.ctx
+        cached_name, cached_context, was_cached = get_cached_user_context(session)
+
+        if was_cached:
+            # FAST PATH: Use cached context, skip Zep/DB entirely
+            print(f"[ATLAS CLM] ⚡ CACHE HIT - skipping Zep/DB lookups (instant!)", file=sys.stderr)
+            if cached_name and not user_name:
+                user_name = cached_name
+            user_context = cached_context
         else:
-            response_text = "I don't believe you've told me your name yet. What should I call you?"
-        return StreamingResponse(
-            stream_sse_response(response_text, str(uuid.uuid4())),
-            media_type="text/event-stream"
-        )
-
-    # Identity/meta questions about ATLAS - handle before guide search
-    identity_keywords = ["who are you", "what are you", "your name", "about yourself",
-                         "what can you help with", "what do you do",
-                         "tell me about you", "introduce yourself"]
-    is_identity_question = any(kw in normalized_query.lower() for kw in identity_keywords)
-
-    if is_identity_question:
-        response_text = """I'm ATLAS, your AI relocation advisor at Relocation Quest. I help people navigate
-international relocation - from digital nomad visas to cost of living comparisons. I've got guides on
-50+ destinations including Portugal, Cyprus, Dubai, Spain, and more. I can help with visa requirements,
-tax implications, cost of living, and quality of life factors. Where are you thinking of relocating?"""
-        return StreamingResponse(
-            stream_sse_response(response_text.replace('\n', ' '), str(uuid.uuid4())),
-            media_type="text/event-stream"
-        )
-
-    # ==========================================================================
-    # AFFIRMATION HANDLING: "yes", "sure", "go on" -> use last suggested topic
-    # ==========================================================================
-    AFFIRMATION_WORDS = {
-        "yes", "yeah", "yep", "yup", "sure", "okay", "ok", "please", "aye",
-        "absolutely", "definitely", "certainly", "indeed", "alright", "right",
-    }
-    AFFIRMATION_PHRASES = {
-        "go on", "tell me more", "go ahead", "yes please", "sure thing",
-        "of course", "i'd like that", "i would like that", "sounds good", "sounds great",
-        "let's do it", "let's hear it", "why not", "i'm interested", "please do",
-    }
+            # SLOW PATH (first message only): Fetch and cache, bounded by a deadline
+            print(f"[ATLAS CLM] 🔍 First message - fetching user context...", file=sys.stderr)
+            user_context = None
 
-    # Check if this is a pure affirmation (exact match only - no partial matching)
-    # Removed "tell me" as it conflicts with "tell me about X" queries
-    is_affirmation = (
-        normalized_lower in AFFIRMATION_WORDS or
-        normalized_lower in AFFIRMATION_PHRASES
-    )
+            if user_id:
+                context_start = time.perf_counter()
+                context_task = asyncio.create_task(fetch_user_context(user_id, user_name))
+                try:
+                    user_name, user_context = await asyncio.wait_for(asyncio.shield(context_task), USER_CONTEXT_DEADLINE_SECONDS)
+                    # CACHE the results for all future messages in this session
+                    cache_user_context(session, user_name, user_context)
+                except asyncio.TimeoutError:
+                    # Answer without it; cache it for the next turn when it lands
+                    print(f"[ATLAS CLM] User context missed {USER_CONTEXT_DEADLINE_SECONDS}s deadline - continuing without it", file=sys.stderr)
+                    start_late_context_store(session_id or "default", context_task)
+                trace.mark("user_context", context_start)
+            else:
+                cache_user_context(session, user_name, user_context)
+
+        # Log final name resolution
+        trace.set(user_name_resolved=user_name, user_id=user_id, intent=intent.intent.value, context_cached=was_cached)
+        print(f"[ATLAS CLM] Final user_name: {user_name}, user_id: {user_id}, cached: {was_cached}", file=sys.stderr)
+
+        # No easter egg for this persona
+
+        if intent.intent == Intent.GREETING:
+            if not session.greeted_this_session:
+                # First greeting this session - personalize based on user context
+                is_returning = user_context.get("is_returning", False) if user_context else False
+                user_interests = user_context.get("interests", []) if user_context else []
+
+                if is_returning and user_name and user_interests:
+                    # Returning user with known interests - suggest their topic!
+                    suggested_topic = user_interests[0]  # Most recent interest
+                    # The topic varies per user, so this greeting is encoded per request
+                    reply_key = None
+                    response_text = f"Welcome back, {user_name}! I remember you were interested in {suggested_topic}. Shall we explore that further, or would you like to discover something new?"
+                    # STORE the suggestion so "yes" works
+                    set_last_suggestion(session, suggested_topic)
+                    start_topic_prefetch(session_id or "default", suggested_topic)
+                    mark_name_used(session, in_greeting=True)
+                    print(f"[ATLAS CLM] Suggesting topic from Zep: {suggested_topic}", file=sys.stderr)
+                elif is_returning and user_name:
+                    # Returning user with name (no interests yet)
+                    reply_key = "greeting_returning"
+                    mark_name_used(session, in_greeting=True)
+                elif user_name:
+                    # New user with name - suggest Portugal
+                    reply_key = "greeting_named"
+                    set_last_suggestion(session, "Portugal")
+                    start_topic_prefetch(session_id or "default", "Portugal")
+                    mark_name_used(session, in_greeting=True)
+                else:
+                    # Anonymous user - suggest Cyprus
+                    reply_key = "greeting_anonymous"
+                    set_last_suggestion(session, "Cyprus")
+                    start_topic_prefetch(session_id or "default", "Cyprus")
+
+                mark_greeted(session)
+                print(f"[ATLAS CLM] Greeting: user_name={user_name}, is_returning={is_returning}, interests={user_interests}", file=sys.stderr)
+            else:
+                # Already greeted - don't re-greet
+                reply_key = "explore"
+
+            trace.set(outcome=f"canned:{reply_key or 'greeting_topic'}")
+            if reply_key is None:
+                return StreamingResponse(
+                    stream_sse_response(response_text, str(uuid.uuid4())),
+                    media_type="text/event-stream"
+                )
+            return canned_response(reply_key, user_name)
+
+        # User asking their own name - use session context
+        if intent.intent == Intent.NAME_QUESTION:
+            reply_key = "name_known" if user_name else "name_unknown"
+            trace.set(outcome=f"canned:{reply_key}")
+            return canned_response(reply_key, user_name)
+
+        # Identity/meta questions about ATLAS - handle before guide search
+        if intent.intent == Intent.IDENTITY:
+            trace.set(outcome="canned:identity")
+            return canned_response("identity")
+
+        # ==========================================================================
+        # AFFIRMATION HANDLING: "yes", "sure", "go on" -> use last suggested topic
+        # ==========================================================================
+        prefetched_content = None
+        if intent.intent == Intent.AFFIRMATION:
+            last_suggestion = get_last_suggestion(session)
+            if last_suggestion:
+                print(f"[ATLAS CLM] ⚡ Affirmation '{intent.phrase}' -> using last suggestion: '{last_suggestion}'", file=sys.stderr)
+                # Replace query with the suggested topic
+                normalized_query = last_suggestion
+                # Use the speculative prefetch if it landed (skips the search)
+                prefetched_content, _ = await take_prefetched_content(session_id or "default", last_suggestion)
+            else:
+                # No suggestion stored - ask what they want
+                trace.set(outcome="canned:no_suggestion")
+                return canned_response("no_suggestion")
 
-    if is_affirmation:
-        last_suggestion = get_last_suggestion(session_id or "default")
-        if last_suggestion:
-            print(f"[ATLAS CLM] ⚡ Affirmation '{normalized_lower}' -> using last suggestion: '{last_suggestion}'", file=sys.stderr)
-            # Replace query with the suggested topic
-            normalized_query = last_suggestion
         else:
-            # No suggestion stored - ask what they want
-            response_text = "What would you like to hear about? I've got guides on Portugal, Cyprus, Dubai, Spain, and 50+ other destinations."
-            return StreamingResponse(
-                stream_sse_response(response_text, str(uuid.uuid4())),
-                media_type="text/event-stream"
-            )
-
-    # Increment turn counter for name spacing
-    increment_turn(session_id)
-
-    # Search for relevant articles
-    try:
-        results = await search_articles(normalized_query, limit=3)
-
-        if results.articles:
-            # Build context from articles
-            context = "\n\n".join([
-                f"## {a.title}\n{a.content[:1500]}"
-                for a in results.articles[:2]
-            ])
-
-            # Create deps with user context
-            deps = ATLASDeps(
-                state=AppState(),
-                user_id=user_id,
-                user_name=user_name,
-                is_returning_user=user_context.get("is_returning", False) if user_context else False,
-                user_facts=user_context.get("facts", []) if user_context else [],
-            )
-
-            # Build dynamic system prompt for returning users
-            dynamic_prompt = build_system_prompt(user_context)
-
-            # Create a temporary agent with the dynamic prompt
-            # Use Groq for faster voice responses, fallback to Gemini
-            groq_key = os.environ.get("GROQ_API_KEY", "")
-            model = 'groq:llama-3.1-8b-instant' if groq_key else 'google-gla:gemini-2.0-flash'
-            temp_agent = Agent(
-                model,
-                deps_type=ATLASDeps,
-                system_prompt=dynamic_prompt,
-                retries=2,
-            )
-
-            # Run the agent with context - shorter for voice (faster TTS)
-            prompt = f"""SOURCE MATERIAL:
-{context}
-
-USER QUESTION: {user_msg}
-
-Respond in 2-3 sentences. Use ONLY the source material. Be engaging."""
-
-            result = await temp_agent.run(prompt, deps=deps)
-            response_text = result.output
-
-            # Store conversation to Zep memory (async, don't await)
-            if user_id and len(user_msg) > 5:
-                # Store user message
-                await store_to_memory(user_id, user_msg, "user")
-                # Store ATLAS's response (summarized)
-                await store_to_memory(user_id, response_text[:500], "assistant")
+            # The user went elsewhere - a pending prefetch is no longer useful
+            cancel_topic_prefetch(session_id or "default")
+
+        # ==========================================================================
+        # DETERMINISTIC LOOKUPS: compare / visa / cost -> answer from destinations table
+        # ==========================================================================
+        if intent.intent in (Intent.COMPARE, Intent.VISA, Intent.COST):
+            answer = await answer_intent(intent)
+            if answer:
+                print(f"[ATLAS CLM] ⚡ Deterministic {intent.intent.value} answer for {intent.destinations} (no LLM)", file=sys.stderr)
+                increment_turn(session)
+                # The closing question offers a follow-up - get it ready for "yes"
+                set_last_suggestion(session, answer.follow_up_topic)
+                start_topic_prefetch(session_id or "default", answer.follow_up_topic)
+                await store_conversation(user_id, user_msg, [answer.text])
+                trace.set(outcome=f"fast_answer:{intent.intent.value}")
+                trace.size("response_chars", len(answer.text))
+                return StreamingResponse(
+                    stream_sse_response(answer.text, str(uuid.uuid4())),
+                    media_type="text/event-stream"
+                )
+
+        # Increment turn counter for name spacing
+        increment_turn(session)
+
+        # Search for relevant articles
+        try:
+            search_embedding = None
+            source_articles = []
+            if prefetched_content:
+                print(f"[ATLAS CLM] ⚡ PREFETCH HIT for '{normalized_query}' - skipping search", file=sys.stderr)
+                source_sections = [prefetched_content]
+            else:
+                search_start = time.perf_counter()
+                if search_task is None:
+                    search_task = asyncio.create_task(search_articles(normalized_query, limit=3))
+                results = await asyncio.wait_for(search_task, SEARCH_DEADLINE_SECONDS)
+                trace.mark("search_wait", search_start)
+                search_embedding = results.embedding
+                source_articles = results.articles
+                # Passages relevant to the question, grouped per guide
+                source_sections = passage_sections(normalized_query, results.articles, max_tokens=VOICE_CONTEXT_TOKENS) if results.articles else []
+                trace.size("articles", len(results.articles))
+
+            if source_sections:
+
+                # Create deps with user context
+                deps = ATLASDeps(
+                    state=AppState(),
+                    user_id=user_id,
+                    user_name=user_name,
+                    is_returning_user=user_context.get("is_returning", False) if user_context else False,
+                    user_facts=user_context.get("facts", []) if user_context else [],
+                )
+
+                # Fastest model for simple lookups, stronger for comparisons/advice;
+                # the rest of the routed list hedges for the primary
+                route = route_turn(normalized_query, "voice")
+                models = route.models
+                model = route.model
+                trace.set(route=f"{route.complexity.value} -> {model}")
+
+                # Build token-budgeted prompts (dynamic system prompt for returning users)
+                built = build_voice_prompt(model, user_context, source_sections, user_msg)
+                trace.size("prompt_tokens", built.token_count)
+                trace.set(prompt_dropped=built.dropped)
+
+                # Same guides, same persona, similar question -> reuse the answer
+                # (never for prompts carrying a returning user's facts)
+                personalized = bool(user_context and user_context.get("is_returning"))
+
+                def cache_key(model_name: str) -> str:
+                    return source_key(f"{model_name}:{hash(built.system)}", source_articles)
+
+                cached_answer = answer_cache.lookup(cache_key(model), search_embedding, personalized)
+                if cached_answer:
+                    trace.set(outcome="answer_cache")
+                    trace.size("response_chars", len(cached_answer))
+                    await store_conversation(user_id, user_msg, [cached_answer])
+                    return StreamingResponse(
+                        stream_sse_response(cached_answer, str(uuid.uuid4())),
+                        media_type="text/event-stream"
+                    )
+
+                # Pooled agents per model - the per-user prompt travels in deps
+                setup_start = time.perf_counter()
+                candidates = [(name, voice_agents.get(name)) for name in models]
+                deps.system_prompt = built.system
+                trace.mark("agent_setup", setup_start)
+
+                # Stream the agent's reply - shorter for voice (faster TTS)
+                # Zep persistence runs as a background task once the stream closes
+                collected: List[str] = []
+                answered_by: List[str] = []  # The hedge may answer from a secondary model
+
+                def on_complete(answer: str):
+                    # Keyed on the model that actually answered
+                    key = cache_key(answered_by[0] if answered_by else model)
+                    answer_cache.store(key, normalized_query, search_embedding, answer, personalized)
+                    trace.size("response_chars", len(answer))
+
+                trace.set(outcome="llm")
+                return StreamingResponse(
+                    stream_agent_sse_response(
+                        hedged_stream(candidates, built.user, deps, on_winner=answered_by.append), str(uuid.uuid4()), collected,
+                        on_complete=on_complete,
+                    ),
+                    media_type="text/event-stream",
+                    background=BackgroundTask(store_conversation, user_id, user_msg, collected),
+                )
 
-        else:
-            response_text = "I don't seem to have any guides about that destination yet. Would you like to explore something else? I've got detailed info on Portugal, Cyprus, Dubai, Spain, and many other popular destinations."
+            else:
+                reply_key = "no_guides"
 
-    except Exception as e:
-        print(f"[ATLAS CLM] Error: {e}", file=sys.stderr)
-        response_text = "I'm having a bit of trouble searching my records at the moment. Could you try asking again?"
+        except Exception as e:
+            print(f"[ATLAS CLM] Error: {e}", file=sys.stderr)
+            reply_key = "error"
+            trace.set(error=str(e)[:200])
 
-    msg_id = str(uuid.uuid4())
-    return StreamingResponse(
-        stream_sse_response(response_text, msg_id),
-        media_type="text/event-stream"
-    )
+        trace.set(outcome=f"canned:{reply_key}")
+        return canned_response(reply_key)
+    finally:
+        if search_task is not None:
+            if not search_task.done():
+                search_task.cancel()
+            elif not search_task.cancelled():
+                search_task.exception()  # Retrieved, so a failure isn't logged as unhandled
 
 
 # =============================================================================
@@ -1540,43 +2038,21 @@ def extract_user_from_instructions(content: str) -> dict:
     return context
 
 
-@app.middleware("http")
-async def extract_user_context_middleware(request: Request, call_next):
-    """
-    Middleware to extract user context from CopilotKit's instructions.
-    CopilotKit sends instructions as a system message in the request body.
-    """
-    global _current_user_context
+def last_user_message(messages: list) -> Optional[str]:
+    """Text of the latest user message in an AG-UI run."""
+    for msg in reversed(messages):
+        if isinstance(msg, dict) and msg.get("role") == "user":
+            content = msg.get("content")
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                return " ".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return None
 
-    # Only process AG-UI requests
-    if request.url.path.startswith("/agui"):
-        try:
-            # Read request body
-            body_bytes = await request.body()
-            if body_bytes:
-                body = json.loads(body_bytes)
-                messages = body.get("messages", [])
-
-                # Look for CopilotKit instructions in system messages
-                for msg in messages:
-                    if msg.get("role") == "system":
-                        content = msg.get("content", "")
-                        if isinstance(content, str) and "User Name:" in content:
-                            extracted = extract_user_from_instructions(content)
-                            if extracted:
-                                _current_user_context = extracted
-                                print(f"[ATLAS AG-UI] Extracted user context: {extracted}", file=sys.stderr)
-
-                # Reconstruct request with body
-                from starlette.requests import Request as StarletteRequest
-                scope = request.scope
-                async def receive():
-                    return {"type": "http.request", "body": body_bytes}
-                request = StarletteRequest(scope, receive)
-        except Exception as e:
-            print(f"[ATLAS AG-UI] Middleware error: {e}", file=sys.stderr)
 
-    return await call_next(request)
+# User context from CopilotKit's instructions, parsed once per run (pure ASGI,
+# so the SSE responses stream without BaseHTTPMiddleware in the way)
+app.add_middleware(AGUIContextMiddleware, extract_user=extract_user_from_instructions)
 
 
 # =============================================================================
@@ -1586,6 +2062,47 @@ async def extract_user_context_middleware(request: Request, call_next):
 if STATEDEPS_AVAILABLE:
     from textwrap import dedent
 
+    # Instructions are rebuilt for every model request - don't hold one up on Zep
+    INSTRUCTIONS_MEMORY_DEADLINE_SECONDS = 0.8
+
+    @dataclass
+    class ATLASStateDeps(StateDeps[ATLASAgentState]):
+        """StateDeps for one AG-UI run, plus the user extracted from its instructions."""
+        user_context: dict = field(default_factory=dict)
+        memory_lookup: Optional[asyncio.Task] = None  # This run's Zep lookup, shared by instructions and tools
+
+    async def run_memory(deps: StateDeps[ATLASAgentState], user_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Zep memory for this run - looked up once, then reused by every
+        instructions call and tool in the run.
+
+        Returns None if the lookup is still running after `timeout` seconds
+        (it keeps going, so later calls in the run get the result).
+        """
+        lookup = getattr(deps, "memory_lookup", None)
+        if lookup is None:
+            lookup = asyncio.create_task(get_user_memory(user_id))
+            if isinstance(deps, ATLASStateDeps):
+                deps.memory_lookup = lookup
+        try:
+            return await asyncio.wait_for(asyncio.shield(lookup), timeout)
+        except asyncio.TimeoutError:
+            logger.info(f"[ATLAS CopilotKit] Zep memory not ready within {timeout}s - continuing without it")
+            return None
+
+    def request_user(deps: StateDeps[ATLASAgentState]) -> Optional[UserInfo]:
+        """The run's user - frontend state first, then the CopilotKit instructions."""
+        if deps.state.user:
+            return deps.state.user
+        user_context = getattr(deps, "user_context", None) or {}
+        if user_context.get("user_id"):
+            return UserInfo(
+                id=user_context["user_id"],
+                name=user_context.get("user_name", ""),
+                email=user_context.get("email", ""),
+            )
+        return None
+
     # Create a CopilotKit-specific agent that uses StateDeps
     copilotkit_agent = Agent(
         'google-gla:gemini-2.0-flash',
@@ -1596,20 +2113,25 @@ if STATEDEPS_AVAILABLE:
     @copilotkit_agent.instructions
     async def atlas_copilotkit_instructions(ctx: RunContext[StateDeps[ATLASAgentState]]) -> str:
         """Dynamic instructions with proactive Zep context."""
-        state = ctx.deps.state
-        user = state.user
+        user = request_user(ctx.deps)
         logger.info(f"CopilotKit instructions - user: {user}")
 
         # Proactively fetch Zep memory if user is logged in
         user_context = ""
         if user and user.id:
-            memory = await get_user_memory(user.id)
-            facts = memory.get("facts", [])
-            logger.info(f"[ATLAS CopilotKit] Zep memory for {user.id}: returning={memory.get('is_returning')}, facts_count={len(facts)}")
+            memory = await run_memory(ctx.deps, user.id, timeout=INSTRUCTIONS_MEMORY_DEADLINE_SECONDS)
+            facts = memory.get("facts", []) if memory else []
+            if memory:
+                logger.info(f"[ATLAS CopilotKit] Zep memory for {user.id}: returning={memory.get('is_returning')}, facts_count={len(facts)}")
             if facts:
                 logger.info(f"[ATLAS CopilotKit] First 3 facts: {facts[:3]}")
 
-            if memory.get("is_returning") and facts:
+            if memory is None:
+                user_context = f"""
+## USER CONTEXT
+- User Name: {user.name}
+"""
+            elif memory.get("is_returning") and facts:
                 user_context = f"""
 ## RETURNING USER CONTEXT
 - User Name: {user.name}
@@ -1695,10 +2217,9 @@ In this chat, keep it SHORT:
         if not results.articles:
             return {"found": False, "message": "No guides found"}
 
-        context_parts = []
+        source = build_tool_source(query, results.articles[:3], ctx.model.model_name)
         article_cards = []
         for article in results.articles[:3]:
-            context_parts.append(f"## {article.title}\n{article.content[:2000]}")
             article_cards.append({
                 "id": article.id, "title": article.title,
                 "excerpt": article.content[:200] + "...", "score": article.score,
@@ -1706,7 +2227,7 @@ In this chat, keep it SHORT:
 
         return {
             "found": True, "query": results.query,
-            "source_content": "\n\n".join(context_parts),
+            "source_content": source.user, "source_tokens": source.token_count,
             "articles": article_cards, "ui_component": "ArticleGrid",
         }
 
@@ -1722,8 +2243,7 @@ In this chat, keep it SHORT:
         - "What's my email?"
         - Any question about their personal info
         """
-        state = ctx.deps.state
-        user = state.user
+        user = request_user(ctx.deps)
         logger.info(f"get_my_profile called - user: {user}")
 
         if user and user.id:
@@ -1752,15 +2272,14 @@ In this chat, keep it SHORT:
         - "What do I like?"
         - "What topics interest me?"
         """
-        state = ctx.deps.state
-        user = state.user
+        user = request_user(ctx.deps)
         logger.info(f"get_my_interests called - user: {user}")
 
         if not user or not user.id:
             return {"found": False, "interests": [], "response_hint": "You don't know the user yet."}
 
-        # Get facts from Zep memory
-        memory = await get_user_memory(user.id)
+        # Get facts from Zep memory (already looked up for this run's instructions)
+        memory = await run_memory(ctx.deps, user.id)
         facts = memory.get("facts", [])
 
         if facts:
@@ -1783,15 +2302,14 @@ In this chat, keep it SHORT:
         - "What have we discussed?"
         - "Do you remember what I asked?"
         """
-        state = ctx.deps.state
-        user = state.user
+        user = request_user(ctx.deps)
         logger.info(f"get_conversation_history called - user: {user}")
 
         if not user or not user.id:
             return {"found": False, "topics": [], "response_hint": "You don't know the user yet."}
 
         # Get facts from Zep memory - these include topics discussed
-        memory = await get_user_memory(user.id)
+        memory = await run_memory(ctx.deps, user.id)
         facts = memory.get("facts", [])
 
         # Filter for topic-related facts
@@ -1835,14 +2353,19 @@ In this chat, keep it SHORT:
         logger.info(f"[ATLAS CopilotKit] Searching for topic: {topic}")
 
         try:
-            # Import here to avoid circular imports
-            from .tools import search_articles, extract_location_from_content, extract_era_from_content
-            from .database import get_topic_image
-
-            # Search for articles
-            results = await search_articles(topic, limit=5)
+            # Search, topic image and gazetteer run concurrently
+            research = await research_destination(topic)
 
-            if not results.articles:
+            if research.search_timed_out:
+                return {
+                    "speaker": "destination_expert",
+                    "found": False,
+                    "timed_out": True,
+                    "content": f"The guide search for {topic} timed out - please try again in a moment.",
+                    "ui_component": None,
+                    "ui_data": None,
+                }
+            if not research.articles:
                 return {
                     "speaker": "destination_expert",
                     "found": False,
@@ -1853,9 +2376,8 @@ In this chat, keep it SHORT:
 
             # Build article cards
             article_cards = []
-            top_article = results.articles[0]
 
-            for article in results.articles[:3]:
+            for article in research.articles[:3]:
                 location = extract_location_from_content(article.content, article.title)
                 era = extract_era_from_content(article.content)
                 img_url = article.hero_image_url
@@ -1875,10 +2397,8 @@ In this chat, keep it SHORT:
                     "era": era,
                 })
 
-            # Get hero image - from top article or fallback to topic_images
-            hero_image = top_article.hero_image_url
-            if not hero_image:
-                hero_image = await get_topic_image(topic)
+            # Hero image - from top article or topic_images (merged by the pipeline)
+            hero_image = research.hero_image
 
             # Unsplash fallback if still no image
             if not hero_image:
@@ -1887,31 +2407,17 @@ In this chat, keep it SHORT:
                 hero_image = f"https://source.unsplash.com/1600x900/?travel,{safe_topic},destination"
                 logger.info(f"[ATLAS CopilotKit] Using Unsplash fallback for: {topic}")
 
-            # Extract location and era from top article
-            location = extract_location_from_content(top_article.content, top_article.title)
-            era = extract_era_from_content(top_article.content)
+            # Location (gazetteer, else top article) and era from the pipeline
+            location = research.location
+            era = research.visa_type
 
             # Build timeline if we have an era
             timeline_events = None
             if era:
                 era_lower = era.lower()
-                TIMELINES = {
-                    "victorian": [
-                        {"year": 1837, "title": "Queen Victoria's Coronation", "description": "Beginning of the Victorian era"},
-                        {"year": 1851, "title": "Great Exhibition", "description": "Crystal Palace opens in Hyde Park"},
-                        {"year": 1863, "title": "First Underground", "description": "Metropolitan Railway opens"},
-                        {"year": 1876, "title": "Royal Aquarium Opens", "description": "Entertainment venue in Westminster"},
-                        {"year": 1901, "title": "End of Era", "description": "Death of Queen Victoria"},
-                    ],
-                    "georgian": [
-                        {"year": 1714, "title": "George I", "description": "House of Hanover begins"},
-                        {"year": 1750, "title": "Westminster Bridge", "description": "Second Thames crossing opens"},
-                        {"year": 1830, "title": "End of Era", "description": "Death of George IV"},
-                    ],
-                }
-                for key, events in TIMELINES.items():
+                for key, events in reference_pack().era_timelines.items():
                     if key in era_lower:
-                        timeline_events = events
+                        timeline_events = payloads(events)
                         break
 
             # Log what we found
@@ -1927,6 +2433,7 @@ In this chat, keep it SHORT:
                 "location": location.model_dump() if location else None,
                 "era": era,
                 "timeline_events": timeline_events,
+                "timings_ms": research.timings_ms,
                 "brief": f"I found {len(article_cards)} articles about {topic}." + (f" {articles_with_images} include historic images." if articles_with_images > 0 else ""),
             }
 
@@ -2247,15 +2754,123 @@ In this chat, keep it SHORT:
             "trigger_phase_change": "confirmed",
         }
 
-    # Create AG-UI app with StateDeps
-    agui_app = copilotkit_agent.to_ag_ui(deps=StateDeps(ATLASAgentState()))
-    app.mount("/agui", agui_app)
+    # AG-UI endpoint with StateDeps (model routed per turn, deps per request)
+    agui_agent = copilotkit_agent
+
+    def agui_deps(user_context: dict) -> ATLASStateDeps:
+        return ATLASStateDeps(ATLASAgentState(), user_context=user_context)
+
+    @app.post("/agui")
+    @app.post("/agui/")
+    async def agui_endpoint(request: Request):
+        """CopilotKit AG-UI runs - simple turns go to the faster model."""
+        # Parsed once by AGUIContextMiddleware
+        body = getattr(request.state, "agui_body", None)
+        if not isinstance(body, dict):
+            # Unparseable body - let the AG-UI handler produce the error response
+            return await handle_ag_ui_request(agui_agent, request, deps=agui_deps({}))
+
+        route = route_turn(last_user_message(body.get("messages", [])), "chat")
+        # Fresh deps per run - the adapter writes the run's state into them
+        deps = agui_deps(getattr(request.state, "user_context", {}))
+        try:
+            adapter = AGUIAdapter(agent=agui_agent, run_input=RunAgentInput.model_validate(body),
+                                  accept=request.headers.get("accept"))
+        except ValidationError as e:
+            return Response(content=e.json(), media_type="application/json", status_code=422)
+        return adapter.streaming_response(adapter.run_stream(model=get_model(route.model), deps=deps))
+
     logger.info("CopilotKit AG-UI endpoint ready with StateDeps")
 else:
-    # Fallback without StateDeps
-    agui_app = agent.to_ag_ui(deps=ATLASDeps(state=AppState()))
-    app.mount("/agui", agui_app)
-    logger.info("CopilotKit AG-UI endpoint ready (no StateDeps)")
+    # The AG-UI handlers come from the same import - no /agui route without it
+    logger.warning("pydantic_ai.ag_ui unavailable - CopilotKit AG-UI endpoint disabled")
+
+
+# =============================================================================
+# LOGIN WARM-UP
+# =============================================================================
+
+# In-flight warm-ups by user ID (one per user at a time)
+_warmup_tasks: dict[str, asyncio.Task] = {}
+warmup_stats = {"started": 0, "already_running": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+
+def service_user(request: Request) -> Optional[tuple[str, Optional[str]]]:
+    """
+    (user_id, user_name) asserted by the Next.js server, or None.
+
+    The agent doesn't see the browser's auth session, so the caller must be
+    the Next.js server - proven by AGENT_SERVICE_TOKEN as a bearer token
+    (closed when unset) - which puts the user from its verified session in
+    X-User-Id / X-User-Name.
+    """
+    token = os.environ.get("AGENT_SERVICE_TOKEN")
+    supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        return None
+    user_id = request.headers.get("x-user-id", "").strip()
+    if not user_id:
+        return None
+    return user_id, request.headers.get("x-user-name") or None
+
+
+async def _warm_user_context(user_id: str, user_name: Optional[str]):
+    """Fetch Zep facts, the preferred name and likely destinations into the caches."""
+    try:
+        # Fills the per-user memory and name caches (shared by voice and chat)
+        user_name, user_context = await fetch_user_context(user_id, user_name)
+        warmup_stats["completed"] += 1
+        print(f"[ATLAS Warmup] {user_id}: name={user_name}, "
+              f"destinations={user_context.get('interests') if user_context else []}", file=sys.stderr)
+    except Exception as e:
+        warmup_stats["failed"] += 1
+        print(f"[ATLAS Warmup] {user_id} failed: {e}", file=sys.stderr)
+    finally:
+        _warmup_tasks.pop(user_id, None)
+
+
+@app.post("/warmup")
+async def warmup_user_context(request: Request):
+    """
+    Start warming the signed-in user's context and return immediately.
+
+    Called by the Next.js /api/agent-warmup route at login / page load (see
+    service_user), so the first voice or chat turn finds the user's memory
+    and name already cached.
+    """
+    caller = service_user(request)
+    if caller is None:
+        warmup_stats["rejected"] += 1
+        return Response(content=json.dumps({"detail": "Forbidden"}), media_type="application/json", status_code=403)
+    user_id, user_name = caller
+
+    if user_id in _warmup_tasks:
+        warmup_stats["already_running"] += 1
+        return {"status": "warming"}
+
+    _warmup_tasks[user_id] = asyncio.create_task(_warm_user_context(user_id, user_name))
+    warmup_stats["started"] += 1
+    return {"status": "started"}
+
+
+# =============================================================================
+# REFERENCE DATA PACK
+# =============================================================================
+
+@app.post("/admin/reference-pack/reload")
+async def reload_reference_pack(request: Request):
+    """Reload the reference data pack from disk now (needs X-Admin-Token)."""
+    denied = admin_denied(request)
+    if denied:
+        return denied
+    reloaded = reference_packs.reload()
+    return {"reloaded": reloaded, **reference_packs.metrics()}
+
+
+@app.get("/debug/reference-pack")
+async def debug_reference_pack():
+    """Live reference data pack version, table sizes and reload counters."""
+    return reference_packs.metrics()
 
 
 # =============================================================================
@@ -2275,11 +2890,112 @@ async def health_check():
     return {"status": "healthy"}
 
 
-# Store last request for debugging
-_last_request_debug: dict = {"status": "no requests yet"}
+@app.get("/debug/prefetch")
+async def debug_prefetch():
+    """Speculative topic prefetch counters and hit rate."""
+    lookups = prefetch_stats["hits"] + prefetch_stats["misses"]
+    return {
+        **prefetch_stats,
+        "in_flight": len(_prefetch_tasks),
+        "hit_rate": round(prefetch_stats["hits"] / lookups, 3) if lookups else None,
+    }
+
+
+@app.get("/debug/sse-bench")
+async def debug_sse_bench(q: Optional[str] = None, rounds: int = 200):
+    """Benchmark the phrase SSE encoder against word-per-frame encoding."""
+    content = q or (
+        "Portugal's D7 visa is designed for people with passive income, such as pensions, rentals or dividends. "
+        "You'll need to show around 820 euros a month, plus savings, and the first residence permit lasts two years. "
+        "After five years you can apply for permanent residency or citizenship - would you like to hear about Lisbon?"
+    )
+    return benchmark_encoders(content, rounds=min(max(rounds, 1), 5000))
+
+
+@app.get("/debug/answer-cache")
+async def debug_answer_cache():
+    """Semantic answer cache size, counters and hit rate."""
+    return answer_cache.metrics()
+
+
+@app.get("/debug/llm-latency")
+async def debug_llm_latency():
+    """Per-model first-token latency distributions and hedging counters."""
+    return latency_metrics()
+
+
+@app.get("/debug/routing")
+async def debug_routing(q: Optional[str] = None):
+    """Model routing policy and turn counts (or how a query would be routed)."""
+    if q:
+        voice, chat = route_turn(q, "voice", record=False), route_turn(q, "chat", record=False)
+        return {"query": q, "complexity": voice.complexity.value, "features": voice.features,
+                "voice": voice.models, "chat": chat.models}
+    return routing_metrics()
+
+
+@app.get("/debug/expert")
+async def debug_expert(q: Optional[str] = None):
+    """Destination Expert fast-path ratio and latency saved (or how a request would be planned)."""
+    if q:
+        plan = plan_expert_request(q)
+        return {"request": q, "fast_path": plan is not None, "tool": plan.tool if plan else None,
+                "topic": plan.topic if plan else None}
+    return expert_stats.metrics()
+
+
+@app.get("/debug/destination-pipeline")
+async def debug_destination_pipeline():
+    """Per-stage timings (search, topic image, gazetteer, merge) of destination research."""
+    return pipeline_metrics()
+
+
+@app.get("/debug/sessions")
+async def debug_sessions():
+    """Session store backend, live session count and approximate bytes."""
+    return await session_store.load_metrics()
+
+
+@app.get("/debug/user-cache")
+async def debug_user_cache():
+    """Hit rates for the per-user Zep memory and preferred name caches."""
+    return {
+        "memory": user_memory_cache.metrics(),
+        "preferred_name": preferred_name_cache.metrics(),
+        "zep_searches": {**memory_lookup_stats, "in_flight": len(_memory_searches)},
+        "warmups": {**warmup_stats, "in_flight": len(_warmup_tasks)},
+    }
+
+
+@app.get("/debug/memory-queue")
+async def debug_memory_queue():
+    """Zep write-behind queue depth, drops and retry counters."""
+    return memory_queue.metrics()
+
+
+def admin_denied(request: Request) -> Optional[Response]:
+    """A 403 unless the request carries X-Admin-Token matching ADMIN_TOKEN (closed when unset)."""
+    admin_token = os.environ.get("ADMIN_TOKEN")
+    supplied = request.headers.get("x-admin-token", "")
+    if admin_token and hmac.compare_digest(supplied.encode(), admin_token.encode()):
+        return None
+    return Response(content=json.dumps({"detail": "Forbidden"}), media_type="application/json", status_code=403)
 
 
 @app.get("/debug/last-request")
-async def debug_last_request():
-    """Return the last request received for debugging."""
-    return _last_request_debug
+async def debug_last_request(request: Request):
+    """Return the last traced CLM request for debugging (needs X-Admin-Token)."""
+    denied = admin_denied(request)
+    if denied:
+        return denied
+    traces = recent_traces(1, endpoint="clm")
+    return traces[0] if traces else {"status": "no traced requests yet", "sample_rate": TRACE_SAMPLE_RATE}
+
+
+@app.get("/debug/traces")
+async def debug_traces(request: Request, n: int = 20, endpoint: Optional[str] = None):
+    """The last N sampled request traces, newest first (needs X-Admin-Token)."""
+    denied = admin_denied(request)
+    if denied:
+        return denied
+    return {"sample_rate": TRACE_SAMPLE_RATE, "traces": recent_traces(min(max(n, 1), 100), endpoint)}
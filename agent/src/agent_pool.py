@@ -0,0 +1,105 @@
+"""Long-lived LLM models and agents, shared across requests.
+
+Building a Pydantic AI agent from a model string creates the provider client
+each time - ~60ms for Gemini (google-genai Client setup), plus re-reading API
+keys from the environment. Models are built once per name here, each provider
+gets one keep-alive HTTP client, and agents are cached per model so request
+handlers only inject per-user context through deps.
+"""
+
+import os
+import sys
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+import httpx
+from pydantic_ai import Agent
+from pydantic_ai.models import Model
+
+AgentT = TypeVar("AgentT", bound=Agent)
+
+# Keep-alive HTTP clients per provider (connection reuse across requests)
+_provider_clients: dict[str, httpx.AsyncClient] = {}
+
+# Built models per "provider:model" name
+_models: dict[str, Model] = {}
+
+PROVIDER_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=120.0)
+PROVIDER_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+def get_provider_http_client(provider: str) -> httpx.AsyncClient:
+    """Get or create the persistent HTTP client for a provider."""
+    client = _provider_clients.get(provider)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=PROVIDER_HTTP_LIMITS, timeout=PROVIDER_HTTP_TIMEOUT)
+        _provider_clients[provider] = client
+    return client
+
+
+def get_model(model_name: str) -> Model:
+    """
+    Get or build a model for a "provider:model" name.
+
+    Groq and Google models get the shared keep-alive client; any other
+    provider falls back to Pydantic AI's own model inference.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    start = time.perf_counter()
+    provider, _, name = model_name.partition(":")
+    if provider == "groq":
+        from pydantic_ai.models.groq import GroqModel
+        from pydantic_ai.providers.groq import GroqProvider
+        model = GroqModel(name, provider=GroqProvider(
+            api_key=os.environ.get("GROQ_API_KEY"),
+            http_client=get_provider_http_client(provider),
+        ))
+    elif provider == "google-gla":
+        from pydantic_ai.models.google import GoogleModel
+        from pydantic_ai.providers.google import GoogleProvider
+        model = GoogleModel(name, provider=GoogleProvider(
+            api_key=os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY"),
+            http_client=get_provider_http_client(provider),
+        ))
+    else:
+        from pydantic_ai.models import infer_model
+        model = infer_model(model_name)
+
+    _models[model_name] = model
+    print(f"[ATLAS Pool] Built model {model_name} in {(time.perf_counter() - start) * 1000:.1f}ms", file=sys.stderr)
+    return model
+
+
+class AgentPool(Generic[AgentT]):
+    """
+    Registry of agents keyed by model name.
+
+    The factory builds an agent for a model; per-request context must come
+    from deps (e.g. via @agent.instructions), never from construction.
+    """
+
+    def __init__(self, factory: Callable[[Model], AgentT]):
+        self._factory = factory
+        self._agents: dict[str, AgentT] = {}
+
+    def get(self, model_name: str) -> AgentT:
+        """Get the agent for a model, building it on first use."""
+        agent = self._agents.get(model_name)
+        if agent is None:
+            agent = self._factory(get_model(model_name))
+            self._agents[model_name] = agent
+        return agent
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+
+async def close_provider_clients() -> None:
+    """Close the shared provider HTTP clients (on shutdown)."""
+    for provider, client in list(_provider_clients.items()):
+        if not client.is_closed:
+            await client.aclose()
+        _provider_clients.pop(provider, None)
@@ -0,0 +1,120 @@
+"""Pure ASGI middleware that reads the user context from AG-UI run bodies.
+
+CopilotKit sends the signed-in user inside a system message of each /agui
+run. The middleware buffers the (size-capped) body once, parses it once,
+looks only at the system messages, and puts both the parsed body and the
+extracted user context into the request state for the endpoint. Every other
+request - including the SSE stream of the response - passes straight
+through, without the task and stream wrapping of BaseHTTPMiddleware.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Optional
+
+AGUI_MAX_BODY_BYTES = int(os.environ.get("AGUI_MAX_BODY_BYTES", str(4 * 1024 * 1024)))
+USER_CONTEXT_MARKER = "User Name:"  # Only system messages containing this are parsed
+
+
+def system_user_context(body: Any, extract: Callable[[str], dict]) -> dict:
+    """User context from the latest system message that carries one."""
+    messages = body.get("messages") if isinstance(body, dict) else None
+    for msg in reversed(messages or []):
+        if not isinstance(msg, dict) or msg.get("role") != "system":
+            continue
+        content = msg.get("content")
+        if isinstance(content, str) and USER_CONTEXT_MARKER in content:
+            extracted = extract(content)
+            if extracted:
+                return extracted
+    return {}
+
+
+class AGUIContextMiddleware:
+    """
+    Parse /agui bodies once and expose them as request.state.agui_body and
+    request.state.user_context. Bodies over max_body_bytes get a 413.
+    """
+
+    def __init__(
+        self,
+        app: Callable,
+        extract_user: Callable[[str], dict],
+        path_prefix: str = "/agui",
+        max_body_bytes: int = AGUI_MAX_BODY_BYTES,
+    ):
+        self.app = app
+        self.extract_user = extract_user
+        self.path_prefix = path_prefix
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(scope, receive)
+        if body is None:
+            await self._reject(send)
+            return
+
+        state = scope.setdefault("state", {})
+        state["user_context"] = {}
+        if body:
+            try:
+                parsed = json.loads(body)
+                state["agui_body"] = parsed
+                state["user_context"] = system_user_context(parsed, self.extract_user)
+                if state["user_context"]:
+                    print(f"[ATLAS AG-UI] Extracted user context: {state['user_context']}", file=sys.stderr)
+            except ValueError as e:
+                # Left for the endpoint to reject
+                print(f"[ATLAS AG-UI] Unparseable run body: {e}", file=sys.stderr)
+
+        # Replay the buffered body, then hand over to the real receive (disconnects)
+        replayed = False
+
+        async def replay_receive() -> dict:
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    async def _read_body(self, scope: dict, receive: Callable) -> Optional[bytes]:
+        """The request body, or None if it is larger than the cap."""
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    if int(value) > self.max_body_bytes:
+                        return None
+                except ValueError:
+                    pass
+                break
+
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _reject(self, send: Callable) -> None:
+        detail = json.dumps({"detail": f"AG-UI request body exceeds {self.max_body_bytes} bytes"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(detail)).encode())],
+        })
+        await send({"type": "http.response.body", "body": detail})
@@ -0,0 +1,179 @@
+"""Semantic answer cache for CLM voice questions.
+
+Voice users often ask the same thing in different words ("tell me about the
+Portugal D7 visa" / "what's the D7 visa in Portugal"). An answer is cached
+under the guides it was generated from (article id + content fingerprint) and
+the persona variant (model + system prompt). A new question reuses it when it
+retrieved the same unchanged guides and its query embedding is close enough
+by cosine similarity - the LLM is skipped entirely.
+
+Personalized answers (prompts carrying a returning user's remembered facts)
+are never stored or served.
+"""
+
+import math
+import os
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .models import Article
+
+# Cosine similarity needed to reuse an answer (configurable per deploy)
+ANSWER_CACHE_THRESHOLD = float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.93"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "500"))
+ANSWER_CACHE_TTL_SECONDS = int(os.environ.get("ANSWER_CACHE_TTL_SECONDS", str(6 * 3600)))
+
+# (persona variant, ((article id, content fingerprint), ...))
+SourceKey = tuple[str, tuple[tuple[str, int], ...]]
+
+
+@dataclass
+class CachedAnswer:
+    """An answer and the normalized query embedding it was generated for."""
+    query: str
+    vector: list[float]
+    answer: str
+    created_at: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+@dataclass
+class AnswerCacheStats:
+    """Counters for monitoring the cache."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0  # Dropped for size (LRU) or age (TTL)
+    skipped_personalized: int = 0
+    skipped_no_embedding: int = 0
+
+
+def _normalize(vector: list[float]) -> Optional[list[float]]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else None
+
+
+def source_key(persona: str, articles: list[Article]) -> SourceKey:
+    """Key for the guides an answer came from - changes if any guide is edited."""
+    return persona, tuple((a.id, hash(a.content)) for a in articles)
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of answers, bucketed by source key and matched by cosine.
+
+    Usage:
+        key = source_key(persona, results.articles)
+        answer = cache.lookup(key, results.embedding)
+        ...
+        cache.store(key, results.query, results.embedding, answer)
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Buckets in LRU order (a bucket moves to the end when used)
+        self._buckets: OrderedDict[SourceKey, list[CachedAnswer]] = OrderedDict()
+        self._size = 0
+        self.stats = AnswerCacheStats()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _usable(self, embedding: Optional[list[float]], personalized: bool, count: bool) -> Optional[list[float]]:
+        """The normalized vector, or None if the turn can't use the cache (counted once, on lookup)."""
+        if personalized:
+            if count:
+                self.stats.skipped_personalized += 1
+            return None
+        vector = _normalize(embedding) if embedding else None
+        if vector is None and count:
+            self.stats.skipped_no_embedding += 1
+        return vector
+
+    def lookup(
+        self,
+        key: SourceKey,
+        embedding: Optional[list[float]],
+        personalized: bool = False,
+    ) -> Optional[str]:
+        """The cached answer for a similar question over the same guides, if any."""
+        vector = self._usable(embedding, personalized, count=True)
+        if vector is None:
+            return None
+
+        bucket = self._buckets.get(key)
+        best, best_score = None, self.threshold
+        if bucket:
+            now = time.monotonic()
+            for entry in list(bucket):
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(key, entry)
+                    continue
+                score = sum(a * b for a, b in zip(vector, entry.vector))
+                if score >= best_score:
+                    best, best_score = entry, score
+
+        if best is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        best.hits += 1
+        self._buckets.move_to_end(key)
+        print(f"[ATLAS AnswerCache] Hit ({best_score:.3f}) for cached '{best.query}'", file=sys.stderr)
+        return best.answer
+
+    def store(
+        self,
+        key: SourceKey,
+        query: str,
+        embedding: Optional[list[float]],
+        answer: str,
+        personalized: bool = False,
+    ) -> None:
+        """Cache an answer generated from these guides."""
+        # The turn's lookup already counted a skip
+        vector = self._usable(embedding, personalized, count=False)
+        if vector is None or not answer:
+            return
+
+        self._buckets.setdefault(key, []).append(CachedAnswer(query, vector, answer))
+        self._buckets.move_to_end(key)
+        self._size += 1
+        self.stats.stores += 1
+
+        # Evict from the least recently used buckets
+        while self._size > self.max_entries:
+            oldest_key = next(iter(self._buckets))
+            self._remove(oldest_key, self._buckets[oldest_key][0])
+
+    def _remove(self, key: SourceKey, entry: CachedAnswer) -> None:
+        bucket = self._buckets[key]
+        bucket.remove(entry)
+        if not bucket:
+            del self._buckets[key]
+        self._size -= 1
+        self.stats.evictions += 1
+
+    def metrics(self) -> dict:
+        """Size, configuration, counters and hit rate, for the debug endpoint."""
+        lookups = self.stats.hits + self.stats.misses
+        return {
+            "entries": self._size,
+            "buckets": len(self._buckets),
+            "threshold": self.threshold,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats.__dict__,
+            "hit_rate": round(self.stats.hits / lookups, 3) if lookups else None,
+        }
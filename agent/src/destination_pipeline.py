@@ -0,0 +1,207 @@
+"""Concurrent research pipeline behind the destination context tools.
+
+The guide search and the gazetteer resolution of the topic don't depend on
+each other, so research_destination starts both at once under one deadline
+and merges what has arrived:
+
+- guides and visa type from the search
+- hero image from the top guide, else the topic_images lookup
+- location from the gazetteer (the topic names a place), else the top guide
+
+The topic_images lookup is only a fallback for a top guide without an
+image, so it isn't queried up front: it starts when the search comes back
+without one, or as a hedge once the search has run TOPIC_IMAGE_HEDGE_SECONDS,
+and is cancelled as soon as the search returns a guide image.
+
+Used by the Destination Expert's surface_destination_context (and its fast
+path) and by the CopilotKit delegate_to_destination_expert. Stage timings
+are returned with every result and kept for /debug/destination-pipeline.
+"""
+
+import asyncio
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .database import get_topic_image
+from .models import Article, MapLocation
+from .tools import search_articles, extract_location_from_content, extract_era_from_content
+
+DESTINATION_PIPELINE_DEADLINE = 4.0  # Seconds for all stages together
+TOPIC_IMAGE_HEDGE_SECONDS = 0.25  # Search time after which the topic image is fetched alongside it
+TIMING_WINDOW = 200  # Samples kept per stage
+
+STAGES = ("search", "topic_image", "gazetteer")
+
+
+@dataclass
+class DestinationResearch:
+    """Merged pipeline output for one topic."""
+    topic: str
+    query: str
+    articles: list[Article] = field(default_factory=list)
+    hero_image: Optional[str] = None
+    hero_image_source: Optional[str] = None  # "guide" or "topic_images"
+    location: Optional[MapLocation] = None
+    visa_type: Optional[str] = None
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    timed_out: list[str] = field(default_factory=list)
+
+    @property
+    def top_article(self) -> Optional[Article]:
+        return self.articles[0] if self.articles else None
+
+    @property
+    def search_timed_out(self) -> bool:
+        """The guide search hit the deadline - no guides is not an answer."""
+        return "search" in self.timed_out
+
+
+# Stage -> recent durations (ms), plus counters
+stage_timings: dict[str, deque] = {}
+pipeline_stats = {"runs": 0, "timeouts": 0, "errors": 0, "topic_image_queries": 0, "topic_image_cancelled": 0}
+
+
+def _record(stage: str, ms: float) -> None:
+    timings = stage_timings.get(stage)
+    if timings is None:
+        timings = stage_timings[stage] = deque(maxlen=TIMING_WINDOW)
+    timings.append(ms)
+
+
+async def _timed(stage: str, coro, timings: dict[str, float]):
+    """Await a stage, recording how long it took (also when it fails)."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _gazetteer(topic: str) -> Optional[MapLocation]:
+    return extract_location_from_content(topic, topic)
+
+
+def _guide_image(search_task: asyncio.Task) -> Optional[str]:
+    """The top guide's image, once the search has finished with one."""
+    if not search_task.done() or search_task.cancelled() or search_task.exception() is not None:
+        return None
+    articles = search_task.result().articles
+    return articles[0].hero_image_url if articles else None
+
+
+async def _topic_image(topic: str, search_task: asyncio.Task, hedge: float, timings: dict[str, float]) -> Optional[str]:
+    """topic_images fallback: queried only if the search is slow or its top guide has no image."""
+    await asyncio.wait({search_task}, timeout=hedge)
+    if _guide_image(search_task):
+        return None
+    pipeline_stats["topic_image_queries"] += 1
+    return await _timed("topic_image", get_topic_image(topic), timings)
+
+
+async def research_destination(
+    topic: str,
+    limit: int = 5,
+    deadline: float = DESTINATION_PIPELINE_DEADLINE,
+    topic_image_hedge: float = TOPIC_IMAGE_HEDGE_SECONDS,
+) -> DestinationResearch:
+    """
+    Search and gazetteer concurrently (topic image as needed), merged into one result.
+
+    Stages still running at the deadline are cancelled and listed in
+    `timed_out`; stages that fail are logged and treated as empty. A topic
+    image lookup made redundant by a guide image is cancelled, not timed out.
+    """
+    pipeline_stats["runs"] += 1
+    start = time.perf_counter()
+    timings: dict[str, float] = {}
+    search = asyncio.create_task(_timed("search", search_articles(topic, limit=limit), timings))
+    tasks = {
+        "search": search,
+        "topic_image": asyncio.create_task(_topic_image(topic, search, topic_image_hedge, timings)),
+        "gazetteer": asyncio.create_task(_timed("gazetteer", _gazetteer(topic), timings)),
+    }
+    redundant: set[str] = set()
+    pending = set(tasks.values())
+    try:
+        while pending:
+            remaining = deadline - (time.perf_counter() - start)
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if search in done and _guide_image(search) and not tasks["topic_image"].done():
+                # The guide has an image - the fallback lookup is no longer needed
+                tasks["topic_image"].cancel()
+                redundant.add("topic_image")
+                pipeline_stats["topic_image_cancelled"] += 1
+    finally:
+        late = [task for task in tasks.values() if not task.done()]
+        for task in late:
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    research = DestinationResearch(topic=topic, query=topic, timings_ms=timings)
+    results = {}
+    for stage, task in tasks.items():
+        if stage in redundant:
+            continue
+        if task.cancelled():
+            research.timed_out.append(stage)
+            pipeline_stats["timeouts"] += 1
+        elif task.exception() is not None:
+            pipeline_stats["errors"] += 1
+            print(f"[Destination Pipeline] {stage} failed for '{topic}': {task.exception()}", file=sys.stderr)
+        else:
+            results[stage] = task.result()
+
+    # Merge
+    merge_start = time.perf_counter()
+    search = results.get("search")
+    if search is not None:
+        research.articles = list(search.articles)
+        research.query = search.query
+
+    top = research.top_article
+    if top is not None:
+        research.visa_type = extract_era_from_content(top.content)
+        if top.hero_image_url:
+            research.hero_image, research.hero_image_source = top.hero_image_url, "guide"
+    if research.hero_image is None and results.get("topic_image"):
+        research.hero_image, research.hero_image_source = results["topic_image"], "topic_images"
+
+    research.location = results.get("gazetteer")
+    if research.location is None and top is not None:
+        research.location = extract_location_from_content(top.content, top.title)
+    timings["merge"] = round((time.perf_counter() - merge_start) * 1000, 2)
+    timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+
+    for stage, ms in timings.items():
+        _record(stage, ms)
+    print(f"[Destination Pipeline] '{topic}': {len(research.articles)} guides, "
+          f"image={research.hero_image_source or 'none'}, location={research.location.name if research.location else 'none'}, "
+          f"timings={timings}" + (f", timed out: {research.timed_out}" if research.timed_out else ""), file=sys.stderr)
+    return research
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def pipeline_metrics() -> dict:
+    """Per-stage p50/p95 timings and run counters."""
+    return {
+        **pipeline_stats,
+        "deadline_seconds": DESTINATION_PIPELINE_DEADLINE,
+        "topic_image_hedge_seconds": TOPIC_IMAGE_HEDGE_SECONDS,
+        "stages_ms": {
+            stage: {
+                "samples": len(samples),
+                "p50": round(_percentile(list(samples), 0.5), 1),
+                "p95": round(_percentile(list(samples), 0.95), 1),
+            }
+            for stage, samples in stage_timings.items() if samples
+        },
+    }
@@ -0,0 +1,151 @@
+"""Deterministic fast path for Destination Expert delegations.
+
+Most delegations are plain lookups ("guides about Portugal", "map of
+Cyprus") where the expert LLM only picks surface_destination_context and
+rephrases its brief. plan_expert_request resolves such requests locally -
+exactly one destination, no comparison or advice - to the surface function
+directly, and expert_brief writes the reply from a template. Anything else
+(no or several destinations, comparisons, open questions) returns None and
+goes to the sub-agent as before.
+
+Both paths are timed so /debug/expert can report the fast-path ratio and
+the latency it saves.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+from .destination_expert import (
+    DestinationExpertDeps,
+    destination_context,
+    destination_image,
+    destination_map,
+    featured_destinations,
+    visa_timeline,
+)
+from .intents import destination_display_name, find_destinations, tokenize
+from .model_router import Complexity, classify_complexity
+
+ExpertTool = Literal["context", "map", "visa_timeline", "image", "featured"]
+
+# Phrases that pick a specific surface tool (matched on whole tokens)
+MAP_MARKERS = ("map", "where is", "located", "location of")
+TIMELINE_MARKERS = ("timeline", "visa process", "application process", "visa steps")
+IMAGE_MARKERS = ("image", "images", "picture", "pictures", "photo", "photos")
+FEATURED_MARKERS = ("featured", "popular destinations", "top destinations", "featured destinations")
+
+# Request filler stripped to get the topic ("guides about Portugal D7 visa" -> "Portugal D7 visa")
+_FILLER_RE = re.compile(
+    r"^(?:please\s+)?(?:(?:show|find|get|search|surface|pull up|look up|research|tell)(?:\s+me)?\s+)?"
+    r"(?:(?:the|some|any|all|an?)\s+)?"
+    r"(?:(?:relocation\s+)?(?:guides?|articles?|info(?:rmation)?|research|context|details|images?|pictures?|photos?)\s+)?"
+    r"(?:(?:about|on|for|of|regarding|into)\s+)?",
+    re.IGNORECASE,
+)
+
+EXPERT_HANDOFF = "ATLAS can elaborate on this."
+LATENCY_WINDOW = 200  # Samples kept per path
+
+
+@dataclass(frozen=True)
+class ExpertPlan:
+    """A delegation resolved without the sub-agent."""
+    tool: ExpertTool
+    topic: str
+
+
+def _has_marker(padded: str, markers: tuple[str, ...]) -> bool:
+    return any(f" {m} " in padded for m in markers)
+
+
+def request_topic(request: str, fallback: str) -> str:
+    """The research topic in a delegation request, without the filler around it."""
+    topic = _FILLER_RE.sub("", request.strip()).strip(" .?!")
+    return topic or fallback
+
+
+def plan_expert_request(request: str) -> Optional[ExpertPlan]:
+    """
+    Resolve a clear delegation to a surface function, or None if it needs the sub-agent.
+
+    Clear means: a simple lookup (per the model router's complexity features)
+    about exactly one known destination - or a request for featured
+    destinations, which needs none.
+    """
+    tokens = tokenize(request)
+    padded = f" {' '.join(tokens)} "
+    destinations = find_destinations(tokens)
+    complexity, _ = classify_complexity(request)
+
+    if not destinations and _has_marker(padded, FEATURED_MARKERS):
+        return ExpertPlan("featured", "")
+    if len(destinations) != 1 or complexity != Complexity.SIMPLE:
+        return None
+
+    name = destination_display_name(destinations[0])
+    if _has_marker(padded, IMAGE_MARKERS):
+        return ExpertPlan("image", request_topic(request, name))
+    if _has_marker(padded, TIMELINE_MARKERS):
+        return ExpertPlan("visa_timeline", name)
+    if _has_marker(padded, MAP_MARKERS):
+        return ExpertPlan("map", name)
+    return ExpertPlan("context", request_topic(request, name))
+
+
+async def run_expert_plan(plan: ExpertPlan, deps: DestinationExpertDeps) -> dict:
+    """Run the surface function a plan resolved to; returns its tool result."""
+    if plan.tool == "context":
+        return await destination_context(deps, plan.topic)
+    if plan.tool == "image":
+        return await destination_image(plan.topic)
+    if plan.tool == "map":
+        return destination_map(plan.topic)
+    if plan.tool == "visa_timeline":
+        return visa_timeline(plan.topic)
+    return featured_destinations()
+
+
+def expert_brief(result: dict) -> str:
+    """The expert's reply for a fast-path result, from the tool's own brief."""
+    brief = result.get("brief") or result.get("message") or "I couldn't find any guides about that destination."
+    return f"{brief} {EXPERT_HANDOFF}" if result.get("found") else brief
+
+
+@dataclass
+class ExpertPathStats:
+    """Delegation counts and latencies per path."""
+    fast_path: int = 0
+    sub_agent: int = 0
+    fallbacks: int = 0  # Planned, but the surface function found nothing
+    fast_seconds: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    agent_seconds: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def record(self, path: Literal["fast_path", "sub_agent"], seconds: float) -> None:
+        if path == "fast_path":
+            self.fast_path += 1
+            self.fast_seconds.append(seconds)
+        else:
+            self.sub_agent += 1
+            self.agent_seconds.append(seconds)
+
+    def metrics(self) -> dict:
+        fast_avg = sum(self.fast_seconds) / len(self.fast_seconds) if self.fast_seconds else None
+        agent_avg = sum(self.agent_seconds) / len(self.agent_seconds) if self.agent_seconds else None
+        total = self.fast_path + self.sub_agent
+        saved = (agent_avg - fast_avg) * self.fast_path if fast_avg is not None and agent_avg is not None else None
+        return {
+            "delegations": total,
+            "fast_path": self.fast_path,
+            "sub_agent": self.sub_agent,
+            "fallbacks": self.fallbacks,
+            "fast_path_ratio": round(self.fast_path / total, 3) if total else None,
+            "fast_path_avg_ms": round(fast_avg * 1000, 1) if fast_avg is not None else None,
+            "sub_agent_avg_ms": round(agent_avg * 1000, 1) if agent_avg is not None else None,
+            # Estimated: fast-path calls x (sub-agent average - fast-path average)
+            "latency_saved_ms": round(saved * 1000) if saved is not None else None,
+        }
+
+
+expert_stats = ExpertPathStats()
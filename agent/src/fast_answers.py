@@ -0,0 +1,153 @@
+"""Deterministic voice answers for lookups the destinations table can answer directly.
+
+Compare / visa / cost questions about a known destination are answered from
+structured data with short spoken templates - no article search, no LLM.
+The classifier only routes plain lookups here (see intents), and a cost
+question about a city is answered for that city.
+Every function returns None when the data isn't there, so the caller can
+fall back to the normal search + LLM path.
+"""
+
+import json
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+from .database import compare_destinations, get_cost_of_living, get_visa_info
+from .intents import Intent, IntentMatch
+
+
+@dataclass(frozen=True)
+class FastAnswer:
+    """A spoken answer plus the topic its closing question offers."""
+    text: str
+    follow_up_topic: str  # What "yes" should mean after this answer
+
+
+def _as_json(value):
+    """JSONB columns may arrive as text depending on the pool codecs."""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _join_names(names: list[str]) -> str:
+    """'A', 'A and B', 'A, B and C'."""
+    if len(names) <= 1:
+        return "".join(names)
+    return f"{', '.join(names[:-1])} and {names[-1]}"
+
+
+def _cheapest_rent(cities: list[dict]) -> Optional[tuple[str, int, str]]:
+    """(city, rent, currency) for the cheapest central one-bedroom, if known."""
+    priced = [c for c in cities if isinstance(c, dict) and c.get("rent1BRCenter")]
+    if not priced:
+        return None
+    city = min(priced, key=lambda c: c["rent1BRCenter"])
+    return city.get("cityName", "the city centre"), city["rent1BRCenter"], city.get("currency", "EUR")
+
+
+async def answer_visa(slug: str) -> Optional[FastAnswer]:
+    """Summarise the visa routes for a destination."""
+    info = await get_visa_info(slug)
+    visas = _as_json(info.get("visas")) if info else None
+    if not visas:
+        return None
+
+    names = [v.get("name") for v in visas[:3] if isinstance(v, dict) and v.get("name")]
+    if not names:
+        return None
+
+    country = info["country"]
+    text = f"{country} has {len(visas)} main visa routes, including the {_join_names(names)}."
+    first = visas[0]
+    details = []
+    if first.get("processingTime"):
+        details.append(f"takes around {first['processingTime']} to process")
+    if first.get("cost"):
+        details.append(f"costs {first['cost']}")
+    if details:
+        text += f" The {first['name']} {' and '.join(details)}."
+    text += " Would you like me to walk you through the requirements for one of them?"
+    return FastAnswer(text, f"{country} visa requirements")
+
+
+async def answer_cost(slug: str, city: Optional[str] = None) -> Optional[FastAnswer]:
+    """Summarise cost of living for a destination, or for one of its cities."""
+    info = await get_cost_of_living(slug)
+    cities = _as_json(info.get("cities")) if info else None
+    if not cities:
+        return None
+
+    country = info["country"]
+    if city:
+        # Answer for the city asked about - not the country's cheapest
+        city_data = next((c for c in cities if isinstance(c, dict)
+                          and str(c.get("cityName", "")).lower() == city.lower()), None)
+        if not city_data or not city_data.get("rent1BRCenter"):
+            return None
+        currency = city_data.get("currency", "EUR")
+        text = f"A one-bedroom flat in central {city} runs about {currency} {city_data['rent1BRCenter']:,} a month."
+        follow_up = f"living in {city}"
+    else:
+        cheapest = _cheapest_rent(cities)
+        if not cheapest:
+            return None
+        city, rent, currency = cheapest
+        city_names = [c.get("cityName") for c in cities[:3] if isinstance(c, dict) and c.get("cityName")]
+        text = f"I've got cost of living data for {_join_names(city_names)} in {country}."
+        text += f" A one-bedroom flat in central {city} runs about {currency} {rent:,} a month."
+        city_data = next(c for c in cities if isinstance(c, dict) and c.get("cityName") == city)
+        follow_up = f"living in {country}"
+
+    extras = []
+    if city_data.get("utilities"):
+        extras.append(f"utilities around {currency} {city_data['utilities']:,}")
+    if city_data.get("groceries"):
+        extras.append(f"groceries around {currency} {city_data['groceries']:,}")
+    if extras:
+        text += f" Add {' and '.join(extras)}."
+    text += f" Would you like to hear more about {follow_up}?"
+    return FastAnswer(text, follow_up)
+
+
+async def answer_compare(slug1: str, slug2: str) -> Optional[FastAnswer]:
+    """Headline comparison of two destinations: visa routes and rent."""
+    comparison = await compare_destinations(slug1, slug2)
+    if not comparison:
+        return None
+
+    names = [d["name"] for d in comparison["destinations"]]
+    parts = []
+    visa_counts = [len(_as_json(comparison["visas"].get(n)) or []) for n in names]
+    if any(visa_counts):
+        parts.append(f"{names[0]} offers {visa_counts[0]} visa routes to {names[1]}'s {visa_counts[1]}.")
+
+    rents = [_cheapest_rent(_as_json(comparison["cost_of_living"].get(n)) or []) for n in names]
+    if all(rents):
+        (city1, rent1, cur1), (city2, rent2, cur2) = rents
+        parts.append(f"A central one-bedroom runs about {cur1} {rent1:,} in {city1} versus {cur2} {rent2:,} in {city2}.")
+
+    if not parts:
+        return None
+
+    text = (f"Comparing {names[0]} and {names[1]}: " + " ".join(parts) +
+            f" Shall I tell you more about relocating to {names[0]}?")
+    return FastAnswer(text, f"relocating to {names[0]}")
+
+
+async def answer_intent(match: IntentMatch) -> Optional[FastAnswer]:
+    """Answer a deterministic intent, or None to fall back to search + LLM."""
+    try:
+        if match.intent == Intent.COMPARE:
+            return await answer_compare(*match.destinations[:2])
+        if match.intent == Intent.VISA:
+            return await answer_visa(match.destinations[0])
+        if match.intent == Intent.COST:
+            return await answer_cost(match.destinations[0], match.city)
+    except Exception as e:
+        print(f"[ATLAS FastAnswer] {match.intent.value} lookup failed: {e}", file=sys.stderr)
+    return None
@@ -0,0 +1,248 @@
+"""Hedged, deadline-aware streaming LLM calls.
+
+A voice turn can't wait on one slow provider. hedged_stream starts the
+primary model and, if no first token has arrived within the primary's p95
+first-token latency, starts the next model as well. Whichever produces a
+first token first wins and the other run is cancelled (closing its HTTP
+stream). A primary that fails before its first token is replaced straight
+away. First-token latencies are recorded per model, so the hedge delay
+tracks how each provider is actually behaving. An attempt cancelled before
+its first token still adds a sample - its elapsed time, a lower bound on
+its real latency - so slow runs that lose races don't bias p95 low.
+
+Candidates are plain Pydantic AI agents, so the layer can be exercised with
+local stand-ins (FunctionModel / TestModel, or an OpenAI-compatible server
+on localhost via an "openai:" model) instead of real providers.
+"""
+
+import asyncio
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Optional
+
+from pydantic_ai import Agent
+
+# Hedge delay bounds (seconds) - p95 first-token latency, clamped
+HEDGE_MIN_DELAY = 0.25
+HEDGE_MAX_DELAY = 2.0
+HEDGE_DEFAULT_DELAY = 1.0  # Until a model has enough samples
+HEDGE_MIN_SAMPLES = 20
+
+FIRST_TOKEN_DEADLINE = 8.0  # Give up if no candidate has produced a token by then
+LATENCY_WINDOW = 200  # First-token samples kept per model
+
+_END = object()
+
+
+@dataclass
+class ModelLatency:
+    """Rolling first-token latency distribution and outcome counters for one model."""
+    samples: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+    started: int = 0
+    wins: int = 0
+    errors: int = 0
+    cancelled: int = 0  # Lost a hedge race
+    censored: int = 0  # Samples that are only a lower bound (cancelled before a first token)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+    def hedge_delay(self) -> float:
+        """How long to wait for this model's first token before hedging."""
+        if len(self.samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, self.percentile(0.95)))
+
+    def summary(self) -> dict:
+        p50, p95, p99 = (self.percentile(p) for p in (0.5, 0.95, 0.99))
+        return {
+            "samples": len(self.samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "started": self.started,
+            "wins": self.wins,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "censored": self.censored,
+        }
+
+
+# Per-model latency, keyed by "provider:model" name
+model_latency: dict[str, ModelLatency] = {}
+
+hedge_stats = {"calls": 0, "hedged": 0, "fallbacks": 0, "secondary_wins": 0, "deadline_exceeded": 0}
+
+
+def get_model_latency(model_name: str) -> ModelLatency:
+    latency = model_latency.get(model_name)
+    if latency is None:
+        latency = model_latency[model_name] = ModelLatency()
+    return latency
+
+
+class _Attempt:
+    """One streaming run; deltas are buffered in a queue until it wins or is cancelled."""
+
+    def __init__(self, model_name: str, agent: Agent, prompt: str, deps: Any):
+        self.model_name = model_name
+        self.latency = get_model_latency(model_name)
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.first_token: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.latency.started += 1
+        self.start = time.perf_counter()
+        self._recorded = False
+        self.task = asyncio.create_task(self._run(agent, prompt, deps))
+
+    async def _run(self, agent: Agent, prompt: str, deps: Any) -> None:
+        start = self.start
+        try:
+            async with agent.run_stream(prompt, deps=deps) as result:
+                async for delta in result.stream_text(delta=True, debounce_by=None):
+                    if not delta:
+                        continue
+                    if not self.first_token.done():
+                        self.first_token.set_result(time.perf_counter() - start)
+                    self.queue.put_nowait(delta)
+            if not self.first_token.done():
+                # Empty reply still counts as an answer
+                self.first_token.set_result(time.perf_counter() - start)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.latency.errors += 1
+            print(f"[ATLAS Hedge] {self.model_name} failed: {e}", file=sys.stderr)
+            if not self.first_token.done():
+                self.first_token.set_exception(e)
+            else:
+                self.queue.put_nowait(e)
+        finally:
+            self.queue.put_nowait(_END)
+
+    def cancel(self) -> None:
+        if not self.task.done():
+            self.task.cancel()
+            self.latency.cancelled += 1
+        if not self.first_token.done():
+            self.first_token.cancel()
+
+    def record_latency(self) -> None:
+        """
+        Add this attempt's first-token sample, once: the real latency if it
+        produced a token, else the time it ran before being cancelled.
+        Attempts that failed add nothing.
+        """
+        if self._recorded:
+            return
+        if self.first_token.done() and not self.first_token.cancelled():
+            if self.first_token.exception() is not None:
+                return
+            sample = self.first_token.result()
+        else:
+            sample = time.perf_counter() - self.start
+            self.latency.censored += 1
+        self._recorded = True
+        self.latency.samples.append(sample)
+
+
+async def hedged_stream(
+    candidates: list[tuple[str, Agent]],
+    prompt: str,
+    deps: Any,
+    deadline: float = FIRST_TOKEN_DEADLINE,
+    on_winner: Optional[Callable[[str], None]] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream text deltas from the first candidate to start answering.
+
+    Args:
+        candidates: (model name, agent) in preference order - primary first
+        prompt: User prompt for the run
+        deps: Agent deps (shared; candidates must not mutate them)
+        deadline: Seconds to wait for any first token
+        on_winner: Called with the model name whose reply is streamed
+
+    Raises the last candidate error (or TimeoutError) if nobody answers.
+    """
+    hedge_stats["calls"] += 1
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + deadline
+    pending = list(candidates)
+    attempts: list[_Attempt] = []
+    winner: Optional[_Attempt] = None
+    last_error: Optional[BaseException] = None
+
+    try:
+        while winner is None:
+            # Start the next candidate (primary first, then hedges/fallbacks)
+            if pending and not any(not a.first_token.done() for a in attempts):
+                if attempts:
+                    hedge_stats["fallbacks"] += 1
+                model_name, agent = pending.pop(0)
+                attempts.append(_Attempt(model_name, agent, prompt, deps))
+            elif pending and attempts:
+                hedge_stats["hedged"] += 1
+                model_name, agent = pending.pop(0)
+                print(f"[ATLAS Hedge] No first token from {attempts[-1].model_name} - hedging to {model_name}", file=sys.stderr)
+                attempts.append(_Attempt(model_name, agent, prompt, deps))
+
+            waiting = [a.first_token for a in attempts if not a.first_token.done()]
+            if not waiting:
+                break
+            remaining = give_up_at - loop.time()
+            if remaining <= 0:
+                hedge_stats["deadline_exceeded"] += 1
+                raise asyncio.TimeoutError(f"No first token within {deadline}s")
+            timeout = min(remaining, attempts[-1].latency.hedge_delay()) if pending else remaining
+            done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            for attempt in attempts:
+                if attempt.first_token in done:
+                    if attempt.first_token.exception() is None:
+                        winner = winner or attempt
+                    else:
+                        last_error = attempt.first_token.exception()
+            if winner is None and not pending and all(a.first_token.done() for a in attempts):
+                break
+
+        if winner is None:
+            raise last_error or RuntimeError("No LLM candidates")
+
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.record_latency()
+                attempt.cancel()
+        winner.record_latency()
+        winner.latency.wins += 1
+        if winner is not attempts[0]:
+            hedge_stats["secondary_wins"] += 1
+        if on_winner:
+            on_winner(winner.model_name)
+
+        while True:
+            item = await winner.queue.get()
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Also covers the caller closing the stream early, and the deadline
+        for attempt in attempts:
+            attempt.record_latency()
+            if not attempt.task.done():
+                attempt.task.cancel()
+
+
+def latency_metrics() -> dict:
+    """Per-model first-token distributions plus hedge counters, for the debug endpoint."""
+    return {
+        **hedge_stats,
+        "models": {name: latency.summary() for name, latency in model_latency.items()},
+    }
@@ -0,0 +1,301 @@
+"""Rule-based intent router for the CLM fast paths.
+
+All phrases are compiled once at import into a token trie. Classifying a
+message is a single scan over its tokens: every rule that matches is a
+candidate and the highest-priority candidate wins. Deterministic intents
+(compare, visa, cost) also resolve destination names from a gazetteer so the
+caller can answer from the destinations table without an LLM.
+
+A deterministic intent only wins when the message is nothing but its
+trigger, its destinations, filler words and the intent's qualifiers ("visa
+options for Portugal", "cost of living in Spain"). Anything more specific
+("the Portugal D7 visa", "tax in Spain") is a QUESTION for search + LLM.
+Cities are kept as cities: cost answers for that city, and visa/compare
+questions about a city fall through rather than widen to the country.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Literal, Optional
+
+
+class Intent(str, Enum):
+    """What the user wants from this turn."""
+    GREETING = "greeting"
+    NAME_QUESTION = "name_question"
+    IDENTITY = "identity"
+    AFFIRMATION = "affirmation"
+    COMPARE = "compare"
+    VISA = "visa"
+    COST = "cost"
+    QUESTION = "question"  # Anything else - search + LLM
+
+
+# Higher wins when several rules match
+INTENT_PRIORITIES: dict[Intent, int] = {
+    Intent.GREETING: 100,
+    Intent.NAME_QUESTION: 90,
+    Intent.IDENTITY: 80,
+    Intent.AFFIRMATION: 70,
+    Intent.COMPARE: 60,
+    Intent.VISA: 50,
+    Intent.COST: 40,
+}
+
+# Intents that need destinations to be actionable (minimum count)
+DESTINATION_INTENTS: dict[Intent, int] = {
+    Intent.COMPARE: 2,
+    Intent.VISA: 1,
+    Intent.COST: 1,
+}
+
+MatchMode = Literal["exact", "prefix", "contains"]
+
+# (phrase, intent, mode)
+# - exact: the whole message is the phrase
+# - prefix: the message starts with the phrase
+# - contains: the phrase appears anywhere in the message
+INTENT_RULES: list[tuple[str, Intent, MatchMode]] = [
+    # Greetings (Hume sends "speak your greeting" at session start)
+    ("speak your greeting", Intent.GREETING, "contains"),
+    *[(w, Intent.GREETING, "exact") for w in ("hello", "hi", "hey", "hiya", "howdy", "greetings", "start")],
+    ("hello", Intent.GREETING, "prefix"),
+    ("hi", Intent.GREETING, "prefix"),
+    # The user asking their own name
+    *[(p, Intent.NAME_QUESTION, "contains") for p in (
+        "what is my name", "what's my name", "do you know my name", "who am i",
+    )],
+    # Questions about ATLAS
+    *[(p, Intent.IDENTITY, "contains") for p in (
+        "who are you", "what are you", "your name", "about yourself",
+        "what can you help with", "what do you do", "tell me about you", "introduce yourself",
+    )],
+    # Pure affirmations (exact only - "tell me about X" must not match)
+    *[(p, Intent.AFFIRMATION, "exact") for p in (
+        "yes", "yeah", "yep", "yup", "sure", "okay", "ok", "please", "aye",
+        "absolutely", "definitely", "certainly", "indeed", "alright", "right",
+        "go on", "tell me more", "go ahead", "yes please", "sure thing",
+        "of course", "i'd like that", "i would like that", "sounds good", "sounds great",
+        "let's do it", "let's hear it", "why not", "i'm interested", "please do",
+    )],
+    # Deterministic lookups (only fire when destinations are found)
+    *[(p, Intent.COMPARE, "contains") for p in (
+        "compare", "comparing", "comparison", "vs", "versus", "difference between", "better",
+    )],
+    *[(p, Intent.VISA, "contains") for p in (
+        "visa", "visas", "residence permit", "residency permit",
+    )],
+    *[(p, Intent.COST, "contains") for p in (
+        "cost of living", "how expensive", "how much does it cost", "living costs", "cost to live", "rent",
+    )],
+]
+
+# Words that carry no topic of their own in a lookup question
+FILLER_WORDS = frozenset((
+    "a", "an", "the", "what", "what's", "whats", "which", "how", "is", "are", "it", "its", "there",
+    "in", "for", "to", "of", "about", "on", "and", "or", "with", "from", "at", "into",
+    "me", "tell", "can", "could", "you", "i", "i'd", "do", "does", "would", "like", "please",
+    "know", "give", "show", "get", "need", "my", "be", "so", "now", "then", "again",
+))
+
+# Words a deterministic intent may carry beyond its trigger and destinations
+INTENT_QUALIFIERS: dict[Intent, frozenset[str]] = {
+    Intent.COMPARE: frozenset(("between", "against", "than", "which", "one", "overall")),
+    Intent.VISA: frozenset(("options", "routes", "types", "kinds", "main", "available")),
+    Intent.COST: frozenset(("much", "living", "cost", "costs", "expensive", "monthly", "month", "typical", "average")),
+}
+
+# Gazetteer: spoken name -> destination slug
+DESTINATION_ALIASES: dict[str, str] = {
+    "portugal": "portugal", "lisbon": "portugal", "porto": "portugal",
+    "spain": "spain", "madrid": "spain", "barcelona": "spain",
+    "cyprus": "cyprus", "nicosia": "cyprus", "limassol": "cyprus",
+    "uk": "uk", "united kingdom": "uk", "britain": "uk", "england": "uk", "london": "uk",
+    "france": "france", "paris": "france",
+    "germany": "germany", "berlin": "germany",
+    "netherlands": "netherlands", "amsterdam": "netherlands",
+    "malta": "malta",
+    "greece": "greece", "athens": "greece",
+    "italy": "italy", "rome": "italy",
+    "thailand": "thailand", "bangkok": "thailand",
+    "indonesia": "indonesia", "bali": "indonesia",
+    "australia": "australia",
+    "new zealand": "new-zealand",
+    "dubai": "dubai", "uae": "dubai", "united arab emirates": "dubai",
+    "canada": "canada",
+    "mexico": "mexico",
+}
+
+# Gazetteer aliases that name a city rather than the whole destination
+CITY_ALIASES: dict[str, str] = {
+    "lisbon": "Lisbon", "porto": "Porto", "madrid": "Madrid", "barcelona": "Barcelona",
+    "nicosia": "Nicosia", "limassol": "Limassol", "london": "London", "paris": "Paris",
+    "berlin": "Berlin", "amsterdam": "Amsterdam", "athens": "Athens", "rome": "Rome",
+    "bangkok": "Bangkok", "bali": "Bali",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_TERMINAL = ""  # Trie key holding the rules that end at a node (never a token)
+
+
+def tokenize(text: str) -> tuple[str, ...]:
+    """Lowercase word tokens, keeping contractions ("what's", "i'd") intact."""
+    return tuple(_TOKEN_RE.findall(text.lower().replace("’", "'")))
+
+
+def _compile_trie(entries: list[tuple[str, object]]) -> dict:
+    """Build a token trie; each terminal node holds the payloads ending there."""
+    root: dict = {}
+    for phrase, payload in entries:
+        node = root
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node.setdefault(_TERMINAL, []).append(payload)
+    return root
+
+
+# Compiled once at import
+_EXACT_RULES: dict[tuple[str, ...], Intent] = {}
+for _phrase, _intent, _mode in INTENT_RULES:
+    if _mode == "exact":
+        _current = _EXACT_RULES.get(tokenize(_phrase))
+        if _current is None or INTENT_PRIORITIES[_intent] > INTENT_PRIORITIES[_current]:
+            _EXACT_RULES[tokenize(_phrase)] = _intent
+_RULE_TRIE = _compile_trie([(p, (i, m)) for p, i, m in INTENT_RULES if m != "exact"])
+_DESTINATION_TRIE = _compile_trie([(alias, (slug, alias)) for alias, slug in DESTINATION_ALIASES.items()])
+
+
+@dataclass(frozen=True)
+class IntentMatch:
+    """Result of intent classification."""
+    intent: Intent
+    destinations: tuple[str, ...] = ()  # Destination slugs, in mention order
+    phrase: str = ""  # The rule phrase that matched (for logging)
+    city: Optional[str] = None  # Set when a COST destination was named by city ("Lisbon")
+
+
+@dataclass(frozen=True)
+class DestinationMention:
+    """A gazetteer match: the destination slug and the tokens that named it."""
+    slug: str
+    alias: str
+    start: int
+    end: int
+
+    @property
+    def city(self) -> Optional[str]:
+        return CITY_ALIASES.get(self.alias)
+
+
+def destination_display_name(slug: str) -> str:
+    """"portugal" -> "Portugal", "uk" -> "UK"."""
+    return slug.upper() if len(slug) <= 3 else slug.replace("-", " ").title()
+
+
+def find_destination_mentions(tokens: tuple[str, ...]) -> list[DestinationMention]:
+    """Every gazetteer match in the tokens, longest match first at each position."""
+    mentions: list[DestinationMention] = []
+    i = 0
+    while i < len(tokens):
+        node = _DESTINATION_TRIE
+        match, match_end = None, i
+        for j in range(i, len(tokens)):
+            node = node.get(tokens[j])
+            if node is None:
+                break
+            if _TERMINAL in node:
+                match, match_end = node[_TERMINAL][0], j + 1
+        if match:
+            mentions.append(DestinationMention(match[0], match[1], i, match_end))
+            i = match_end
+        else:
+            i += 1
+    return mentions
+
+
+def find_destinations(tokens: tuple[str, ...]) -> tuple[str, ...]:
+    """Resolve destination slugs mentioned in the tokens (longest match, de-duplicated)."""
+    return tuple(dict.fromkeys(m.slug for m in find_destination_mentions(tokens)))
+
+
+def classify_intent(text: str) -> IntentMatch:
+    """
+    Classify a (normalized) user message.
+
+    Returns:
+        The highest-priority matching intent, or Intent.QUESTION
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return IntentMatch(Intent.QUESTION)
+
+    exact = _EXACT_RULES.get(tokens)
+    candidates: dict[Intent, str] = {}
+    spans: dict[Intent, list[tuple[int, int]]] = {}
+    if exact is not None:
+        candidates[exact] = " ".join(tokens)
+    for intent, start, end in _iter_rule_matches(tokens):
+        candidates.setdefault(intent, " ".join(tokens[start:end]))
+        spans.setdefault(intent, []).append((start, end))
+
+    mentions: Optional[list[DestinationMention]] = None
+    for intent in sorted(candidates, key=INTENT_PRIORITIES.__getitem__, reverse=True):
+        needed = DESTINATION_INTENTS.get(intent)
+        if needed:
+            if mentions is None:
+                mentions = find_destination_mentions(tokens)
+            match = _deterministic_match(intent, needed, tokens, spans.get(intent, []), mentions)
+            if match is None:
+                continue
+            return IntentMatch(intent, match[0], candidates[intent], match[1])
+        return IntentMatch(intent, phrase=candidates[intent])
+
+    return IntentMatch(Intent.QUESTION)
+
+
+def _deterministic_match(
+    intent: Intent,
+    needed: int,
+    tokens: tuple[str, ...],
+    trigger_spans: list[tuple[int, int]],
+    mentions: list[DestinationMention],
+) -> Optional[tuple[tuple[str, ...], Optional[str]]]:
+    """
+    (destinations, city) if the message is a plain lookup for this intent,
+    else None - too few destinations, a city the answer can't narrow to, or
+    words the template wouldn't address.
+    """
+    destinations = tuple(dict.fromkeys(m.slug for m in mentions))
+    if len(destinations) != needed:
+        return None
+
+    cities = {m.city for m in mentions if m.city}
+    city = None
+    if cities:
+        # Only the cost answer has city-level data, and only for one city
+        if intent != Intent.COST or len(cities) > 1 or len(mentions) > 1:
+            return None
+        city = cities.pop()
+
+    covered = set()
+    for start, end in trigger_spans + [(m.start, m.end) for m in mentions]:
+        covered.update(range(start, end))
+    allowed = FILLER_WORDS | INTENT_QUALIFIERS.get(intent, frozenset())
+    for i, token in enumerate(tokens):
+        if i not in covered and token not in allowed:
+            return None
+    return destinations, city
+
+
+def _iter_rule_matches(tokens: tuple[str, ...]):
+    """Yield (intent, start, end) for every prefix/contains rule found in the tokens."""
+    for start in range(len(tokens)):
+        node = _RULE_TRIE
+        for end in range(start, len(tokens)):
+            node = node.get(tokens[end])
+            if node is None:
+                break
+            for intent, mode in node.get(_TERMINAL, ()):
+                if mode == "contains" or start == 0:
+                    yield intent, start, end + 1
@@ -0,0 +1,184 @@
+"""Write-behind queue for Zep memory persistence.
+
+Request handlers enqueue conversation messages and return immediately; a
+background worker drains the queue and hands each user's messages to that
+user's writer task, which batches them into a single write and retries
+failed writes with exponential backoff. Users are written independently, so
+one user's backoff never holds up anyone else's writes, and each user's
+messages are still written in order. The queue is bounded (counting
+messages already handed to writer tasks) - when it is full new messages are
+dropped (and counted) rather than slowing down a voice turn.
+"""
+
+import asyncio
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+# Defaults (overridable per queue)
+MEMORY_QUEUE_MAXSIZE = 1000
+MEMORY_BATCH_MAX = 20  # Messages pulled per worker cycle
+MEMORY_MAX_RETRIES = 3
+MEMORY_BACKOFF_BASE = 0.5  # Seconds; doubles per attempt
+MEMORY_DRAIN_TIMEOUT = 5.0  # Seconds to flush on shutdown
+
+
+@dataclass
+class MemoryWrite:
+    """One message waiting to be persisted."""
+    user_id: str
+    role: str
+    message: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+# Persists a user's batch; raises on failure so the queue can retry
+BatchWriter = Callable[[str, list[MemoryWrite]], Awaitable[None]]
+
+
+@dataclass
+class MemoryQueueStats:
+    """Counters for monitoring the queue."""
+    enqueued: int = 0
+    written: int = 0  # Messages persisted
+    batches: int = 0  # Writer calls that succeeded
+    retries: int = 0
+    failed: int = 0  # Messages given up on after retries
+    dropped: int = 0  # Messages rejected because the queue was full
+    max_depth: int = 0
+    last_error: Optional[str] = None
+
+
+class MemoryWriteQueue:
+    """Bounded write-behind queue with per-user batching and retry."""
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        maxsize: int = MEMORY_QUEUE_MAXSIZE,
+        batch_max: int = MEMORY_BATCH_MAX,
+        max_retries: int = MEMORY_MAX_RETRIES,
+        backoff_base: float = MEMORY_BACKOFF_BASE,
+    ):
+        self._writer = writer
+        self._maxsize = maxsize
+        self._batch_max = batch_max
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # user_id -> messages taken off the queue but not yet written, and the task writing them
+        self._user_writes: dict[str, list[MemoryWrite]] = {}
+        self._user_tasks: dict[str, asyncio.Task] = {}
+        self._in_flight = 0
+        self.stats = MemoryQueueStats()
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Create the queue and worker lazily, inside the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._maxsize)
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def enqueue(self, user_id: str, message: str, role: str = "user") -> bool:
+        """Queue a message for persistence. Never blocks; returns False if dropped."""
+        queue = self._ensure_worker()
+        try:
+            if queue.qsize() + self._in_flight >= self._maxsize:
+                raise asyncio.QueueFull
+            queue.put_nowait(MemoryWrite(user_id, role, message))
+        except asyncio.QueueFull:
+            self.stats.dropped += 1
+            print(f"[ATLAS Memory] Queue full ({self._maxsize}) - dropped {role} message for {user_id}", file=sys.stderr)
+            return False
+        self.stats.enqueued += 1
+        self.stats.max_depth = max(self.stats.max_depth, queue.qsize())
+        return True
+
+    async def _run(self) -> None:
+        """Worker loop: pull a batch and hand each message to its user's writer task."""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self._batch_max and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            self._in_flight += len(batch)
+            for write in batch:
+                self._user_writes.setdefault(write.user_id, []).append(write)
+                if write.user_id not in self._user_tasks:
+                    self._user_tasks[write.user_id] = asyncio.create_task(self._write_user(write.user_id))
+
+    async def _write_user(self, user_id: str) -> None:
+        """Write a user's pending messages in order, one batch at a time, until none are left."""
+        queue = self._queue
+        pending = self._user_writes[user_id]
+        try:
+            while pending:
+                writes = pending[:self._batch_max]
+                del pending[:self._batch_max]
+                try:
+                    await self._write_with_retry(user_id, writes)
+                finally:
+                    self._in_flight -= len(writes)
+                    for _ in writes:
+                        queue.task_done()
+        finally:
+            # No await since the last check, so the worker can't have added more
+            del self._user_tasks[user_id]
+            if not pending:
+                del self._user_writes[user_id]
+
+    async def _write_with_retry(self, user_id: str, writes: list[MemoryWrite]) -> None:
+        """Write one user's batch, retrying with exponential backoff."""
+        for attempt in range(self._max_retries + 1):
+            try:
+                await self._writer(user_id, writes)
+                self.stats.written += len(writes)
+                self.stats.batches += 1
+                return
+            except Exception as e:
+                self.stats.last_error = str(e)[:200]
+                if attempt == self._max_retries:
+                    break
+                self.stats.retries += 1
+                await asyncio.sleep(self._backoff_base * (2 ** attempt))
+
+        self.stats.failed += len(writes)
+        print(f"[ATLAS Memory] Gave up on {len(writes)} messages for {user_id}: {self.stats.last_error}", file=sys.stderr)
+
+    async def drain(self, timeout: float = MEMORY_DRAIN_TIMEOUT) -> None:
+        """Flush pending writes (bounded by timeout), then stop the worker."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"[ATLAS Memory] Drain timed out with {self.depth} messages pending", file=sys.stderr)
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        writers = list(self._user_tasks.values())
+        for task in writers:
+            task.cancel()
+        await asyncio.gather(*writers, return_exceptions=True)
+
+    def metrics(self) -> dict:
+        """Queue depth plus counters, for the debug endpoint."""
+        return {
+            "depth": self.depth,
+            "in_flight": self._in_flight,
+            "users_writing": len(self._user_tasks),
+            "maxsize": self._maxsize,
+            "worker_running": bool(self._worker and not self._worker.done()),
+            **self.stats.__dict__,
+        }
@@ -0,0 +1,168 @@
+"""Complexity-based model routing for the voice and chat agents.
+
+Each turn is classified from cheap local features - word count, destinations
+mentioned, comparison and advice markers - into a simple lookup, a comparison
+or open-ended advice. Simple turns go to the fastest model; harder ones to
+the stronger model. The policy (complexity -> models, per surface) can be
+overridden with the MODEL_ROUTING_POLICY env var, e.g.
+
+    {"voice": {"simple": ["groq:llama-3.1-8b-instant"]}}
+
+Every decision is logged and counted for /debug/routing.
+"""
+
+import json
+import os
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Literal, Optional
+
+from .intents import find_destinations, tokenize
+
+
+class Complexity(str, Enum):
+    """How much reasoning a turn needs."""
+    SIMPLE = "simple"  # Factual lookup about one thing
+    COMPARISON = "comparison"  # Weighing two or more destinations
+    OPEN_ENDED = "open_ended"  # Advice, planning, recommendations
+
+
+Surface = Literal["voice", "chat", "expert"]
+
+# Models in preference order per complexity; voice lists double as hedge order
+DEFAULT_ROUTING_POLICY: dict[str, dict[str, list[str]]] = {
+    "voice": {
+        "simple": ["groq:llama-3.1-8b-instant", "google-gla:gemini-2.0-flash"],
+        "comparison": ["groq:llama-3.3-70b-versatile", "google-gla:gemini-2.0-flash"],
+        "open_ended": ["groq:llama-3.3-70b-versatile", "google-gla:gemini-2.0-flash"],
+    },
+    # Tool-calling agents (CopilotKit chat, Destination Expert)
+    "chat": {
+        "simple": ["google-gla:gemini-2.0-flash-lite"],
+        "comparison": ["google-gla:gemini-2.0-flash"],
+        "open_ended": ["google-gla:gemini-2.0-flash"],
+    },
+    "expert": {
+        "simple": ["google-gla:gemini-2.0-flash-lite"],
+        "comparison": ["google-gla:gemini-2.0-flash"],
+        "open_ended": ["google-gla:gemini-2.0-flash"],
+    },
+}
+
+# Cheap features
+OPEN_ENDED_WORD_COUNT = 25  # Long, multi-part messages need the stronger model
+COMPARISON_MARKERS = (
+    "compare", "comparing", "comparison", "vs", "versus", "difference between",
+    "better", "cheaper", "safer",
+)
+OPEN_ENDED_MARKERS = (
+    "should i", "should we", "recommend", "advice", "advise", "best place", "best country",
+    "where should", "which country", "which destination", "help me decide", "help me choose",
+    "pros and cons", "worth it", "what do you think", "plan", "planning", "strategy",
+    "my family", "my situation", "retire", "why",
+)
+
+# API keys each provider needs - models without one are skipped
+PROVIDER_KEYS: dict[str, tuple[str, ...]] = {
+    "groq": ("GROQ_API_KEY",),
+    "google-gla": ("GOOGLE_API_KEY", "GEMINI_API_KEY"),
+}
+
+
+def _load_policy() -> dict[str, dict[str, list[str]]]:
+    """Default policy with any MODEL_ROUTING_POLICY overrides merged in."""
+    policy = {surface: dict(tiers) for surface, tiers in DEFAULT_ROUTING_POLICY.items()}
+    override = os.environ.get("MODEL_ROUTING_POLICY", "")
+    if override:
+        try:
+            for surface, tiers in json.loads(override).items():
+                policy.setdefault(surface, {}).update(tiers)
+        except (ValueError, AttributeError) as e:
+            print(f"[ATLAS Router] Ignoring invalid MODEL_ROUTING_POLICY: {e}", file=sys.stderr)
+    return policy
+
+
+ROUTING_POLICY = _load_policy()
+
+# (surface, complexity, model) -> turns routed
+routing_stats: Counter = Counter()
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The models chosen for a turn and why."""
+    surface: str
+    complexity: Complexity
+    models: tuple[str, ...]  # Preference order - first is primary
+    features: dict = field(default_factory=dict, compare=False)
+
+    @property
+    def model(self) -> str:
+        return self.models[0]
+
+
+def classify_complexity(text: str) -> tuple[Complexity, dict]:
+    """
+    Classify a turn from local features.
+
+    Returns:
+        (complexity, features) - features are kept for logging
+    """
+    tokens = tokenize(text)
+    padded = f" {' '.join(tokens)} "
+    destinations = find_destinations(tokens)
+    comparison = next((m for m in COMPARISON_MARKERS if f" {m} " in padded), None)
+    open_ended = next((m for m in OPEN_ENDED_MARKERS if f" {m} " in padded), None)
+    features = {
+        "words": len(tokens),
+        "destinations": len(destinations),
+        "comparison_marker": comparison,
+        "open_ended_marker": open_ended,
+    }
+
+    if len(destinations) >= 2 or (comparison and destinations):
+        return Complexity.COMPARISON, features
+    if open_ended or len(tokens) > OPEN_ENDED_WORD_COUNT:
+        return Complexity.OPEN_ENDED, features
+    return Complexity.SIMPLE, features
+
+
+def model_available(model_name: str) -> bool:
+    """True if the model's provider has an API key (unknown providers are assumed configured)."""
+    provider = model_name.split(":", 1)[0]
+    keys = PROVIDER_KEYS.get(provider)
+    return keys is None or any(os.environ.get(k) for k in keys)
+
+
+def route_turn(
+    text: Optional[str],
+    surface: Surface,
+    fallback: str = "google-gla:gemini-2.0-flash",
+    record: bool = True,
+) -> RouteDecision:
+    """Pick the models for a turn on a surface, and log the decision (unless record=False)."""
+    complexity, features = classify_complexity(text or "")
+    tiers = ROUTING_POLICY.get(surface, {})
+    models = tuple(m for m in tiers.get(complexity.value, []) if model_available(m)) or (fallback,)
+    decision = RouteDecision(surface, complexity, models, features)
+    if not record:
+        return decision
+
+    routing_stats[(surface, complexity.value, decision.model)] += 1
+    print(f"[ATLAS Router] {surface}: {complexity.value} -> {decision.model} "
+          f"(words={features['words']}, destinations={features['destinations']}, "
+          f"markers={features['comparison_marker'] or features['open_ended_marker'] or 'none'})", file=sys.stderr)
+    return decision
+
+
+def routing_metrics() -> dict:
+    """Policy in force plus turn counts per surface/complexity/model."""
+    return {
+        "policy": ROUTING_POLICY,
+        "routed": [
+            {"surface": s, "complexity": c, "model": m, "turns": n}
+            for (s, c, m), n in sorted(routing_stats.items())
+        ],
+    }
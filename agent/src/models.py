@@ -1,6 +1,6 @@
 """Pydantic models for Relocation Quest V2 agent."""
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Literal, Any
 from enum import Enum
 
@@ -20,6 +20,7 @@ class SearchResults(BaseModel):
     """Results from article search."""
     articles: list[Article]
     query: str
+    embedding: Optional[list[float]] = None  # Query embedding, when Voyage is configured
 
 
 class ArticleCardData(BaseModel):
@@ -33,7 +34,9 @@ class ArticleCardData(BaseModel):
 
 
 class MapLocation(BaseModel):
-    """Location data for map rendering."""
+    """Location data for map rendering (frozen - reference pack locations are shared)."""
+    model_config = ConfigDict(frozen=True)
+
     name: str
     lat: float
     lng: float
@@ -42,6 +45,8 @@ class MapLocation(BaseModel):
 
 class TimelineEvent(BaseModel):
     """Event for timeline visualization (visa processing steps)."""
+    model_config = ConfigDict(frozen=True)
+
     year: int
     title: str
     description: str
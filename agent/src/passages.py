@@ -0,0 +1,244 @@
+"""Query-aware passage retrieval - send the LLM the parts of a guide that answer the question.
+
+Guides are split into paragraph-sized passages once (cached per article) and
+ranked against the query with BM25. The best passages are packed into a token
+budget and regrouped under their article titles, so prompts stay small and
+relevant instead of carrying the first N characters of every guide.
+"""
+
+import math
+import re
+import sys
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from .models import Article
+from .prompt_builder import count_tokens
+
+# Passage sizing (characters)
+PASSAGE_MIN_CHARS = 120  # Shorter paragraphs (headings, one-liners) merge into the next
+PASSAGE_MAX_CHARS = 900  # Longer paragraphs are split on sentence boundaries
+
+# Default selection limits
+DEFAULT_PASSAGE_TOP_K = 6
+DEFAULT_PASSAGE_TOKEN_BUDGET = 600
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_MATCH_BOOST = 0.5  # Added per query term found in the article title
+
+# Split cache (max 500 articles)
+_passage_cache: OrderedDict = OrderedDict()
+MAX_CACHED_ARTICLES = 500
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = {
+    "a", "about", "an", "and", "are", "as", "at", "be", "by", "can", "could",
+    "do", "does", "for", "from", "how", "i", "in", "is", "it", "me", "my",
+    "of", "on", "or", "please", "should", "tell", "that", "the", "there",
+    "this", "to", "was", "what", "when", "where", "which", "who", "why",
+    "will", "with", "would", "you", "your",
+}
+
+
+@dataclass(frozen=True)
+class Passage:
+    """A paragraph-sized slice of a guide."""
+    article_id: str
+    title: str
+    position: int  # Index of the passage within its article
+    text: str
+    term_counts: Counter
+    length: int  # Number of terms, for BM25 length normalisation
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed."""
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def _split_long(paragraph: str) -> list[str]:
+    """Split an oversized paragraph into sentence-aligned chunks."""
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_RE.split(paragraph):
+        if current and len(current) + len(sentence) + 1 > PASSAGE_MAX_CHARS:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_into_passages(article: Article) -> list[Passage]:
+    """
+    Split an article into passages, caching the result per article.
+
+    The cache key includes the content length and hash so an edited guide
+    is re-split instead of serving stale passages.
+    """
+    key = (article.id, len(article.content), hash(article.content))
+    cached = _passage_cache.get(key)
+    if cached is not None:
+        _passage_cache.move_to_end(key)
+        return cached
+
+    texts = []
+    pending = ""
+    for raw in _PARAGRAPH_RE.split(article.content):
+        paragraph = " ".join(raw.split())
+        if not paragraph:
+            continue
+        if pending:
+            paragraph = f"{pending} {paragraph}"
+            pending = ""
+        if len(paragraph) < PASSAGE_MIN_CHARS:
+            pending = paragraph
+            continue
+        if len(paragraph) > PASSAGE_MAX_CHARS:
+            texts.extend(_split_long(paragraph))
+        else:
+            texts.append(paragraph)
+    if pending:
+        texts.append(pending)
+
+    passages = []
+    for position, text in enumerate(texts):
+        terms = tokenize(text)
+        passages.append(Passage(
+            article_id=article.id,
+            title=article.title,
+            position=position,
+            text=text,
+            term_counts=Counter(terms),
+            length=len(terms),
+        ))
+
+    _passage_cache[key] = passages
+    while len(_passage_cache) > MAX_CACHED_ARTICLES:
+        _passage_cache.popitem(last=False)
+    return passages
+
+
+def _bm25_scores(query_terms: list[str], passages: list[Passage]) -> list[float]:
+    """Score passages against the query with BM25 (IDF over the candidate set)."""
+    n = len(passages)
+    avg_len = sum(p.length for p in passages) / n or 1.0
+
+    idf = {}
+    for term in set(query_terms):
+        df = sum(1 for p in passages if term in p.term_counts)
+        idf[term] = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    scores = []
+    for p in passages:
+        score = 0.0
+        for term in query_terms:
+            tf = p.term_counts.get(term, 0)
+            if tf:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * p.length / avg_len)
+                score += idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def select_passages(
+    query: str,
+    articles: list[Article],
+    max_tokens: int = DEFAULT_PASSAGE_TOKEN_BUDGET,
+    top_k: int = DEFAULT_PASSAGE_TOP_K,
+) -> list[Passage]:
+    """
+    Pick the passages most relevant to the query within a token budget.
+
+    Falls back to the opening passages of the top-ranked article when no
+    passage shares a term with the query (e.g. "yes" resolved to a topic).
+
+    Returns:
+        Selected passages ordered by article rank, then position in the article
+    """
+    if not articles:
+        return []
+
+    article_rank = {a.id: rank for rank, a in enumerate(articles)}
+    passages = [p for a in articles for p in split_into_passages(a)]
+    if not passages:
+        return []
+
+    query_terms = tokenize(query)
+    scores = _bm25_scores(query_terms, passages) if query_terms else [0.0] * len(passages)
+
+    if not any(scores):
+        # No lexical overlap - keep the old "lead of the best guide" behaviour
+        ranked = [p for p in passages if p.article_id == articles[0].id]
+    else:
+        title_terms = {a.id: set(tokenize(a.title)) for a in articles}
+        boosted = []
+        for p, score in zip(passages, scores):
+            if score > 0:
+                score += TITLE_MATCH_BOOST * len(title_terms[p.article_id].intersection(query_terms))
+            boosted.append((score, -article_rank[p.article_id], -p.position, p))
+        boosted.sort(key=lambda item: item[:3], reverse=True)
+        ranked = [item[3] for item in boosted if item[0] > 0]
+
+    selected = []
+    used_tokens = 0
+    for p in ranked:
+        if len(selected) >= top_k:
+            break
+        cost = count_tokens(p.text)
+        if used_tokens + cost > max_tokens:
+            if selected:
+                continue
+            # Always return something - trim the single best passage to fit
+            p = Passage(p.article_id, p.title, p.position, p.text[:max_tokens * 4], p.term_counts, p.length)
+            cost = count_tokens(p.text)
+        selected.append(p)
+        used_tokens += cost
+
+    selected.sort(key=lambda p: (article_rank[p.article_id], p.position))
+    return selected
+
+
+def passage_sections(
+    query: str,
+    articles: list[Article],
+    max_tokens: int = DEFAULT_PASSAGE_TOKEN_BUDGET,
+    top_k: int = DEFAULT_PASSAGE_TOP_K,
+) -> list[str]:
+    """
+    Select relevant passages and group them per guide, best-ranked guide first.
+
+    Each section is formatted as "## Title" followed by its passages - the same
+    layout the prompts used before - so prompt builders can budget per guide.
+    """
+    selected = select_passages(query, articles, max_tokens=max_tokens, top_k=top_k)
+
+    sections: list[str] = []
+    current_id: Optional[str] = None
+    for p in selected:
+        if p.article_id != current_id:
+            sections.append(f"## {p.title}\n{p.text}")
+            current_id = p.article_id
+        else:
+            sections[-1] += f"\n\n{p.text}"
+
+    print(f"[ATLAS Passages] '{query[:30]}' -> {len(selected)} passages from {len(sections)} guides", file=sys.stderr)
+    return sections
+
+
+def build_passage_context(
+    query: str,
+    articles: list[Article],
+    max_tokens: int = DEFAULT_PASSAGE_TOKEN_BUDGET,
+    top_k: int = DEFAULT_PASSAGE_TOP_K,
+) -> str:
+    """Build LLM source material from the passages most relevant to the query."""
+    return "\n\n".join(passage_sections(query, articles, max_tokens=max_tokens, top_k=top_k))
@@ -0,0 +1,162 @@
+"""Token-budgeted prompt assembly for ATLAS.
+
+Prompts are built from named sections with priorities. Each model has an input
+budget; when the assembled prompt is over budget, the lowest-value sections
+(highest priority number) are dropped first until it fits. Required sections
+(persona, the user's question) are never dropped.
+
+Token counts use a local approximation of BPE tokenizers - close enough to
+keep latency and cost predictable without shipping a tokenizer per model.
+"""
+
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+# Input budgets per model (tokens). These are latency/cost budgets, well below
+# the models' context windows - a smaller prompt means a faster first token.
+MODEL_INPUT_BUDGETS: dict[str, int] = {
+    "groq:llama-3.1-8b-instant": 3000,
+    "groq:llama-3.3-70b-versatile": 4000,
+    "google-gla:gemini-2.0-flash": 6000,
+    "google-gla:gemini-2.0-flash-lite": 6000,
+}
+DEFAULT_INPUT_BUDGET = 4000
+
+# Section priorities (lower = more valuable, dropped last)
+PRIORITY_REQUIRED = 0
+PRIORITY_HIGH = 1
+PRIORITY_MEDIUM = 3
+PRIORITY_LOW = 5
+
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def count_tokens(text: str) -> int:
+    """
+    Approximate the token count of text.
+
+    Words up to 6 letters are usually one BPE token, longer words split
+    roughly every 5 characters; digits group in threes; punctuation and
+    symbols are a token each.
+    """
+    total = 0
+    for piece in _TOKEN_RE.findall(text):
+        if piece[0].isalpha():
+            total += 1 if len(piece) <= 6 else (len(piece) + 4) // 5
+        elif piece[0].isdigit():
+            total += (len(piece) + 2) // 3
+        else:
+            total += 1
+    return max(1, total)
+
+
+def get_input_budget(model: Optional[str]) -> int:
+    """
+    Input token budget for a model (falls back to the default).
+
+    Accepts "provider:model" strings or bare model names, as reported by
+    RunContext.model.model_name.
+    """
+    if not model:
+        return DEFAULT_INPUT_BUDGET
+    if model in MODEL_INPUT_BUDGETS:
+        return MODEL_INPUT_BUDGETS[model]
+    for key, budget in MODEL_INPUT_BUDGETS.items():
+        if key.split(":", 1)[-1] == model:
+            return budget
+    return DEFAULT_INPUT_BUDGET
+
+
+@dataclass
+class PromptSection:
+    """A named piece of a prompt."""
+    name: str
+    text: str
+    priority: int = PRIORITY_MEDIUM
+    role: Literal["system", "user"] = "user"
+    tokens: int = 0
+
+
+@dataclass
+class BuiltPrompt:
+    """Result of prompt assembly."""
+    system: str
+    user: str
+    model: Optional[str]
+    budget: int
+    system_tokens: int
+    user_tokens: int
+    dropped: list[str] = field(default_factory=list)
+
+    @property
+    def token_count(self) -> int:
+        return self.system_tokens + self.user_tokens
+
+
+class PromptBuilder:
+    """
+    Assemble system and user prompts within a model's input budget.
+
+    Usage:
+        builder = PromptBuilder(model)
+        builder.add("persona", ATLAS_SYSTEM_PROMPT, PRIORITY_REQUIRED, role="system")
+        builder.add("article_2", context, PRIORITY_LOW)
+        built = builder.build()
+    """
+
+    def __init__(self, model: Optional[str] = None, budget: Optional[int] = None):
+        self.model = model
+        self.budget = budget if budget is not None else get_input_budget(model)
+        self.sections: list[PromptSection] = []
+
+    def add(
+        self,
+        name: str,
+        text: str,
+        priority: int = PRIORITY_MEDIUM,
+        role: Literal["system", "user"] = "user",
+    ) -> "PromptBuilder":
+        """Append a section (empty text is ignored)."""
+        if text:
+            self.sections.append(PromptSection(name, text, priority, role, count_tokens(text)))
+        return self
+
+    def build(self) -> BuiltPrompt:
+        """Drop lowest-value sections until the prompt fits, then join by role."""
+        dropped = []
+        dropped_at: set[int] = set()  # Section indexes - equal sections can't be told apart by value
+        total = sum(s.tokens for s in self.sections)
+
+        # Highest priority number first; among equals, drop later sections first
+        droppable = sorted(
+            ((s.priority, i, s) for i, s in enumerate(self.sections) if s.priority != PRIORITY_REQUIRED),
+            key=lambda item: item[:2],
+            reverse=True,
+        )
+        for _, i, section in droppable:
+            if total <= self.budget:
+                break
+            dropped_at.add(i)
+            dropped.append(section.name)
+            total -= section.tokens
+        kept = [s for i, s in enumerate(self.sections) if i not in dropped_at]
+
+        if total > self.budget:
+            print(f"[ATLAS Prompt] Required sections exceed budget: {total} > {self.budget} ({self.model})", file=sys.stderr)
+
+        system = "".join(s.text for s in kept if s.role == "system")
+        user = "".join(s.text for s in kept if s.role == "user")
+        built = BuiltPrompt(
+            system=system,
+            user=user,
+            model=self.model,
+            budget=self.budget,
+            system_tokens=sum(s.tokens for s in kept if s.role == "system"),
+            user_tokens=sum(s.tokens for s in kept if s.role == "user"),
+            dropped=dropped,
+        )
+        print(f"[ATLAS Prompt] {self.model}: {built.token_count}/{self.budget} tokens "
+              f"(system={built.system_tokens}, user={built.user_tokens}, dropped={dropped or 'none'})", file=sys.stderr)
+        return built
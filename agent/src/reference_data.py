@@ -0,0 +1,189 @@
+"""Versioned, hot-reloadable reference data pack.
+
+Static reference tables - visa timelines, map coordinates, the gazetteer,
+featured destinations, era timelines and visa categories - live in a JSON
+data pack (src/data/reference_pack.json, or REFERENCE_PACK_PATH) instead of
+literals rebuilt on every tool call. The pack is validated and parsed once
+into read-only indexes (mapping proxies and tuples, with tool payloads
+already dumped), so tool calls only look things up.
+
+The file's mtime is checked at most every REFERENCE_PACK_CHECK_SECONDS and
+a changed file is reloaded in place; POST /admin/reference-pack/reload
+(with the admin token) forces it. A pack that fails to parse or validate
+is rejected and the previous one stays live. Content updates no longer
+need a deploy.
+"""
+
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from .models import MapLocation, TimelineEvent
+
+REFERENCE_PACK_PATH = os.environ.get(
+    "REFERENCE_PACK_PATH", os.path.join(os.path.dirname(__file__), "data", "reference_pack.json")
+)
+REFERENCE_PACK_CHECK_SECONDS = float(os.environ.get("REFERENCE_PACK_CHECK_SECONDS", "5"))
+
+T = TypeVar("T")
+
+
+class FeaturedDestination(BaseModel):
+    name: str
+    image: str
+    highlight: str
+    description: str
+
+
+class ReferencePackFile(BaseModel):
+    """Schema of the data pack file."""
+    version: int
+    visa_timelines: dict[str, list[TimelineEvent]]
+    map_locations: dict[str, MapLocation]
+    gazetteer: dict[str, MapLocation]  # Keyword -> location, first match wins
+    featured_destinations: list[FeaturedDestination]
+    era_timelines: dict[str, list[TimelineEvent]]
+    visa_categories: dict[str, str]  # Keyword -> category, first match wins
+
+
+@dataclass(frozen=True, slots=True)
+class ReferencePack:
+    """
+    Parsed pack. Indexes are read-only and shared: locations are frozen
+    models, and payload dicts leave the pack only as copies (payloads()).
+    """
+    version: int
+    visa_timelines: Mapping[str, tuple[dict, ...]]  # Dumped TimelineEvents
+    map_locations: Mapping[str, MapLocation]
+    gazetteer: tuple[tuple[str, MapLocation], ...]
+    featured_destinations: tuple[dict, ...]
+    era_timelines: Mapping[str, tuple[dict, ...]]
+    visa_categories: tuple[tuple[str, str], ...]
+
+
+def parse_reference_pack(raw: bytes) -> ReferencePack:
+    """Validate a pack file and build its indexes (raises ValueError/ValidationError)."""
+    data = ReferencePackFile.model_validate_json(raw)
+    return ReferencePack(
+        version=data.version,
+        visa_timelines=MappingProxyType({
+            key.lower(): tuple(e.model_dump() for e in events) for key, events in data.visa_timelines.items()
+        }),
+        map_locations=MappingProxyType({key.lower(): loc for key, loc in data.map_locations.items()}),
+        gazetteer=tuple((key.lower(), loc) for key, loc in data.gazetteer.items()),
+        featured_destinations=tuple(d.model_dump() for d in data.featured_destinations),
+        era_timelines=MappingProxyType({
+            # Era events carry no article_id - keep just the fields given
+            key.lower(): tuple(e.model_dump(exclude_unset=True) for e in events) for key, events in data.era_timelines.items()
+        }),
+        visa_categories=tuple((key.lower(), label) for key, label in data.visa_categories.items()),
+    )
+
+
+def payloads(items: tuple[dict, ...]) -> list[dict]:
+    """Copies of a pack's payload dicts, safe to hand to callers that mutate them."""
+    return [dict(item) for item in items]
+
+
+def match_key(index: Mapping[str, T], name: str) -> Optional[tuple[str, T]]:
+    """
+    (key, value) for a name: exact key first, else the first key that
+    contains the name or is contained in it (the tools' historic matching).
+    """
+    name = name.lower().strip()
+    if not name:
+        return None
+    if name in index:
+        return name, index[name]
+    for key, value in index.items():
+        if key in name or name in key:
+            return key, value
+    return None
+
+
+class ReferencePackStore:
+    """Holds the live pack and reloads it when the file changes."""
+
+    def __init__(self, path: str, check_seconds: float = REFERENCE_PACK_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.reloads = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._mtime = os.stat(path).st_mtime
+        self._checked_at = time.monotonic()
+        self._loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with open(path, "rb") as f:
+            # No fallback at startup - the pack ships with the code
+            self._pack = parse_reference_pack(f.read())
+
+    def get(self) -> ReferencePack:
+        """The live pack (reloaded first if the file changed since the last check)."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_seconds:
+            self._checked_at = now
+            try:
+                if os.stat(self.path).st_mtime != self._mtime:
+                    self.reload()
+            except OSError as e:
+                self._reject(e)
+        return self._pack
+
+    def reload(self) -> bool:
+        """Parse the file and swap it in; on failure keep the current pack. Returns success."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, "rb") as f:
+                pack = parse_reference_pack(f.read())
+        except (OSError, ValueError, ValidationError) as e:
+            self._reject(e)
+            return False
+        previous, self._pack, self._mtime = self._pack.version, pack, mtime
+        self._loaded_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.reloads += 1
+        self.last_error = None
+        print(f"[ReferencePack] Loaded version {pack.version} (was {previous}) from {self.path}", file=sys.stderr)
+        return True
+
+    def _reject(self, error: Exception) -> None:
+        self.errors += 1
+        self.last_error = str(error)[:500]
+        # Don't retry the same broken file on every check
+        try:
+            self._mtime = os.stat(self.path).st_mtime
+        except OSError:
+            pass
+        print(f"[ReferencePack] Keeping version {self._pack.version} - reload failed: {error}", file=sys.stderr)
+
+    def metrics(self) -> dict:
+        pack = self._pack
+        return {
+            "path": self.path,
+            "version": pack.version,
+            "loaded_at": self._loaded_at,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "tables": {
+                "visa_timelines": len(pack.visa_timelines),
+                "map_locations": len(pack.map_locations),
+                "gazetteer": len(pack.gazetteer),
+                "featured_destinations": len(pack.featured_destinations),
+                "era_timelines": len(pack.era_timelines),
+                "visa_categories": len(pack.visa_categories),
+            },
+        }
+
+
+reference_packs = ReferencePackStore(REFERENCE_PACK_PATH)
+
+
+def reference_pack() -> ReferencePack:
+    """The live reference data pack."""
+    return reference_packs.get()
@@ -0,0 +1,337 @@
+"""Pluggable session stores for CLM session context.
+
+Sessions are evicted by idle time (last interaction older than the TTL)
+rather than by count, so busy voice sessions are never pushed out by new
+ones. A memory budget (bytes, not entries) bounds the store: when it is
+exceeded, the least recently used sessions go first. Two backends:
+
+- memory: a dict in this process (the default, one worker)
+- sqlite: a SQLite file in WAL mode, shared by every worker (and replica)
+  that can reach the same path - session continuity survives uvicorn
+  running with several workers
+
+Backends store whatever the codec turns a session into, so callers must
+save a session after mutating it (the sqlite backend hands out copies).
+Async callers use load() and modify(): the sqlite backend runs them in a
+worker thread, so lock waits never stall the event loop, and modify() is
+one read-modify-write inside BEGIN IMMEDIATE, so concurrent workers don't
+lose each other's updates.
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+SESSION_IDLE_TTL_SECONDS = int(os.environ.get("SESSION_IDLE_TTL_SECONDS", str(30 * 60)))
+SESSION_SWEEP_INTERVAL_SECONDS = 60  # Idle sessions are swept at most this often
+SESSION_MEMORY_BUDGET_BYTES = int(os.environ.get("SESSION_MEMORY_BUDGET_BYTES", str(64 * 1024 * 1024)))
+
+
+def json_size(data: dict) -> int:
+    """Default session size estimate: its JSON encoding."""
+    return len(json.dumps(data, default=str))
+
+
+class SessionStore(ABC, Generic[T]):
+    """Interface for session backends (an incomplete backend fails at construction)."""
+
+    def __init__(
+        self,
+        encode: Callable[[T], dict],
+        decode: Callable[[dict], T],
+        ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+        budget_bytes: int = SESSION_MEMORY_BUDGET_BYTES,
+        size_of: Optional[Callable[[T], int]] = None,
+    ):
+        self._encode = encode
+        self._decode = decode
+        self._size_of = size_of or (lambda session: json_size(encode(session)))
+        self.ttl_seconds = ttl_seconds
+        self.budget_bytes = budget_bytes
+        self._last_sweep = time.time()
+        self.evicted = 0  # Idle past the TTL
+        self.evicted_for_budget = 0
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[T]:
+        """The session, or None if unknown or idle past the TTL."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, session_id: str, session: T, last_interaction: float) -> None:
+        """Save a session and its last interaction time."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(
+        self,
+        session_id: str,
+        mutate: Callable[[T], None],
+        create: Callable[[], T],
+        last_interaction: float,
+    ) -> T:
+        """Read, mutate and save a session as one atomic step (creating it if missing)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop sessions idle longer than the TTL; returns how many."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def metrics(self) -> dict:
+        """Session count and memory use."""
+        raise NotImplementedError
+
+    async def load(self, session_id: str) -> Optional[T]:
+        """get() without blocking the event loop."""
+        return await self._call(self.get, session_id)
+
+    async def modify(
+        self,
+        session_id: str,
+        mutate: Callable[[T], None],
+        create: Callable[[], T],
+        last_interaction: float,
+    ) -> T:
+        """update() without blocking the event loop."""
+        return await self._call(self.update, session_id, mutate, create, last_interaction)
+
+    async def load_metrics(self) -> dict:
+        """metrics() without blocking the event loop."""
+        return await self._call(self.metrics)
+
+    async def _call(self, fn: Callable, *args: Any) -> Any:
+        # In-process backends never block - run inline
+        return fn(*args)
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        if now - self._last_sweep >= SESSION_SWEEP_INTERVAL_SECONDS:
+            self._last_sweep = now
+            self.evict_idle(now)
+
+
+class InProcessSessionStore(SessionStore[T]):
+    """Sessions held as live objects in this process, in least-recently-used order."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # session_id -> (session, last interaction, approx bytes)
+        self._sessions: OrderedDict[str, tuple[T, float, int]] = OrderedDict()
+        self._bytes = 0
+
+    def get(self, session_id: str) -> Optional[T]:
+        self._maybe_sweep()
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        session, last_interaction, _ = entry
+        if time.time() - last_interaction > self.ttl_seconds:
+            self.delete(session_id)
+            self.evicted += 1
+            return None
+        return session
+
+    def put(self, session_id: str, session: T, last_interaction: float) -> None:
+        old = self._sessions.pop(session_id, None)
+        if old is not None:
+            self._bytes -= old[2]
+        size = self._size_of(session)
+        self._sessions[session_id] = (session, last_interaction, size)
+        self._bytes += size
+
+        # Over budget: drop least recently used sessions (never the one just saved)
+        while self._bytes > self.budget_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            self.delete(oldest)
+            self.evicted_for_budget += 1
+
+    def update(
+        self,
+        session_id: str,
+        mutate: Callable[[T], None],
+        create: Callable[[], T],
+        last_interaction: float,
+    ) -> T:
+        # No await between read and write - atomic on the event loop
+        session = self.get(session_id)
+        if session is None:
+            session = create()
+        mutate(session)
+        self.put(session_id, session, last_interaction)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.time()) - self.ttl_seconds
+        idle = [sid for sid, (_, last, _) in self._sessions.items() if last < cutoff]
+        for sid in idle:
+            self.delete(sid)
+        self.evicted += len(idle)
+        return len(idle)
+
+    def metrics(self) -> dict:
+        return {
+            "backend": "memory",
+            "sessions": len(self._sessions),
+            "approx_bytes": self._bytes,
+            "avg_bytes": self._bytes // len(self._sessions) if self._sessions else 0,
+            "budget_bytes": self.budget_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted_idle": self.evicted,
+            "evicted_for_budget": self.evicted_for_budget,
+        }
+
+
+class SQLiteSessionStore(SessionStore[T]):
+    """Sessions as JSON rows in a SQLite file shared between processes."""
+
+    def __init__(self, path: str, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, data TEXT NOT NULL, last_interaction REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_interaction ON sessions(last_interaction)")
+
+    def get(self, session_id: str) -> Optional[T]:
+        self._maybe_sweep()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, last_interaction FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        data, last_interaction = row
+        if time.time() - last_interaction > self.ttl_seconds:
+            self.delete(session_id)
+            self.evicted += 1
+            return None
+        return self._decode(json.loads(data))
+
+    def put(self, session_id: str, session: T, last_interaction: float) -> None:
+        data = json.dumps(self._encode(session), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, data, last_interaction) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, last_interaction = excluded.last_interaction",
+                (session_id, data, last_interaction),
+            )
+
+    def update(
+        self,
+        session_id: str,
+        mutate: Callable[[T], None],
+        create: Callable[[], T],
+        last_interaction: float,
+    ) -> T:
+        self._maybe_sweep()
+        with self._lock:
+            # Write lock up front: other workers wait instead of interleaving
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT data, last_interaction FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                if row is not None and time.time() - row[1] <= self.ttl_seconds:
+                    session = self._decode(json.loads(row[0]))
+                else:
+                    session = create()
+                mutate(session)
+                self._conn.execute(
+                    "INSERT INTO sessions (session_id, data, last_interaction) VALUES (?, ?, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET data = excluded.data, last_interaction = excluded.last_interaction",
+                    (session_id, json.dumps(self._encode(session), default=str), last_interaction),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return session
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        cutoff = (now or time.time()) - self.ttl_seconds
+        with self._lock:
+            count = self._conn.execute("DELETE FROM sessions WHERE last_interaction < ?", (cutoff,)).rowcount
+            # Then the least recently used rows until the data fits the budget
+            stored = self._conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM sessions").fetchone()[0]
+            if stored > self.budget_bytes:
+                over = self._conn.execute(
+                    "DELETE FROM sessions WHERE session_id IN ("
+                    " SELECT session_id FROM ("
+                    "  SELECT session_id, SUM(LENGTH(data)) OVER (ORDER BY last_interaction DESC) AS running"
+                    "  FROM sessions) WHERE running > ?)",
+                    (self.budget_bytes,),
+                ).rowcount
+                self.evicted_for_budget += over
+        self.evicted += count
+        return count
+
+    async def _call(self, fn: Callable, *args: Any) -> Any:
+        # sqlite3 blocks (up to the busy timeout on lock contention) - keep it off the loop
+        return await asyncio.to_thread(fn, *args)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            sessions, data_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions"
+            ).fetchone()
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "sessions": sessions,
+            "approx_bytes": data_bytes,
+            "avg_bytes": data_bytes // sessions if sessions else 0,
+            "file_bytes": page_count * page_size,
+            "budget_bytes": self.budget_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted_idle": self.evicted,
+            "evicted_for_budget": self.evicted_for_budget,
+        }
+
+
+def create_session_store(
+    encode: Callable[[T], dict],
+    decode: Callable[[dict], T],
+    size_of: Optional[Callable[[T], int]] = None,
+) -> SessionStore[T]:
+    """Backend from SESSION_STORE ("memory" or "sqlite", path in SESSION_STORE_PATH)."""
+    backend = os.environ.get("SESSION_STORE", "memory").lower()
+    if backend == "sqlite":
+        path = os.environ.get("SESSION_STORE_PATH", "/tmp/atlas_sessions.db")
+        try:
+            store = SQLiteSessionStore(path, encode, decode, size_of=size_of)
+            print(f"[SessionStore] Using SQLite session store at {path}", file=sys.stderr)
+            return store
+        except sqlite3.Error as e:
+            print(f"[SessionStore] SQLite store unavailable ({e}) - using in-process sessions", file=sys.stderr)
+    return InProcessSessionStore(encode, decode, size_of=size_of)
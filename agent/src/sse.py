@@ -0,0 +1,244 @@
+"""OpenAI-compatible SSE encoding for Hume EVI.
+
+Every chat.completion.chunk frame has the same envelope - only the message id
+(fixed per response) and the content change. SSEEncoder serializes the
+envelope once per response and splices in the JSON-escaped content, so a frame
+costs one small json.dumps of a string instead of a nested dict.
+
+Text is sent in clause or sentence-sized chunks rather than word by word:
+fewer frames and writes, and Hume's TTS gets whole phrases to shape prosody
+around. PhraseChunker does the same for streamed LLM deltas, except for
+the first phrase: that goes out at the first clause boundary or after
+FIRST_PHRASE_CHARS, so TTS can start speaking while the LLM is still going.
+"""
+
+import json
+import re
+import time
+from typing import Iterator, Optional
+
+# Chunk sizing (characters)
+PHRASE_MIN_CHARS = 24  # Clauses shorter than this merge with the next one
+PHRASE_MAX_CHARS = 160  # Longer clauses are split on the last space
+FIRST_PHRASE_CHARS = 20  # A streamed reply's first frame goes out by here (at a word break)
+
+SSE_STOP = f"data: {json.dumps({'choices': [{'delta': {}, 'finish_reason': 'stop'}]})}\n\n".encode()
+SSE_DONE = b"data: [DONE]\n\n"
+
+# A clause ends after sentence or clause punctuation (with any closing quote/bracket)
+_BOUNDARY_RE = re.compile(r"""[.!?;:,—…]+["')\]]*\s+""")
+
+_CONTENT_MARKER = "\x00content\x00"
+
+
+class SSEEncoder:
+    """Pre-encoded chat.completion.chunk envelope for one message id."""
+
+    __slots__ = ("msg_id", "_prefix", "_suffix")
+
+    def __init__(self, msg_id: str):
+        self.msg_id = msg_id
+        template = json.dumps({
+            "id": msg_id,
+            "object": "chat.completion.chunk",
+            "choices": [{
+                "index": 0,
+                "delta": {"content": _CONTENT_MARKER},
+                "finish_reason": None
+            }]
+        })
+        prefix, suffix = template.split(json.dumps(_CONTENT_MARKER))
+        self._prefix = f"data: {prefix}".encode()
+        self._suffix = f"{suffix}\n\n".encode()
+
+    def frame(self, content: str) -> bytes:
+        """Encode one content frame (byte-identical to json.dumps of the full chunk)."""
+        return b"".join((self._prefix, json.dumps(content).encode(), self._suffix))
+
+    def frames(self, content: str) -> Iterator[bytes]:
+        """Content frames for a complete reply, one per phrase."""
+        for phrase in split_phrases(content):
+            yield self.frame(phrase)
+
+    def encode(self, content: str) -> bytes:
+        """A complete reply - content frames, stop and done - as one buffer."""
+        return b"".join((*self.frames(content), SSE_STOP, SSE_DONE))
+
+
+# Slots spliced into pre-rendered replies at request time
+_MSG_ID_SLOT = "00000000-msg-id-slot-0000000000000000"
+NAME_SLOT = "{name}"
+
+
+class CannedReply:
+    """
+    A fixed reply rendered to its full SSE byte sequence once, at startup.
+
+    The text may contain NAME_SLOT; per request only the message id and the
+    (JSON-escaped) name are substituted into the pre-rendered bytes.
+    """
+
+    __slots__ = ("text", "_body", "_has_name")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._body = SSEEncoder(_MSG_ID_SLOT).encode(text)
+        self._has_name = NAME_SLOT in text
+
+    def render(self, msg_id: str, name: Optional[str] = None) -> bytes:
+        body = self._body.replace(_MSG_ID_SLOT.encode(), json.dumps(msg_id)[1:-1].encode())
+        if self._has_name:
+            body = body.replace(NAME_SLOT.encode(), json.dumps(name or "")[1:-1].encode())
+        return body
+
+
+def split_phrases(
+    text: str,
+    min_chars: int = PHRASE_MIN_CHARS,
+    max_chars: int = PHRASE_MAX_CHARS,
+) -> list[str]:
+    """
+    Split text into clause/sentence chunks for TTS.
+
+    Chunks keep their trailing whitespace, so "".join(chunks) == text.
+    """
+    chunks: list[str] = []
+    start = 0
+    for match in _BOUNDARY_RE.finditer(text):
+        end = match.end()
+        if end - start >= min_chars:
+            chunks.extend(_split_long(text[start:end], max_chars))
+            start = end
+    if start < len(text):
+        tail = text[start:]
+        # A short tail rides along with the previous chunk
+        if chunks and len(tail) < min_chars and len(chunks[-1]) + len(tail) <= max_chars:
+            chunks[-1] += tail
+        else:
+            chunks.extend(_split_long(tail, max_chars))
+    return chunks
+
+
+def _split_long(text: str, max_chars: int) -> list[str]:
+    """Split an over-long clause on spaces (a single huge word is left whole)."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            break
+        pieces.append(text[:cut + 1])
+        text = text[cut + 1:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+class PhraseChunker:
+    """
+    Coalesce streamed LLM deltas into phrases.
+
+    feed() returns the phrases completed by a delta (often none); flush()
+    returns whatever is left once the stream ends. The first phrase is
+    released early - at the first clause boundary, or at the last word break
+    once first_chars have arrived - to keep time-to-first-audio low.
+    """
+
+    __slots__ = ("min_chars", "max_chars", "first_chars", "_buffer", "_started")
+
+    def __init__(
+        self,
+        min_chars: int = PHRASE_MIN_CHARS,
+        max_chars: int = PHRASE_MAX_CHARS,
+        first_chars: int = FIRST_PHRASE_CHARS,
+    ):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.first_chars = first_chars
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, delta: str) -> list[str]:
+        self._buffer += delta
+        if not self._started:
+            return self._feed_first()
+        if len(self._buffer) < self.min_chars:
+            return []
+
+        # Emit up to the last clause boundary past the minimum
+        cut = 0
+        for match in _BOUNDARY_RE.finditer(self._buffer):
+            if match.end() >= self.min_chars:
+                cut = match.end()
+        if not cut and len(self._buffer) > self.max_chars:
+            cut = self._buffer.rfind(" ", 0, self.max_chars) + 1
+        if not cut:
+            return []
+
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return _split_long(ready, self.max_chars)
+
+    def _feed_first(self) -> list[str]:
+        match = _BOUNDARY_RE.search(self._buffer)
+        if match:
+            cut = match.end()
+        elif len(self._buffer) >= self.first_chars:
+            cut = self._buffer.rfind(" ") + 1
+        else:
+            cut = 0
+        if not cut:
+            return []
+
+        self._started = True
+        first, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        # Whatever followed the first phrase goes through normal chunking
+        rest = self.feed("") if self._buffer else []
+        return [*_split_long(first, self.max_chars), *rest]
+
+    def flush(self) -> list[str]:
+        rest, self._buffer = self._buffer, ""
+        return _split_long(rest, self.max_chars) if rest else []
+
+
+def _legacy_frames(content: str, msg_id: str) -> Iterator[bytes]:
+    """Word-per-frame encoding with a json.dumps per chunk dict (the old path)."""
+    words = content.split(' ')
+    for i, word in enumerate(words):
+        chunk = {
+            "id": msg_id,
+            "object": "chat.completion.chunk",
+            "choices": [{
+                "index": 0,
+                "delta": {"content": word + (' ' if i < len(words) - 1 else '')},
+                "finish_reason": None
+            }]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n".encode()
+    yield SSE_STOP
+    yield SSE_DONE
+
+
+def benchmark_encoders(content: str, rounds: int = 200, msg_id: Optional[str] = None) -> dict:
+    """Compare the word-per-frame encoder with the phrase encoder on one reply."""
+    msg_id = msg_id or "bench-00000000-0000-0000-0000-000000000000"
+
+    def run(encode) -> dict:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            frames = list(encode())
+        elapsed = time.perf_counter() - start
+        return {
+            "frames": len(frames),
+            "bytes": sum(len(f) for f in frames),
+            "frames_per_sec": round(len(frames) * rounds / elapsed),
+            "us_per_reply": round(elapsed / rounds * 1_000_000, 1),
+        }
+
+    legacy = run(lambda: _legacy_frames(content, msg_id))
+    phrase = run(lambda: [*SSEEncoder(msg_id).frames(content), SSE_STOP, SSE_DONE])
+    return {
+        "chars": len(content),
+        "legacy": legacy,
+        "phrase": phrase,
+        "speedup": round(legacy["us_per_reply"] / phrase["us_per_reply"], 2) if phrase["us_per_reply"] else None,
+        "bytes_saved_pct": round((1 - phrase["bytes"] / legacy["bytes"]) * 100, 1),
+    }
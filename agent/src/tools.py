@@ -8,6 +8,7 @@ from typing import Optional
 
 from .models import Article, SearchResults, ArticleCardData, MapLocation, TimelineEvent
 from .database import search_articles_hybrid, get_article_by_slug
+from .reference_data import reference_pack
 
 VOYAGE_API_KEY = os.environ.get("VOYAGE_API_KEY", "")
 VOYAGE_MODEL = "voyage-2"
@@ -158,7 +159,7 @@ async def search_articles(query: str, limit: int = 5) -> SearchResults:
         for r in results
     ]
 
-    return SearchResults(articles=articles, query=normalized_query)
+    return SearchResults(articles=articles, query=normalized_query, embedding=embedding)
 
 
 async def get_article_card(slug: str) -> Optional[ArticleCardData]:
@@ -188,29 +189,12 @@ def extract_location_from_content(content: str, title: str) -> Optional[MapLocat
     """
     Extract location coordinates from guide content.
 
-    Uses known destination locations and their coordinates.
+    Uses the gazetteer in the reference data pack.
     """
-    # Key relocation destinations with coordinates
-    DESTINATION_LOCATIONS = {
-        "cyprus": MapLocation(name="Cyprus", lat=35.1264, lng=33.4299, description="Cyprus - Mediterranean island with favorable tax regime"),
-        "nicosia": MapLocation(name="Nicosia", lat=35.1856, lng=33.3823, description="Nicosia, capital of Cyprus"),
-        "lisbon": MapLocation(name="Lisbon", lat=38.7223, lng=-9.1393, description="Lisbon, Portugal - Popular D7 visa destination"),
-        "portugal": MapLocation(name="Portugal", lat=39.3999, lng=-8.2245, description="Portugal - D7 visa and NHR tax regime"),
-        "porto": MapLocation(name="Porto", lat=41.1579, lng=-8.6291, description="Porto, Portugal - Digital nomad hub"),
-        "dubai": MapLocation(name="Dubai", lat=25.2048, lng=55.2708, description="Dubai, UAE - Tax-free income"),
-        "malta": MapLocation(name="Malta", lat=35.9375, lng=14.3754, description="Malta - EU member, English-speaking"),
-        "spain": MapLocation(name="Spain", lat=40.4168, lng=-3.7038, description="Spain - Beckham Law tax benefits"),
-        "barcelona": MapLocation(name="Barcelona", lat=41.3874, lng=2.1686, description="Barcelona, Spain - Popular expat city"),
-        "netherlands": MapLocation(name="Netherlands", lat=52.3676, lng=4.9041, description="Netherlands - 30% ruling tax benefit"),
-        "amsterdam": MapLocation(name="Amsterdam", lat=52.3676, lng=4.9041, description="Amsterdam, Netherlands"),
-        "greece": MapLocation(name="Greece", lat=37.9838, lng=23.7275, description="Greece - Digital nomad visa available"),
-        "estonia": MapLocation(name="Estonia", lat=59.4370, lng=24.7536, description="Estonia - E-Residency program"),
-    }
-
     content_lower = content.lower()
     title_lower = title.lower()
 
-    for keyword, location in DESTINATION_LOCATIONS.items():
+    for keyword, location in reference_pack().gazetteer:
         if keyword in title_lower or keyword in content_lower:
             return location
 
@@ -219,25 +203,10 @@ def extract_location_from_content(content: str, title: str) -> Optional[MapLocat
 
 def extract_era_from_content(content: str) -> Optional[str]:
     """Extract visa type or category from guide content based on keywords."""
-    VISA_CATEGORIES = {
-        "d7 visa": "D7 Passive Income Visa",
-        "digital nomad": "Digital Nomad Visa",
-        "golden visa": "Golden Visa (Investment)",
-        "startup visa": "Startup Visa",
-        "freelance visa": "Freelance Visa",
-        "retirement visa": "Retirement Visa",
-        "work permit": "Work Permit",
-        "self-employment": "Self-Employment Visa",
-        "investor visa": "Investor Visa",
-        "non-habitual resident": "NHR Tax Regime",
-        "beckham law": "Beckham Law (Spain)",
-        "30% ruling": "30% Ruling (Netherlands)",
-    }
-
     content_lower = content.lower()
 
     # Check for explicit visa/category keywords
-    for keyword, category in VISA_CATEGORIES.items():
+    for keyword, category in reference_pack().visa_categories:
         if keyword in content_lower:
             return category
 
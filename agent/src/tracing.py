@@ -0,0 +1,154 @@
+"""Sampled request tracing in a fixed-size ring buffer.
+
+A sampled request gets a RequestTrace: per-stage timings, sizes, attributes
+and an outcome, appended to the ring buffer when the response has finished
+(for streams, after the last byte). Unsampled requests get NULL_TRACE, whose
+methods do nothing - with TRACE_SAMPLE_RATE=0 tracing costs one random() call
+per request. Credential headers are redacted before a trace is stored.
+"""
+
+import os
+import random
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Optional
+
+from starlette.background import BackgroundTask, BackgroundTasks
+from starlette.responses import Response
+
+# Fraction of requests traced (0 = off, 1 = every request)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "100"))
+
+# Header values never kept in a trace
+REDACTED_HEADERS = frozenset(("authorization", "proxy-authorization", "cookie", "set-cookie", "x-admin-token"))
+REDACTED = "[redacted]"
+
+# Finished traces, oldest first
+_traces: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+class RequestTrace:
+    """Timings, sizes and outcome for one sampled request."""
+
+    __slots__ = ("trace_id", "endpoint", "timestamp", "stages", "sizes", "attrs", "outcome", "_start", "_finished")
+
+    def __init__(self, endpoint: str):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.endpoint = endpoint
+        self.timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.stages: dict[str, float] = {}  # Stage -> milliseconds
+        self.sizes: dict[str, int] = {}
+        self.attrs: dict[str, Any] = {}
+        self.outcome: Optional[str] = None
+        self._start = time.perf_counter()
+        self._finished = False
+
+    def __bool__(self) -> bool:
+        return True
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block as a named stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def mark(self, name: str, start: float) -> None:
+        """Record a stage that began at a perf_counter() value."""
+        self.stages[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def size(self, name: str, value: int) -> None:
+        self.sizes[name] = value
+
+    def set(self, **attrs: Any) -> None:
+        """Attach attributes (`outcome` is kept separately, `headers` are redacted)."""
+        self.outcome = attrs.pop("outcome", self.outcome)
+        if isinstance(attrs.get("headers"), dict):
+            attrs["headers"] = redact_headers(attrs["headers"])
+        self.attrs.update(attrs)
+
+    def finish(self, outcome: Optional[str] = None) -> None:
+        """Close the trace and add it to the ring buffer (once)."""
+        if self._finished:
+            return
+        self._finished = True
+        if outcome:
+            self.outcome = outcome
+        self.stages["total"] = round((time.perf_counter() - self._start) * 1000, 2)
+        _traces.append(self)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "endpoint": self.endpoint,
+            "timestamp": self.timestamp,
+            "outcome": self.outcome,
+            "stages_ms": self.stages,
+            "sizes": self.sizes,
+            **self.attrs,
+        }
+
+
+def redact_headers(headers: dict) -> dict:
+    """A copy of the headers with credential values replaced."""
+    return {k: REDACTED if k.lower() in REDACTED_HEADERS else v for k, v in headers.items()}
+
+
+class NullTrace:
+    """Stand-in for unsampled requests - every method is a no-op."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def mark(self, name: str, start: float) -> None:
+        pass
+
+    def size(self, name: str, value: int) -> None:
+        pass
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def finish(self, outcome: Optional[str] = None) -> None:
+        pass
+
+
+NULL_TRACE = NullTrace()
+
+
+def start_trace(endpoint: str, sample_rate: Optional[float] = None):
+    """A RequestTrace if this request is sampled, else NULL_TRACE."""
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0 or (rate < 1 and random.random() >= rate):
+        return NULL_TRACE
+    return RequestTrace(endpoint)
+
+
+def finish_with_response(trace, response: Response) -> Response:
+    """Finish the trace once the response (including any stream and background work) is done."""
+    if not trace:
+        return response
+    tasks = [response.background] if response.background is not None else []
+    response.background = BackgroundTasks([*tasks, BackgroundTask(trace.finish)])
+    return response
+
+
+def recent_traces(limit: int = 20, endpoint: Optional[str] = None) -> list[dict]:
+    """The last `limit` finished traces, newest first."""
+    found = []
+    for trace in reversed(_traces):
+        if endpoint is None or trace.endpoint == endpoint:
+            found.append(trace.to_dict())
+            if len(found) >= limit:
+                break
+    return found
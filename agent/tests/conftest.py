@@ -0,0 +1,11 @@
+import os
+
+import pytest
+
+# src.agent builds its Gemini model at import - tests never call it
+os.environ.setdefault("GOOGLE_API_KEY", "test")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
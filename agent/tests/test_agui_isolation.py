@@ -0,0 +1,108 @@
+"""Concurrent AG-UI runs for different users never see each other's context."""
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+from pydantic_ai.messages import ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+from src import agent
+
+USERS = {
+    "u-ana": ("Ana", ["Ana is moving to Lisbon"]),
+    "u-ben": ("Ben", ["Ben wants a Cyprus visa"]),
+}
+
+
+def run_body(user_id: str) -> dict:
+    name = USERS[user_id][0]
+    return {
+        "threadId": f"thread-{user_id}",
+        "runId": f"run-{user_id}",
+        "state": {},
+        "messages": [
+            {"id": "s1", "role": "system", "content": f"CRITICAL USER CONTEXT:\n- User Name: {name}\n- User ID: {user_id}"},
+            {"id": "m1", "role": "user", "content": "who am I and what do I like?"},
+        ],
+        "tools": [],
+        "context": [],
+        "forwardedProps": {},
+    }
+
+
+@pytest.fixture
+def interleaved_model(monkeypatch):
+    """Both runs must be in their first model request before either continues."""
+    both_started = asyncio.Event()
+    started = []
+
+    async def stream(messages, info: AgentInfo):
+        returns = [p for p in messages[-1].parts if isinstance(p, ToolReturnPart)]
+        if not returns:
+            started.append(info.instructions)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 5)
+            yield {
+                0: DeltaToolCall(name="get_my_profile", json_args="{}", tool_call_id="profile"),
+                1: DeltaToolCall(name="get_my_interests", json_args="{}", tool_call_id="interests"),
+            }
+            return
+        # Echo what this run's tools and instructions saw
+        seen = {p.tool_name: p.content for p in returns}
+        user = re.search(r"User Name: (\w+)", info.instructions or "")
+        yield json.dumps({
+            "instructions_user": user.group(1) if user else None,
+            "profile_name": seen["get_my_profile"]["name"],
+            "interests": seen["get_my_interests"]["interests"],
+        })
+
+    model = FunctionModel(stream_function=stream)
+    monkeypatch.setattr(agent, "get_model", lambda name: model)
+    return started
+
+
+@pytest.fixture
+def memory_calls(monkeypatch):
+    calls = []
+
+    async def get_user_memory(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0.01)
+        return {"found": True, "is_returning": True, "facts": list(USERS[user_id][1])}
+
+    monkeypatch.setattr(agent, "get_user_memory", get_user_memory)
+    return calls
+
+
+def streamed_text(sse: str) -> str:
+    text = []
+    for line in sse.splitlines():
+        if line.startswith("data: "):
+            event = json.loads(line[6:])
+            if event.get("type") == "TEXT_MESSAGE_CONTENT":
+                text.append(event["delta"])
+    return "".join(text)
+
+
+@pytest.mark.anyio
+async def test_concurrent_runs_are_isolated(interleaved_model, memory_calls):
+    transport = httpx.ASGITransport(app=agent.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*[
+            client.post("/agui", json=run_body(user_id), headers={"accept": "text/event-stream"})
+            for user_id in USERS
+        ])
+
+    assert len(interleaved_model) == 2  # Both runs were in flight together
+    for user_id, response in zip(USERS, responses):
+        assert response.status_code == 200
+        name, facts = USERS[user_id]
+        seen = json.loads(streamed_text(response.text))
+        assert seen == {"instructions_user": name, "profile_name": name, "interests": facts}
+
+    # One Zep lookup per run, each for its own user (instructions and tools share it)
+    assert sorted(memory_calls) == sorted(USERS)
@@ -0,0 +1,18 @@
+from src.answer_cache import AnswerCache
+
+
+def test_personalized_turn_is_counted_once():
+    cache = AnswerCache()
+    key = ("atlas", ())
+    assert cache.lookup(key, [1.0, 0.0], personalized=True) is None
+    cache.store(key, "q", [1.0, 0.0], "answer", personalized=True)
+    assert cache.stats.skipped_personalized == 1
+    assert cache.stats.stores == 0
+
+
+def test_no_embedding_is_counted_once():
+    cache = AnswerCache()
+    key = ("atlas", ())
+    cache.lookup(key, None)
+    cache.store(key, "q", None, "answer")
+    assert cache.stats.skipped_no_embedding == 1
@@ -0,0 +1,83 @@
+import asyncio
+import functools
+
+import pytest
+
+from src import destination_expert, destination_pipeline
+from src.destination_expert import DestinationExpertDeps, destination_context
+from src.models import Article, SearchResults
+
+
+def fake_search(delay: float, image: str | None = None, articles: int = 1):
+    async def search(topic, limit=5):
+        await asyncio.sleep(delay)
+        return SearchResults(query=topic, articles=[
+            Article(id=str(i), title=f"{topic} guide {i}", content="A relocation guide.", hero_image_url=image)
+            for i in range(articles)
+        ])
+    return search
+
+
+@pytest.fixture
+def topic_image_calls(monkeypatch):
+    calls = []
+
+    async def get_topic_image(topic):
+        calls.append(topic)
+        await asyncio.sleep(0.05)
+        return "https://img.example/topic.jpg"
+
+    monkeypatch.setattr(destination_pipeline, "get_topic_image", get_topic_image)
+    return calls
+
+
+@pytest.mark.anyio
+async def test_guide_image_skips_topic_image_query(monkeypatch, topic_image_calls):
+    monkeypatch.setattr(destination_pipeline, "search_articles", fake_search(0.0, image="https://img.example/guide.jpg"))
+    research = await destination_pipeline.research_destination("Portugal", topic_image_hedge=0.2)
+
+    assert topic_image_calls == []
+    assert research.hero_image_source == "guide"
+    assert research.timed_out == []
+
+
+@pytest.mark.anyio
+async def test_slow_search_hedges_then_cancels_topic_image(monkeypatch, topic_image_calls):
+    async def slow_topic_image(topic):
+        topic_image_calls.append(topic)
+        await asyncio.sleep(5.0)
+
+    monkeypatch.setattr(destination_pipeline, "get_topic_image", slow_topic_image)
+    monkeypatch.setattr(destination_pipeline, "search_articles", fake_search(0.1, image="https://img.example/guide.jpg"))
+    before = destination_pipeline.pipeline_stats["topic_image_cancelled"]
+    research = await destination_pipeline.research_destination("Portugal", topic_image_hedge=0.01, deadline=1.0)
+
+    # Started as a hedge, cancelled once the guide image arrived - not a timeout
+    assert topic_image_calls == ["Portugal"]
+    assert destination_pipeline.pipeline_stats["topic_image_cancelled"] == before + 1
+    assert research.hero_image_source == "guide"
+    assert research.timed_out == []
+
+
+@pytest.mark.anyio
+async def test_guide_without_image_falls_back_to_topic_image(monkeypatch, topic_image_calls):
+    monkeypatch.setattr(destination_pipeline, "search_articles", fake_search(0.0))
+    research = await destination_pipeline.research_destination("Portugal", topic_image_hedge=0.2)
+
+    assert topic_image_calls == ["Portugal"]
+    assert research.hero_image_source == "topic_images"
+
+
+@pytest.mark.anyio
+async def test_search_timeout_is_reported_not_found_false_negative(monkeypatch, topic_image_calls):
+    monkeypatch.setattr(destination_pipeline, "search_articles", fake_search(5.0))
+    monkeypatch.setattr(
+        destination_expert, "research_destination",
+        functools.partial(destination_pipeline.research_destination, deadline=0.1),
+    )
+    result = await destination_context(DestinationExpertDeps(), "Portugal")
+
+    assert result["found"] is False
+    assert result["timed_out"] is True
+    assert "timed out" in result["brief"]
+    assert "couldn't find" not in result["brief"]
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from src import hedging
+
+
+def stand_in(first_token_delay: float, text: str = "Hello from the stand-in.") -> Agent:
+    """An agent whose model waits before its first token, then streams text."""
+    async def stream(messages, info: AgentInfo):
+        await asyncio.sleep(first_token_delay)
+        for word in text.split(" "):
+            yield word + " "
+    return Agent(FunctionModel(stream_function=stream))
+
+
+@pytest.fixture(autouse=True)
+def fresh_latency(monkeypatch):
+    monkeypatch.setattr(hedging, "model_latency", {})
+    monkeypatch.setattr(hedging, "HEDGE_DEFAULT_DELAY", 0.05)
+
+
+async def collect(candidates, deadline=hedging.FIRST_TOKEN_DEADLINE) -> str:
+    return "".join([d async for d in hedging.hedged_stream(candidates, "hi", None, deadline=deadline)])
+
+
+@pytest.mark.anyio
+async def test_stalled_primary_is_hedged_and_cancelled():
+    text = await collect([("slow", stand_in(5.0, "slow reply")), ("fast", stand_in(0.0, "fast reply"))])
+    assert text.strip() == "fast reply"
+
+    slow, fast = hedging.model_latency["slow"], hedging.model_latency["fast"]
+    assert fast.wins == 1 and slow.cancelled == 1
+    # The loser's elapsed time is kept as a censored sample, not dropped
+    assert len(slow.samples) == 1 and slow.censored == 1
+    assert slow.samples[0] >= 0.05
+    assert len(fast.samples) == 1 and fast.censored == 0
+
+
+@pytest.mark.anyio
+async def test_fast_primary_is_not_hedged():
+    text = await collect([("primary", stand_in(0.0, "primary reply")), ("secondary", stand_in(0.0))])
+    assert text.strip() == "primary reply"
+    assert "secondary" not in hedging.model_latency
+
+
+@pytest.mark.anyio
+async def test_deadline_records_censored_samples():
+    with pytest.raises(asyncio.TimeoutError):
+        await collect([("a", stand_in(5.0)), ("b", stand_in(5.0))], deadline=0.2)
+    assert hedging.model_latency["a"].censored == 1
+    assert hedging.model_latency["b"].censored == 1
+
+
+@pytest.mark.anyio
+async def test_on_winner_names_the_model_that_answered():
+    winners = []
+    candidates = [("slow", stand_in(5.0, "slow reply")), ("fast", stand_in(0.0, "fast reply"))]
+    text = "".join([d async for d in hedging.hedged_stream(candidates, "hi", None, on_winner=winners.append)])
+    assert text.strip() == "fast reply"
+    assert winners == ["fast"]
@@ -0,0 +1,83 @@
+import pytest
+
+from src import fast_answers
+from src.intents import Intent, classify_intent, find_destinations, tokenize
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("hello", Intent.GREETING),
+    ("hi there", Intent.GREETING),
+    ("speak your greeting", Intent.GREETING),
+    ("what's my name", Intent.NAME_QUESTION),
+    ("who are you", Intent.IDENTITY),
+    ("yes", Intent.AFFIRMATION),
+    ("tell me more", Intent.AFFIRMATION),
+    ("tell me about portugal", Intent.QUESTION),
+    ("", Intent.QUESTION),
+])
+def test_conversational_intents(text, intent):
+    assert classify_intent(text).intent == intent
+
+
+@pytest.mark.parametrize("text, intent, destinations", [
+    ("compare portugal and spain", Intent.COMPARE, ("portugal", "spain")),
+    ("is spain better than portugal", Intent.COMPARE, ("spain", "portugal")),
+    ("visa options for Portugal", Intent.VISA, ("portugal",)),
+    ("what visas are available in cyprus", Intent.VISA, ("cyprus",)),
+    ("cost of living in Spain", Intent.COST, ("spain",)),
+    ("cost of living in new zealand", Intent.COST, ("new-zealand",)),
+])
+def test_plain_lookups_are_deterministic(text, intent, destinations):
+    match = classify_intent(text)
+    assert match.intent == intent
+    assert match.destinations == destinations
+    assert match.city is None
+
+
+@pytest.mark.parametrize("text", [
+    "tell me about the Portugal D7 visa",
+    "compare tax in Spain and Portugal",
+    "what are the schools like in Dubai visa holders",
+    "what visa do i need for lisbon",
+    "compare lisbon and madrid",
+    "compare portugal",
+    "visa",
+])
+def test_specific_questions_fall_through(text):
+    assert classify_intent(text).intent == Intent.QUESTION
+
+
+def test_city_cost_keeps_the_city():
+    match = classify_intent("how much is rent in Lisbon")
+    assert match.intent == Intent.COST
+    assert match.destinations == ("portugal",)
+    assert match.city == "Lisbon"
+
+
+def test_destination_resolution():
+    assert find_destinations(tokenize("Moving from the United Kingdom to New Zealand")) == ("uk", "new-zealand")
+    assert find_destinations(tokenize("Lisbon or Porto, maybe Portugal")) == ("portugal",)
+    assert find_destinations(tokenize("somewhere warm")) == ()
+
+
+COST_ROW = {
+    "country": "Portugal",
+    "cities": [
+        {"cityName": "Lisbon", "rent1BRCenter": 1200, "currency": "EUR", "utilities": 120},
+        {"cityName": "Porto", "rent1BRCenter": 900, "currency": "EUR"},
+    ],
+}
+
+
+@pytest.mark.anyio
+async def test_city_cost_answer_uses_that_city(monkeypatch):
+    async def cost(slug):
+        return COST_ROW
+    monkeypatch.setattr(fast_answers, "get_cost_of_living", cost)
+
+    answer = await fast_answers.answer_intent(classify_intent("how much is rent in Lisbon"))
+    assert "Lisbon runs about EUR 1,200" in answer.text
+    assert "Porto" not in answer.text
+
+    # A city without data falls through instead of answering for the country
+    assert await fast_answers.answer_cost("portugal", "Madeira") is None
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import agent
+
+
+class FakeGraph:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.searches = 0
+
+    async def search(self, **kwargs):
+        self.searches += 1
+        await self.release.wait()
+        return SimpleNamespace(edges=[SimpleNamespace(fact="Ana is moving to Lisbon")])
+
+    async def add(self, **kwargs):
+        pass
+
+
+@pytest.fixture
+def zep(monkeypatch):
+    graph = FakeGraph()
+    monkeypatch.setattr(agent, "get_zep_client", lambda: SimpleNamespace(graph=graph))
+    monkeypatch.setattr(agent, "user_memory_cache", agent.TTLCache(10, 300))
+    return graph
+
+
+@pytest.mark.anyio
+async def test_search_that_raced_a_write_is_not_cached(zep):
+    lookup = asyncio.create_task(agent.get_user_memory("u1"))
+    await asyncio.sleep(0)
+    await agent._add_to_graph(agent.get_zep_client(), "u1", "user: hello")
+    zep.release.set()
+
+    assert (await lookup)["facts"] == ["Ana is moving to Lisbon"]
+    assert agent.user_memory_cache.get("u1") is None
+    # Nothing is kept per user once the search is done
+    assert "u1" not in agent._raced_searches
+
+
+@pytest.mark.anyio
+async def test_writes_without_a_search_leave_no_state(zep):
+    for i in range(100):
+        await agent._add_to_graph(agent.get_zep_client(), f"user-{i}", "user: hi")
+    assert not agent._raced_searches
+
+    zep.release.set()
+    await agent.get_user_memory("u1")
+    assert agent.user_memory_cache.get("u1") is not None
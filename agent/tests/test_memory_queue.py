@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from src.memory_queue import MemoryWriteQueue
+
+
+@pytest.mark.anyio
+async def test_one_users_backoff_does_not_hold_up_others():
+    written: dict[str, list[str]] = {}
+    failing_attempts = 0
+
+    async def writer(user_id, writes):
+        nonlocal failing_attempts
+        if user_id == "broken":
+            failing_attempts += 1
+            raise RuntimeError("zep unavailable")
+        written.setdefault(user_id, []).extend(w.message for w in writes)
+
+    queue = MemoryWriteQueue(writer, max_retries=3, backoff_base=1.0)  # ~7s of backoff for "broken"
+    queue.enqueue("broken", "lost")
+    await asyncio.sleep(0.01)  # "broken" is now backing off
+    queue.enqueue("ok", "first")
+    queue.enqueue("ok", "second")
+
+    await asyncio.wait_for(_until(lambda: written.get("ok") == ["first", "second"]), timeout=0.5)
+    assert failing_attempts == 1
+    assert queue.metrics()["users_writing"] == 1  # Only "broken", still retrying
+    await queue.drain(timeout=0.01)
+    assert queue.metrics()["users_writing"] == 0
+
+
+@pytest.mark.anyio
+async def test_messages_being_retried_count_towards_the_bound():
+    release = asyncio.Event()
+
+    async def writer(user_id, writes):
+        await release.wait()
+
+    queue = MemoryWriteQueue(writer, maxsize=2)
+    assert queue.enqueue("u1", "a") and queue.enqueue("u1", "b")
+    await asyncio.sleep(0.01)  # Both taken off the queue, write still pending
+    assert queue.depth == 0
+    assert queue.enqueue("u2", "c") is False
+    assert queue.stats.dropped == 1
+
+    release.set()
+    await queue.drain()
+    assert queue.stats.written == 2
+
+
+async def _until(condition) -> None:
+    while not condition():
+        await asyncio.sleep(0.005)
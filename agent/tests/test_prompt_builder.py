@@ -0,0 +1,16 @@
+from src.prompt_builder import PRIORITY_LOW, PRIORITY_REQUIRED, PromptBuilder, count_tokens
+
+
+def test_drops_the_chosen_section_among_equal_ones():
+    dup, mid = "Repeated guide excerpt. ", "Required question. "
+    budget = count_tokens(dup) + count_tokens(mid)
+    built = (
+        PromptBuilder("test-model", budget=budget)
+        .add("guide", dup, PRIORITY_LOW)
+        .add("question", mid, PRIORITY_REQUIRED)
+        .add("guide", dup, PRIORITY_LOW)
+        .build()
+    )
+    # The later duplicate goes; the earlier one keeps its place before the question
+    assert built.user == dup + mid
+    assert built.dropped == ["guide"]
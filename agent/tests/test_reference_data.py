@@ -0,0 +1,62 @@
+import dataclasses
+from types import MappingProxyType
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from src import agent
+from src.destination_expert import destination_map, featured_destinations, visa_timeline
+from src.reference_data import reference_pack, reference_packs
+
+
+def test_pack_locations_are_frozen():
+    location = destination_map("Portugal")
+    pack_location = reference_pack().map_locations["portugal"]
+    with pytest.raises(ValidationError):
+        pack_location.lat = 0.0
+    assert location["location"]["lat"] == pack_location.lat
+
+
+def test_tool_results_get_copies_of_pack_payloads():
+    first = visa_timeline("Portugal")
+    first["events"][0]["title"] = "Mutated"
+    first["events"].clear()
+    assert visa_timeline("Portugal")["events"][0]["title"] != "Mutated"
+
+    featured = featured_destinations()
+    featured["destinations"][0]["name"] = "Mutated"
+    assert featured_destinations()["destinations"][0]["name"] != "Mutated"
+
+
+@pytest.fixture
+def client():
+    with TestClient(agent.app) as test_client:
+        yield test_client
+
+
+def test_reload_is_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.post("/admin/reference-pack/reload").status_code == 403
+
+
+def test_reload_needs_the_admin_token(client, monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "admin-secret")
+    assert client.post("/admin/reference-pack/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    response = client.post("/admin/reference-pack/reload", headers={"X-Admin-Token": "admin-secret"})
+    assert response.status_code == 200
+    assert response.json()["reloaded"] is True
+
+
+@pytest.mark.anyio
+async def test_show_map_reads_the_live_pack(monkeypatch):
+    pack = reference_pack()
+    moved = pack.map_locations["portugal"].model_copy(update={"lat": 1.0})
+    reloaded = dataclasses.replace(pack, map_locations=MappingProxyType({**pack.map_locations, "portugal": moved}))
+    monkeypatch.setattr(reference_packs, "_pack", reloaded)
+
+    result = await agent.show_map(None, "Portugal")
+    assert result["found"] is True
+    assert result["location"]["lat"] == 1.0
+    assert (await agent.show_map(None, "Atlantis"))["found"] is False
@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import pytest
+
+from src.session_store import InProcessSessionStore, SessionStore, SQLiteSessionStore
+
+
+@dataclass
+class Counter:
+    count: int = 0
+
+
+def sqlite_store(path) -> SQLiteSessionStore:
+    return SQLiteSessionStore(str(path), asdict, lambda data: Counter(**data))
+
+
+def increment(counter: Counter):
+    counter.count += 1
+
+
+def test_sqlite_update_does_not_lose_writes_between_workers(tmp_path):
+    # Two connections to one file stand in for two uvicorn workers
+    stores = [sqlite_store(tmp_path / "sessions.db") for _ in range(2)]
+
+    def work(store):
+        for _ in range(50):
+            store.update("s1", increment, Counter, time.time())
+
+    threads = [threading.Thread(target=work, args=(store,)) for store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stores[0].get("s1").count == 100
+
+
+@pytest.mark.anyio
+async def test_sqlite_io_runs_off_the_event_loop(tmp_path):
+    store = sqlite_store(tmp_path / "sessions.db")
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def mutate(counter: Counter):
+        seen.append(threading.get_ident())
+        counter.count = 7
+
+    await store.modify("s1", mutate, Counter, time.time())
+    assert seen and seen[0] != loop_thread
+    assert (await store.load("s1")).count == 7
+
+
+@pytest.mark.anyio
+async def test_in_process_modify_creates_and_updates():
+    store = InProcessSessionStore(asdict, lambda data: Counter(**data))
+    await store.modify("s1", increment, Counter, time.time())
+    await store.modify("s1", increment, Counter, time.time())
+    assert (await store.load("s1")).count == 2
+
+
+
+def test_incomplete_backend_fails_at_construction():
+    class NoUpdate(SessionStore):
+        get = InProcessSessionStore.get
+        put = InProcessSessionStore.put
+        delete = InProcessSessionStore.delete
+        evict_idle = InProcessSessionStore.evict_idle
+        metrics = InProcessSessionStore.metrics
+
+    with pytest.raises(TypeError, match="update"):
+        NoUpdate(asdict, lambda data: Counter(**data))
@@ -0,0 +1,64 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src import agent
+from src.session_store import SQLiteSessionStore
+
+
+@pytest.fixture
+def sqlite_sessions(tmp_path, monkeypatch):
+    store = SQLiteSessionStore(
+        str(tmp_path / "sessions.db"), agent.asdict, lambda data: agent.SessionContext(**data)
+    )
+    monkeypatch.setattr(agent, "session_store", store)
+    return store
+
+
+@pytest.mark.anyio
+async def test_turn_saves_only_its_own_changes(sqlite_sessions):
+    turn = await agent.load_session_turn("s1")
+    agent.mark_greeted(turn.ctx)
+    agent.set_last_suggestion(turn.ctx, "Portugal")
+
+    # A background prefetch lands while the turn is running
+    await agent.prefetch_topic_content("s1", "Portugal", "Guide text", ["Moving to Portugal"])
+    await agent.save_session_turn(turn)
+
+    stored = sqlite_sessions.get("s1")
+    assert stored.greeted_this_session
+    assert stored.last_suggested_topic == "Portugal"
+    assert stored.prefetched_content == "Guide text"
+
+
+@pytest.mark.anyio
+async def test_prefetched_content_is_taken_once(sqlite_sessions):
+    await agent.prefetch_topic_content("s1", "Portugal", "Guide text", ["Moving to Portugal"])
+    assert await agent.take_prefetched_content("s1", "Portugal") == ("Guide text", ["Moving to Portugal"])
+    assert await agent.take_prefetched_content("s1", "Portugal") == (None, None)
+
+
+@pytest.mark.anyio
+async def test_early_search_is_cancelled_when_the_turn_fails(monkeypatch):
+    searches = []
+
+    async def search_articles(query, limit=5):
+        searches.append(asyncio.current_task())
+        await asyncio.sleep(5.0)
+
+    async def load_session_turn(session_id):
+        await asyncio.sleep(0)  # Let the search start
+        raise RuntimeError("session store down")
+
+    monkeypatch.setattr(agent, "search_articles", search_articles)
+    monkeypatch.setattr(agent, "load_session_turn", load_session_turn)
+    body = {"messages": [{"role": "user", "content": "why do people prefer living abroad these days"}]}
+    transport = httpx.ASGITransport(app=agent.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post("/chat/completions", json=body)
+
+    assert response.status_code == 500
+    assert len(searches) == 1
+    await asyncio.sleep(0)
+    assert searches[0].cancelled()
@@ -0,0 +1,26 @@
+from src.sse import PhraseChunker
+
+REPLY = ("Lisbon is a lovely city for families, with good schools and mild weather. "
+         "The D7 visa takes about three months to process, and you need proof of income.")
+
+
+def stream(chunker: PhraseChunker, text: str) -> list[str]:
+    words = text.split(" ")
+    frames = []
+    for i, word in enumerate(words):
+        frames.extend(chunker.feed(word + (" " if i < len(words) - 1 else "")))
+    return frames + chunker.flush()
+
+
+def test_first_frame_goes_out_early():
+    frames = stream(PhraseChunker(), REPLY)
+    assert "".join(frames) == REPLY
+    assert len(frames[0]) <= 30
+    # Later frames are still whole clauses
+    assert frames[1] == "for families, with good schools and mild weather. "
+
+
+def test_first_frame_at_first_clause_boundary():
+    chunker = PhraseChunker()
+    assert chunker.feed("Sure, ") == ["Sure, "]
+    assert chunker.feed("the golden visa") == []
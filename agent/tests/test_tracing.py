@@ -0,0 +1,16 @@
+from src.tracing import RequestTrace, redact_headers
+
+
+def test_credential_headers_are_redacted():
+    headers = {"Authorization": "Bearer secret", "cookie": "sid=1", "x-admin-token": "t", "content-type": "application/json"}
+    redacted = redact_headers(headers)
+    assert redacted == {
+        "Authorization": "[redacted]", "cookie": "[redacted]", "x-admin-token": "[redacted]",
+        "content-type": "application/json",
+    }
+
+
+def test_trace_never_stores_credentials():
+    trace = RequestTrace("clm")
+    trace.set(headers={"authorization": "Bearer secret"})
+    assert "secret" not in str(trace.to_dict())
@@ -0,0 +1,34 @@
+import pytest
+
+from src import agent
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(agent, "preferred_name_cache", agent.TTLCache(10, 300))
+
+
+@pytest.mark.anyio
+async def test_missing_name_is_not_cached(monkeypatch):
+    names = iter([None, "Dan"])  # DB error (or no name yet), then the name
+
+    async def lookup(user_id):
+        return next(names)
+    monkeypatch.setattr(agent, "get_user_preferred_name", lookup)
+
+    assert await agent.get_cached_preferred_name("u1") is None
+    assert await agent.get_cached_preferred_name("u1") == "Dan"
+
+
+@pytest.mark.anyio
+async def test_found_name_is_cached(monkeypatch):
+    calls = []
+
+    async def lookup(user_id):
+        calls.append(user_id)
+        return "Dan"
+    monkeypatch.setattr(agent, "get_user_preferred_name", lookup)
+
+    assert await agent.get_cached_preferred_name("u1") == "Dan"
+    assert await agent.get_cached_preferred_name("u1") == "Dan"
+    assert calls == ["u1"]
@@ -0,0 +1,41 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src import agent
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("AGENT_SERVICE_TOKEN", "service-secret")
+    warmed = []
+
+    async def fetch_user_context(user_id, user_name):
+        warmed.append((user_id, user_name))
+        return user_name, {"interests": []}
+
+    monkeypatch.setattr(agent, "fetch_user_context", fetch_user_context)
+    with TestClient(agent.app) as test_client:
+        test_client.warmed = warmed
+        yield test_client
+
+
+def test_warmup_needs_the_service_token(client):
+    assert client.post("/warmup", headers={"X-User-Id": "u1"}).status_code == 403
+    assert client.post("/warmup", headers={"Authorization": "Bearer wrong", "X-User-Id": "u1"}).status_code == 403
+    assert client.warmed == []
+
+
+def test_warmup_is_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.delenv("AGENT_SERVICE_TOKEN")
+    response = client.post("/warmup", headers={"Authorization": "Bearer ", "X-User-Id": "u1"})
+    assert response.status_code == 403
+
+
+def test_warmup_uses_the_asserted_user(client):
+    response = client.post(
+        "/warmup",
+        headers={"Authorization": "Bearer service-secret", "X-User-Id": "u1", "X-User-Name": "Ana"},
+        json={"user_id": "someone-else", "session_id": "x"},  # Ignored
+    )
+    assert response.status_code == 200
+    assert client.warmed == [("u1", "Ana")]
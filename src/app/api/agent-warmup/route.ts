@@ -0,0 +1,39 @@
+import { NextResponse } from 'next/server';
+import { getAuthServer } from '@/lib/auth/server';
+
+/**
+ * POST /api/agent-warmup
+ *
+ * Warms the agent's cached context (Zep memory, preferred name) for the
+ * signed-in user at login / page load, so the first voice or chat turn is
+ * personalized without waiting on Zep. The user comes from the verified
+ * session - never from the request - and the agent only accepts the call
+ * with AGENT_SERVICE_TOKEN.
+ */
+export async function POST() {
+  try {
+    const authServer = getAuthServer();
+    const serviceToken = process.env.AGENT_SERVICE_TOKEN;
+    if (!authServer || !serviceToken) {
+      return NextResponse.json({ status: 'disabled' }, { status: 503 });
+    }
+    const { data } = await authServer.getSession();
+    if (!data?.session || !data?.user) {
+      return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
+    }
+
+    const agentUrl = (process.env.AGENT_URL || 'http://localhost:8000').replace(/\/agui\/?$/, '');
+    const headers: Record<string, string> = {
+      Authorization: `Bearer ${serviceToken}`,
+      'X-User-Id': data.user.id,
+    };
+    if (data.user.name) {
+      headers['X-User-Name'] = data.user.name.split(' ')[0];
+    }
+    const response = await fetch(`${agentUrl}/warmup`, { method: 'POST', headers });
+    return NextResponse.json(await response.json(), { status: response.status });
+  } catch (error) {
+    console.error('[Agent Warmup] Error:', error);
+    return NextResponse.json({ error: 'Warm-up failed' }, { status: 500 });
+  }
+}
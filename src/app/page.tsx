@@ -409,6 +409,11 @@ export default function Home() {
     async function fetchUserContext() {
       if (!user?.id) return;
 
+      // Warm the agent's cached context so the first voice/chat turn is personalized
+      fetch('/api/agent-warmup', { method: 'POST' }).catch((e) =>
+        console.warn('[ATLAS] Agent warm-up failed:', e)
+      );
+
       // Fetch user profile from our DB
       try {
         const profileRes = await fetch('/api/user-profile');